@@ -137,6 +137,17 @@ const Applicants: React.FC = () => {
     }
   };
 
+  const handleViewDetails = async (applicantId: number) => {
+    try {
+      // List rows are compact; load the full record for the detail panel
+      const response = await api.get(`/applicants/${applicantId}/`);
+      setSelectedApplicant(response.data);
+      setIsDetailModalOpen(true);
+    } catch (err) {
+      console.error("Failed to fetch applicant:", err);
+    }
+  };
+
   const handleUpdateStatus = async (applicantId: number, status: string) => {
     const applicant = applicants.find((app) => app.id === applicantId);
     if (!applicant) return;
@@ -652,10 +663,7 @@ const Applicants: React.FC = () => {
                     <td className="px-3 py-4 whitespace-nowrap">
                       <div className="flex items-center space-x-2">
                         <button
-                          onClick={() => {
-                            setSelectedApplicant(applicant);
-                            setIsDetailModalOpen(true);
-                          }}
+                          onClick={() => handleViewDetails(applicant.id)}
                           className="p-2 rounded-lg bg-blue-50 dark:bg-blue-900/30 text-blue-600 dark:text-blue-400 hover:bg-blue-100 dark:hover:bg-blue-900/50 transition-colors"
                           title="View Details"
                         >
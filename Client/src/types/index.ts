@@ -33,6 +33,7 @@ export interface Applicant {
   notes: string;
   keywords: string;
   match_score: number;
+  scoring_status: 'pending' | 'done' | 'failed';
   created_at: string;
   updated_at: string;
 }
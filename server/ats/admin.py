@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Recruiter, Job, Applicant
+from .models import Recruiter, Job, Applicant, ResumeAnalysis, ScoringTask, OutboundEmail
+from .rollups import update_status
 
 @admin.register(Recruiter)
 class RecruiterAdmin(admin.ModelAdmin):
@@ -22,13 +23,16 @@ class JobAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_application_counts()
 
 @admin.register(Applicant)
 class ApplicantAdmin(admin.ModelAdmin):
-    list_display = ('name', 'email', 'job', 'status', 'match_score', 'created_at')
-    list_filter = ('status', 'job', 'created_at')
+    list_display = ('name', 'email', 'job', 'status', 'match_score', 'scoring_status', 'created_at')
+    list_filter = ('status', 'scoring_status', 'job', 'created_at')
     search_fields = ('name', 'email', 'cover_letter')
-    readonly_fields = ('match_score', 'keywords', 'created_at', 'updated_at')
+    readonly_fields = ('match_score', 'scoring_status', 'keywords', 'created_at', 'updated_at')
     
     fieldsets = (
         ('Personal Information', {
@@ -38,7 +42,7 @@ class ApplicantAdmin(admin.ModelAdmin):
             'fields': ('job', 'cover_letter', 'status', 'notes')
         }),
         ('Matching Information', {
-            'fields': ('keywords', 'match_score'),
+            'fields': ('keywords', 'match_score', 'scoring_status'),
             'classes': ('collapse',)
         }),
         ('Timestamps', {
@@ -50,17 +54,40 @@ class ApplicantAdmin(admin.ModelAdmin):
     actions = ['mark_as_reviewed', 'mark_as_shortlisted', 'mark_as_rejected']
     
     def mark_as_reviewed(self, request, queryset):
-        queryset.update(status='reviewed')
-        self.message_user(request, f"{queryset.count()} applicants marked as reviewed.")
+        updated = update_status(queryset, 'reviewed')
+        self.message_user(request, f"{updated} applicants marked as reviewed.")
     
     def mark_as_shortlisted(self, request, queryset):
-        queryset.update(status='shortlisted')
-        self.message_user(request, f"{queryset.count()} applicants marked as shortlisted.")
+        updated = update_status(queryset, 'shortlisted')
+        self.message_user(request, f"{updated} applicants marked as shortlisted.")
     
     def mark_as_rejected(self, request, queryset):
-        queryset.update(status='rejected')
-        self.message_user(request, f"{queryset.count()} applicants marked as rejected.")
+        updated = update_status(queryset, 'rejected')
+        self.message_user(request, f"{updated} applicants marked as rejected.")
     
     mark_as_reviewed.short_description = "Mark selected as Reviewed"
     mark_as_shortlisted.short_description = "Mark selected as Shortlisted"
-    mark_as_rejected.short_description = "Mark selected as Rejected"
\ No newline at end of file
+    mark_as_rejected.short_description = "Mark selected as Rejected"
+
+@admin.register(ResumeAnalysis)
+class ResumeAnalysisAdmin(admin.ModelAdmin):
+    list_display = ('applicant', 'content_hash', 'keyword_score', 'skill_score', 'truncated', 'extracted_at')
+    search_fields = ('applicant__name', 'applicant__email', 'content_hash')
+    readonly_fields = ('applicant', 'text', 'content_hash', 'truncated', 'extraction_error',
+                       'extracted_at', 'keywords', 'skills', 'keyword_score', 'skill_score')
+
+
+@admin.register(ScoringTask)
+class ScoringTaskAdmin(admin.ModelAdmin):
+    list_display = ('applicant', 'status', 'reparse', 'attempts', 'run_after', 'locked_by', 'updated_at')
+    list_filter = ('status', 'reparse')
+    search_fields = ('applicant__name', 'applicant__email', 'last_error')
+    readonly_fields = ('created_at', 'updated_at')
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('to_email', 'subject', 'status', 'attempts', 'run_after', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('to_email', 'subject', 'last_error')
+    readonly_fields = ('created_at', 'sent_at')
@@ -2,4 +2,11 @@ from django.apps import AppConfig
 
 class AtsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'ats'
\ No newline at end of file
+    name = 'ats'
+    
+    def ready(self):
+        from django.db.models.signals import post_migrate
+        from . import signals
+        
+        post_migrate.connect(signals.create_search_index, sender=self)
+        post_migrate.connect(signals.backfill_status_rollups, sender=self)
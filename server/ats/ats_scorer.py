@@ -3,34 +3,196 @@ ATS (Applicant Tracking System) Scoring Module
 Calculates match scores for applicants based on resume content and job requirements
 """
 
+import hashlib
+import itertools
+import os
 import re
-from typing import Dict, List
+import time
+from collections import Counter
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple, Union
 import docx
 import PyPDF2
+from django.conf import settings
 
+from . import metrics
+from .instrumentation import span
+from .skill_matcher import SkillMatcher
 
-def extract_text_from_pdf(file) -> str:
-    """Extract text from PDF file"""
+
+class ExtractionError(Exception):
+    """
+    Resume text could not be extracted.
+    
+    `code` is one of 'unsupported_type', 'unreadable', 'timeout',
+    'cpu_limit', 'memory_limit' or 'crashed'.
+    """
+    
+    def __init__(self, code: str, detail: str = ""):
+        super().__init__(code, detail)
+        self.code = code
+        self.detail = detail
+    
+    def __str__(self):
+        return f"{self.code}: {self.detail}" if self.detail else self.code
+    
+    def to_dict(self) -> Dict:
+        return {'code': self.code, 'detail': self.detail}
+
+
+@dataclass
+class ExtractedText:
+    """Text pulled from a resume, and which budgets (if any) cut it short"""
+    text: str
+    pages_read: int = 0
+    page_count: int = 0
+    # Budget that stopped extraction early: ('pages',), ('chars',) or ('time',)
+    truncated: Tuple[str, ...] = ()
+
+
+def extraction_budgets(max_pages=None, max_chars=None, time_budget=None):
+    """Fill unset (max_pages, max_chars, time_budget) from settings"""
+    return (
+        max_pages if max_pages is not None else getattr(settings, 'ATS_PDF_MAX_PAGES', 30),
+        max_chars if max_chars is not None else getattr(settings, 'ATS_RESUME_MAX_CHARS', 100000),
+        time_budget if time_budget is not None else getattr(settings, 'ATS_PDF_TIME_BUDGET', 5.0),
+    )
+
+
+def iter_pdf_pages(reader) -> Iterator[str]:
+    """Yield the text of each PDF page lazily, one page parsed at a time"""
+    for page in reader.pages:
+        yield page.extract_text() or ""
+
+
+def _collect(chunks: Iterable[str], total: int, max_chars: int, deadline: float):
+    """
+    Join chunks until they run out or a character/time budget does.
+    The deadline is checked before pulling the next chunk, so a chunk past
+    the budget is never parsed.
+    
+    Returns:
+        Tuple of (text, chunks_read, truncated reasons)
+    """
+    parts = []
+    length = 0
+    read = 0
+    for chunk in chunks:
+        read += 1
+        if length + len(chunk) > max_chars:
+            parts.append(chunk[:max(max_chars - length, 0)])
+            return "\n".join(parts), read, ('chars',)
+        parts.append(chunk)
+        length += len(chunk) + 1
+        if read < total and time.monotonic() > deadline:
+            return "\n".join(parts), read, ('time',)
+    return "\n".join(parts), read, ()
+
+
+def extract_pdf(file, max_pages=None, max_chars=None, time_budget=None) -> ExtractedText:
+    """
+    Extract PDF text page by page within page, character and time budgets
+    
+    Args:
+        file: File object containing the PDF
+        max_pages: Stop after this many pages (default ATS_PDF_MAX_PAGES)
+        max_chars: Stop once this much text is collected (default ATS_RESUME_MAX_CHARS)
+        time_budget: Seconds to spend before stopping between pages (default ATS_PDF_TIME_BUDGET)
+        
+    Returns:
+        ExtractedText
+        
+    Raises:
+        ExtractionError: The file isn't a readable PDF
+    """
+    max_pages, max_chars, time_budget = extraction_budgets(max_pages, max_chars, time_budget)
+    deadline = time.monotonic() + time_budget
     try:
         reader = PyPDF2.PdfReader(file)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
-        return text.strip()
+        page_count = len(reader.pages)
+        pages = itertools.islice(iter_pdf_pages(reader), max_pages)
+        text, pages_read, truncated = _collect(pages, min(page_count, max_pages), max_chars, deadline)
+        if not truncated and pages_read < page_count:
+            truncated = ('pages',)
+    except MemoryError:
+        raise
     except Exception as e:
-        print(f"Error extracting PDF text: {e}")
-        return ""
+        raise ExtractionError('unreadable', f"PDF: {e}") from e
+    return ExtractedText(text.strip(), pages_read, page_count, truncated)
 
 
-def extract_text_from_docx(file) -> str:
-    """Extract text from DOCX file"""
+def extract_docx(file, max_chars=None, time_budget=None) -> ExtractedText:
+    """Extract DOCX paragraph text within character and time budgets"""
+    _, max_chars, time_budget = extraction_budgets(None, max_chars, time_budget)
+    deadline = time.monotonic() + time_budget
     try:
         document = docx.Document(file)
-        text = "\n".join([paragraph.text for paragraph in document.paragraphs])
-        return text.strip()
+        paragraphs = document.paragraphs
+        text, _, truncated = _collect((p.text for p in paragraphs), len(paragraphs), max_chars, deadline)
+    except MemoryError:
+        raise
     except Exception as e:
-        print(f"Error extracting DOCX text: {e}")
-        return ""
+        raise ExtractionError('unreadable', f"DOCX: {e}") from e
+    return ExtractedText(text.strip(), truncated=truncated)
+
+
+def extract_text_from_pdf(file) -> str:
+    """Extract text from PDF file"""
+    return extract_pdf(file).text
+
+
+def extract_text_from_docx(file) -> str:
+    """Extract text from DOCX file"""
+    return extract_docx(file).text
+
+
+def extract_resume_inline(file, max_pages=None, max_chars=None, time_budget=None) -> ExtractedText:
+    """
+    Extract resume text in this process (used by the extraction pool's children)
+    
+    Raises:
+        ExtractionError: Unsupported file type or unreadable file
+    """
+    filename = file.name.lower()
+    
+    if filename.endswith('.pdf'):
+        return extract_pdf(file, max_pages, max_chars, time_budget)
+    elif filename.endswith('.docx') or filename.endswith('.doc'):
+        return extract_docx(file, max_chars, time_budget)
+    raise ExtractionError('unsupported_type', os.path.splitext(filename)[1] or filename)
+
+
+def extract_resume(file, isolated=None) -> ExtractedText:
+    """
+    Extract text from resume file (PDF or DOCX) within the configured budgets.
+    With ATS_EXTRACTION_ISOLATED the parsing runs in the extraction pool.
+    
+    Args:
+        file: Django UploadedFile object
+        isolated: Force (or skip) the extraction pool instead of following the setting
+        
+    Returns:
+        ExtractedText with the text and any budgets that truncated it
+        
+    Raises:
+        ExtractionError: The text could not be extracted
+    """
+    kind = metrics.file_type(file.name)
+    with span('parse'), metrics.EXTRACTION_SECONDS.time(file_type=kind, pages='unknown') as labels:
+        try:
+            if isolated is None:
+                isolated = getattr(settings, 'ATS_EXTRACTION_ISOLATED', False)
+            if isolated:
+                from .extraction_pool import extract_isolated
+                result = extract_isolated(file)
+            else:
+                result = extract_resume_inline(file)
+        except ExtractionError as e:
+            metrics.EXTRACTION_FAILURES.inc(file_type=kind, code=e.code)
+            raise
+        labels['pages'] = metrics.page_bucket(result.page_count)
+        return result
 
 
 def extract_text_from_resume(file) -> str:
@@ -42,15 +204,93 @@ def extract_text_from_resume(file) -> str:
         
     Returns:
         Extracted text as string
+        
+    Raises:
+        ExtractionError: The text could not be extracted
     """
-    filename = file.name.lower()
+    return extract_resume(file).text
+
+
+# Common stop words to exclude from keywords
+STOP_WORDS = frozenset({
+    'the', 'and', 'for', 'with', 'this', 'that', 'from', 'have', 'has',
+    'was', 'were', 'been', 'are', 'will', 'would', 'could', 'should',
+    'can', 'may', 'also', 'into', 'than', 'them', 'these', 'those',
+    'there', 'their', 'about', 'when', 'where', 'which', 'who', 'why',
+    'how', 'what', 'but', 'not', 'your', 'our', 'you', 'they', 'she',
+    'his', 'her', 'him', 'its'
+})
+
+# Keywords are runs of \w characters: punctuation separates words
+_NON_WORD = re.compile(r'[^\w\s]+')
+_WHITESPACE = re.compile(r'\s')
+
+# Text is tokenized in slices of about this many characters, so only one
+# slice's word list is alive at a time instead of the whole document's
+TOKENIZE_CHUNK = 8192
+
+
+def _keyword_tokens(text: str, min_word_length: int = 3) -> Iterator[str]:
+    """Keywords of lowercased text, in order, duplicates included"""
+    return (
+        word for word in _NON_WORD.sub(' ', text).split()
+        if len(word) >= min_word_length and word not in STOP_WORDS
+    )
+
+
+@dataclass(frozen=True)
+class TextAnalysis:
+    """
+    One document tokenized once: the lowercased, whitespace-normalized text
+    and its keyword counts. Keyword sets, skill hits and TF-IDF term
+    counts are all derived from it, so no scorer re-cleans the text.
+    Skills are matched on first access only.
+    """
+    normalized: str
+    token_counts: Dict[str, int]
     
-    if filename.endswith('.pdf'):
-        return extract_text_from_pdf(file)
-    elif filename.endswith('.docx') or filename.endswith('.doc'):
-        return extract_text_from_docx(file)
-    else:
-        return ""
+    @classmethod
+    def of(cls, text: str, min_word_length: int = 3) -> 'TextAnalysis':
+        """
+        Analyze a document in one pass
+        
+        Args:
+            text: Raw or normalized text
+            min_word_length: Minimum length of words kept as keywords
+            
+        Returns:
+            TextAnalysis
+        """
+        lowered = (text or '').lower()
+        pieces = []
+        counts = Counter()
+        start, length = 0, len(lowered)
+        while start < length:
+            end = start + TOKENIZE_CHUNK
+            if end < length:
+                # Cut at whitespace so no word is split across slices
+                boundary = _WHITESPACE.search(lowered, end)
+                end = boundary.start() if boundary else length
+            piece = ' '.join(lowered[start:end].split())
+            if piece:
+                pieces.append(piece)
+                counts.update(_NON_WORD.sub(' ', piece).split())
+            start = end
+        
+        # Filter the distinct words rather than every occurrence
+        for word in [word for word in counts if len(word) < min_word_length or word in STOP_WORDS]:
+            del counts[word]
+        return cls(' '.join(pieces), counts)
+    
+    @cached_property
+    def keywords(self) -> FrozenSet[str]:
+        """Distinct keywords"""
+        return frozenset(self.token_counts)
+    
+    @cached_property
+    def skills(self) -> FrozenSet[str]:
+        """Canonical technical skills mentioned in the text"""
+        return frozenset(get_skill_matcher().find_normalized(self.normalized))
 
 
 def extract_keywords(text: str, min_word_length: int = 3) -> List[str]:
@@ -62,48 +302,30 @@ def extract_keywords(text: str, min_word_length: int = 3) -> List[str]:
         min_word_length: Minimum length of words to consider
         
     Returns:
-        List of extracted keywords
-    """
-    # Remove special characters and convert to lowercase
-    cleaned_text = re.sub(r'[^\w\s]', ' ', text.lower())
-    words = cleaned_text.split()
-    
-    # Common stop words to exclude
-    stop_words = {
-        'the', 'and', 'for', 'with', 'this', 'that', 'from', 'have', 'has',
-        'was', 'were', 'been', 'are', 'will', 'would', 'could', 'should',
-        'can', 'may', 'also', 'into', 'than', 'them', 'these', 'those',
-        'there', 'their', 'about', 'when', 'where', 'which', 'who', 'why',
-        'how', 'what', 'but', 'not', 'your', 'our', 'you', 'they', 'she',
-        'his', 'her', 'him', 'his', 'its'
-    }
-    
-    # Filter meaningful keywords
-    keywords = [
-        word for word in words 
-        if len(word) >= min_word_length and word not in stop_words
-    ]
-    
-    return keywords
+        List of extracted keywords (in order, with repeats)
+    """
+    return list(_keyword_tokens(text.lower(), min_word_length))
 
 
-def calculate_keyword_match_score(resume_text: str, job_text: str) -> float:
+def calculate_keyword_match_score(resume: Union[TextAnalysis, str],
+                                  job: Union['JobProfile', TextAnalysis, str]) -> float:
     """
     Calculate keyword match score between resume and job description
     
     Args:
-        resume_text: Text from resume
-        job_text: Text from job description/requirements
+        resume: TextAnalysis of the resume (raw text is still accepted and tokenized here)
+        job: JobProfile or TextAnalysis of the job (or its raw description/requirements)
         
     Returns:
         Score from 0-100 based on keyword matching
     """
-    if not job_text or not resume_text:
-        return 0.0
+    if isinstance(resume, str):
+        resume = TextAnalysis.of(resume)
+    if isinstance(job, str):
+        job = TextAnalysis.of(job)
     
-    # Extract keywords from both texts
-    job_keywords = set(extract_keywords(job_text))
-    resume_keywords = set(extract_keywords(resume_text))
+    job_keywords = job.keywords
+    resume_keywords = resume.keywords
     
     if not job_keywords:
         return 0.0
@@ -115,6 +337,27 @@ def calculate_keyword_match_score(resume_text: str, job_text: str) -> float:
     return round(match_percentage, 2)
 
 
+DEFAULT_SKILL_TAXONOMY_PATH = os.path.join(os.path.dirname(__file__), 'data', 'skills.json')
+
+_skill_matcher = None
+
+
+def get_skill_matcher() -> SkillMatcher:
+    """
+    Return the process-wide SkillMatcher, compiling the taxonomy on first use
+    
+    The taxonomy file is settings.ATS_SKILL_TAXONOMY_PATH when configured,
+    otherwise the bundled ats/data/skills.json.
+    """
+    global _skill_matcher
+    if _skill_matcher is None:
+        path = DEFAULT_SKILL_TAXONOMY_PATH
+        if settings.configured:
+            path = getattr(settings, 'ATS_SKILL_TAXONOMY_PATH', None) or path
+        _skill_matcher = SkillMatcher.from_file(path)
+    return _skill_matcher
+
+
 def extract_technical_skills(text: str) -> List[str]:
     """
     Extract technical skills from text
@@ -123,120 +366,211 @@ def extract_technical_skills(text: str) -> List[str]:
         text: Text to extract skills from
         
     Returns:
-        List of found technical skills
+        List of found technical skills (canonical names, aliases resolved)
     """
-    # Common technical skills database
-    technical_skills = {
-        # Programming Languages
-        'python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'ruby', 'php',
-        'swift', 'kotlin', 'go', 'rust', 'scala', 'r', 'matlab',
-        
-        # Web Technologies
-        'html', 'css', 'react', 'angular', 'vue', 'node', 'nodejs', 'express',
-        'django', 'flask', 'fastapi', 'spring', 'asp.net', 'rails',
-        
-        # Databases
-        'sql', 'mysql', 'postgresql', 'mongodb', 'oracle', 'redis', 'cassandra',
-        'dynamodb', 'sqlite', 'mariadb',
-        
-        # Cloud & DevOps
-        'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins', 'git', 'github',
-        'gitlab', 'terraform', 'ansible', 'ci/cd', 'linux', 'unix',
-        
-        # Data Science & AI
-        'machine learning', 'deep learning', 'tensorflow', 'pytorch', 'scikit-learn',
-        'pandas', 'numpy', 'data analysis', 'statistics', 'nlp', 'computer vision',
-        
-        # Other Technologies
-        'rest', 'api', 'graphql', 'microservices', 'agile', 'scrum', 'jira',
-        'testing', 'unit testing', 'automation', 'selenium'
-    }
-    
-    text_lower = text.lower()
-    found_skills = []
-    
-    for skill in technical_skills:
-        if skill in text_lower:
-            found_skills.append(skill)
-    
-    return found_skills
+    return list(get_skill_matcher().find(text))
 
 
-def calculate_skill_match_score(resume_skills: List[str], job_skills: List[str]) -> float:
+def calculate_skill_match_score(resume: Union[TextAnalysis, 'StoredTerms', Iterable[str]],
+                                job: Union['JobProfile', TextAnalysis, Iterable[str]]) -> float:
     """
     Calculate skill match score
     
     Args:
-        resume_skills: Skills found in resume
-        job_skills: Skills required in job
+        resume: TextAnalysis (or StoredTerms) of the resume; a plain skill list is still accepted (legacy)
+        job: JobProfile or TextAnalysis of the job; a plain skill list is still accepted (legacy)
         
     Returns:
         Score from 0-100 based on skill matching
     """
+    resume_skills = resume.skills if hasattr(resume, 'skills') else frozenset(resume)
+    job_skills = job.skills if hasattr(job, 'skills') else frozenset(job)
     if not job_skills:
         return 0.0
     
-    matched_skills = set(resume_skills).intersection(set(job_skills))
+    matched_skills = job_skills.intersection(resume_skills)
     score = (len(matched_skills) / len(job_skills)) * 100
     
     return round(score, 2)
 
 
-def calculate_ats_score(resume_file, job_description: str, job_requirements: str = "", 
-                       cover_letter: str = "") -> Dict:
+def normalize_text(text: str) -> str:
+    """Collapse runs of whitespace so stored resume text is compact and stable"""
+    return re.sub(r'\s+', ' ', text or '').strip()
+
+
+def hash_file(file) -> str:
     """
-    Calculate comprehensive ATS score for an applicant
+    Calculate the SHA-256 digest of a resume file's content
     
     Args:
-        resume_file: Django UploadedFile object containing resume
-        job_description: Job description text
-        job_requirements: Job requirements text
+        file: Django File/UploadedFile object
+        
+    Returns:
+        Hex digest string; the file is rewound afterwards
+    """
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def analyze_text(resume_text: str, cover_letter: str = "") -> TextAnalysis:
+    """
+    Analyze candidate text once for scoring
+    
+    Args:
+        resume_text: Extracted (normalized) resume text
+        cover_letter: Applicant's cover letter text
+        
+    Returns:
+        TextAnalysis of resume + cover letter, with its skills already matched
+    """
+    analysis = TextAnalysis.of(f"{resume_text}\n{cover_letter}")
+    analysis.skills  # every scorer needs them, so match here rather than on first use
+    return analysis
+
+
+def analyze_resume(resume_file, cover_letter: str = "", content_hash: Optional[str] = None) -> Dict:
+    """
+    Parse a resume file once and build everything needed to score it later
+    
+    Args:
+        resume_file: Django UploadedFile/FieldFile containing the resume
         cover_letter: Applicant's cover letter text
+        content_hash: SHA-256 of the file, if the caller already knows it
         
     Returns:
         Dictionary containing:
-        - overall_score: Final ATS score (0-100)
-        - keyword_score: Keyword match score
-        - skill_score: Technical skill match score
-        - matched_keywords: List of matched keywords
-        - matched_skills: List of matched technical skills
-        - resume_text: Extracted resume text (for reference)
+        - text: Normalized resume text
+        - content_hash: SHA-256 digest of the file content
+        - analysis: TextAnalysis of resume + cover letter
+        - truncated: Extraction budgets that cut the text short, if any
+        - error: ExtractionError.to_dict() if the resume couldn't be read, else None
     """
-    # Extract text from resume
-    resume_text = extract_text_from_resume(resume_file)
+    content_hash = content_hash or hash_file(resume_file)
+    try:
+        extracted = extract_resume(resume_file)
+        error = None
+    except ExtractionError as e:
+        # Still score what we have (the cover letter), and record why the resume is missing
+        extracted = ExtractedText("")
+        error = e.to_dict()
+    text = normalize_text(extracted.text)
     
-    # Combine resume text with cover letter for comprehensive analysis
-    full_candidate_text = f"{resume_text}\n{cover_letter}"
+    return {
+        'text': text,
+        'content_hash': content_hash,
+        'analysis': analyze_text(text, cover_letter),
+        'truncated': list(extracted.truncated),
+        'error': error,
+    }
+
+
+@dataclass(frozen=True)
+class JobProfile:
+    """Pre-tokenized job text, built once per job version and reused for every applicant"""
+    keywords: FrozenSet[str]
+    skills: FrozenSet[str]
+    keyword_weight: float = 0.6
+    skill_weight: float = 0.4
+
+
+@dataclass(frozen=True)
+class StoredTerms:
+    """Keyword and skill lists saved with a ResumeAnalysis, for scoring without the text"""
+    keywords: Iterable[str]
+    skills: Iterable[str]
+
+
+def build_job_profile(job_description: str, job_requirements: str = "") -> JobProfile:
+    """
+    Tokenize a job's description and requirements into a JobProfile
     
+    Args:
+        job_description: Job description text
+        job_requirements: Job requirements text
+        
+    Returns:
+        JobProfile with the job's keyword and skill sets
+    """
     # Combine job description and requirements
-    full_job_text = f"{job_description}\n{job_requirements}"
+    analysis = TextAnalysis.of(f"{job_description}\n{job_requirements}")
+    return JobProfile(keywords=analysis.keywords, skills=analysis.skills)
+
+
+def score_analysis(analysis: Union[TextAnalysis, StoredTerms], job_profile: JobProfile) -> Dict:
+    """
+    Score a resume analysis against a job without touching the file
     
-    # Calculate keyword match score
-    keyword_score = calculate_keyword_match_score(full_candidate_text, full_job_text)
+    Args:
+        analysis: TextAnalysis of resume + cover letter, or its stored terms
+            (StoredTerms, or the ResumeAnalysis row itself)
+        job_profile: JobProfile for the job being applied to
+        
+    Returns:
+        Dictionary with overall_score, keyword_score, skill_score,
+        matched_keywords and matched_skills
+    """
+    matched_keywords = job_profile.keywords.intersection(analysis.keywords)
+    matched_skills = job_profile.skills.intersection(analysis.skills)
     
-    # Extract and match technical skills
-    resume_skills = extract_technical_skills(full_candidate_text)
-    job_skills = extract_technical_skills(full_job_text)
-    skill_score = calculate_skill_match_score(resume_skills, job_skills)
+    # Keyword and skill match percentages against the job's sets
+    keyword_score = 0.0
+    if job_profile.keywords:
+        keyword_score = round(len(matched_keywords) / len(job_profile.keywords) * 100, 2)
+    skill_score = 0.0
+    if job_profile.skills:
+        skill_score = round(len(matched_skills) / len(job_profile.skills) * 100, 2)
     
     # Calculate overall score (weighted average)
-    # 60% keyword matching, 40% skill matching
-    overall_score = round((keyword_score * 0.6) + (skill_score * 0.4), 2)
-    
-    # Find matched keywords and skills
-    job_keywords = set(extract_keywords(full_job_text))
-    resume_keywords = set(extract_keywords(full_candidate_text))
-    matched_keywords = list(job_keywords.intersection(resume_keywords))[:20]  # Top 20
-    
-    matched_skills = list(set(resume_skills).intersection(set(job_skills)))
+    overall_score = round(
+        (keyword_score * job_profile.keyword_weight) + (skill_score * job_profile.skill_weight), 2
+    )
     
     return {
         'overall_score': min(100, overall_score),  # Cap at 100
         'keyword_score': keyword_score,
         'skill_score': skill_score,
-        'matched_keywords': matched_keywords,
-        'matched_skills': matched_skills,
-        'resume_text': resume_text[:500],  # First 500 chars for reference
-        'total_keywords_found': len(resume_keywords),
-        'total_skills_found': len(resume_skills)
+        'matched_keywords': sorted(matched_keywords)[:20],  # Top 20
+        'matched_skills': sorted(matched_skills),
     }
+
+
+def calculate_ats_score(resume_file, job_description: str = "", job_requirements: str = "", 
+                       cover_letter: str = "", job_profile: Optional[JobProfile] = None) -> Dict:
+    """
+    Calculate comprehensive ATS score for an applicant
+    
+    Args:
+        resume_file: Django UploadedFile object containing resume
+        job_description: Job description text
+        job_requirements: Job requirements text
+        cover_letter: Applicant's cover letter text
+        job_profile: Precompiled JobProfile; when given, the job texts are ignored
+        
+    Returns:
+        Dictionary containing:
+        - overall_score: Final ATS score (0-100)
+        - keyword_score: Keyword match score
+        - skill_score: Technical skill match score
+        - matched_keywords: List of matched keywords
+        - matched_skills: List of matched technical skills
+        - resume_text: Extracted resume text (for reference)
+    """
+    with span('score'), metrics.SCORE_SECONDS.time():
+        if job_profile is None:
+            job_profile = build_job_profile(job_description, job_requirements)
+        
+        parsed = analyze_resume(resume_file, cover_letter)
+        analysis = parsed['analysis']
+        result = score_analysis(analysis, job_profile)
+    
+    result.update({
+        'resume_text': parsed['text'][:500],  # First 500 chars for reference
+        'total_keywords_found': len(analysis.keywords),
+        'total_skills_found': len(analysis.skills)
+    })
+    return result
@@ -1,74 +1,89 @@
 """
 Email service module for sending notifications to applicants.
 Handles both application confirmations and status update notifications.
+
+Emails are not sent inside the request: they are written to the
+OutboundEmail outbox in the same transaction as the change that triggers
+them, and `manage.py deliver_emails` drains the outbox over a single
+reused SMTP connection.
 """
 
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
+import logging
+from datetime import timedelta
+
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.conf import settings
+from django.utils import timezone
+
+from . import metrics
+from .instrumentation import span
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
 
 
-def send_application_confirmation_email(applicant_data, job_title, applicant_email):
+def build_application_confirmation_email(applicant_name, job_title):
     """
-    Send confirmation email when applicant submits application.
+    Build the confirmation email sent when applicant submits application.
     
     Args:
-        applicant_data: Dict with applicant info (name, email, etc.)
+        applicant_name: Name of the applicant
         job_title: Title of the job position
-        applicant_email: Email address of the applicant
-    """
-    try:
-        subject = f'Application Received - {job_title} Position'
-        
-        context = {
-            'applicant_name': applicant_data.get('name', 'Applicant'),
-            'job_title': job_title,
-            'company_name': 'CodeVanta',
-        }
         
-        # HTML email body
-        html_message = f"""
-        <html>
-            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                    <div style="border-bottom: 3px solid #3b82f6; padding-bottom: 20px; margin-bottom: 30px;">
-                        <h1 style="color: #3b82f6; margin: 0;">CodeVanta</h1>
-                        <p style="color: #666; margin: 5px 0 0 0;">Talent Acquisition System</p>
-                    </div>
-                    
-                    <h2>Thank You for Your Application!</h2>
-                    
-                    <p>Dear {context['applicant_name']},</p>
-                    
-                    <p>We have successfully received your application for the <strong>{context['job_title']}</strong> position at {context['company_name']}.</p>
-                    
-                    <div style="background-color: #f3f4f6; padding: 15px; border-left: 4px solid #3b82f6; margin: 20px 0;">
-                        <h3 style="margin-top: 0; color: #3b82f6;">What Happens Next?</h3>
-                        <ul style="margin: 10px 0; padding-left: 20px;">
-                            <li>Our recruitment team will review your application</li>
-                            <li>We will assess your qualifications and experience</li>
-                            <li>If there's a match, we'll contact you for an interview</li>
-                            <li>You can expect to hear back from us within 1-2 weeks</li>
-                        </ul>
-                    </div>
-                    
-                    <p>If you have any questions about your application, feel free to reach out to us at <strong>careers@codevanta.com</strong>.</p>
-                    
-                    <p>Best regards,<br/>
-                    <strong>CodeVanta Recruitment Team</strong></p>
-                    
-                    <hr style="border: none; border-top: 1px solid #ddd; margin: 30px 0;">
-                    
-                    <p style="font-size: 12px; color: #999; text-align: center;">
-                        This is an automated email. Please do not reply to this message.
-                    </p>
+    Returns:
+        Dict with subject, plain text message and html_message
+    """
+    subject = f'Application Received - {job_title} Position'
+    
+    context = {
+        'applicant_name': applicant_name or 'Applicant',
+        'job_title': job_title,
+        'company_name': 'CodeVanta',
+    }
+    
+    # HTML email body
+    html_message = f"""
+    <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                <div style="border-bottom: 3px solid #3b82f6; padding-bottom: 20px; margin-bottom: 30px;">
+                    <h1 style="color: #3b82f6; margin: 0;">CodeVanta</h1>
+                    <p style="color: #666; margin: 5px 0 0 0;">Talent Acquisition System</p>
                 </div>
-            </body>
-        </html>
-        """
-        
-        # Plain text fallback
-        message = f"""
+                
+                <h2>Thank You for Your Application!</h2>
+                
+                <p>Dear {context['applicant_name']},</p>
+                
+                <p>We have successfully received your application for the <strong>{context['job_title']}</strong> position at {context['company_name']}.</p>
+                
+                <div style="background-color: #f3f4f6; padding: 15px; border-left: 4px solid #3b82f6; margin: 20px 0;">
+                    <h3 style="margin-top: 0; color: #3b82f6;">What Happens Next?</h3>
+                    <ul style="margin: 10px 0; padding-left: 20px;">
+                        <li>Our recruitment team will review your application</li>
+                        <li>We will assess your qualifications and experience</li>
+                        <li>If there's a match, we'll contact you for an interview</li>
+                        <li>You can expect to hear back from us within 1-2 weeks</li>
+                    </ul>
+                </div>
+                
+                <p>If you have any questions about your application, feel free to reach out to us at <strong>careers@codevanta.com</strong>.</p>
+                
+                <p>Best regards,<br/>
+                <strong>CodeVanta Recruitment Team</strong></p>
+                
+                <hr style="border: none; border-top: 1px solid #ddd; margin: 30px 0;">
+                
+                <p style="font-size: 12px; color: #999; text-align: center;">
+                    This is an automated email. Please do not reply to this message.
+                </p>
+            </div>
+        </body>
+    </html>
+    """
+    
+    # Plain text fallback
+    message = f"""
 Dear {context['applicant_name']},
 
 Thank you for your application!
@@ -81,106 +96,91 @@ If you have any questions, please contact us at careers@codevanta.com.
 
 Best regards,
 CodeVanta Recruitment Team
-        """
-        
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.EMAIL_HOST_USER,
-            recipient_list=[applicant_email],
-            html_message=html_message,
-            fail_silently=False,
-        )
-        
-        return {
-            'success': True,
-            'message': 'Confirmation email sent successfully'
-        }
-        
-    except Exception as e:
-        print(f"Error sending application confirmation email: {str(e)}")
-        return {
-            'success': False,
-            'error': str(e)
-        }
-
+    """
+    
+    return {
+        'subject': subject,
+        'message': message,
+        'html_message': html_message,
+    }
 
-def send_status_update_email(applicant_name, applicant_email, job_title, new_status, notes=''):
+def build_status_update_email(applicant_name, job_title, new_status, notes=''):
     """
-    Send status update email when applicant status is changed.
+    Build the email sent when applicant status is changed.
     
     Args:
         applicant_name: Name of the applicant
-        applicant_email: Email address of the applicant
         job_title: Title of the job position
         new_status: New status (new, reviewed, shortlisted, rejected, hired)
         notes: Optional notes from recruiter
-    """
-    try:
-        # Status-specific messaging
-        status_messages = {
-            'new': 'Your application has been received',
-            'reviewed': 'Your application is being reviewed',
-            'shortlisted': 'Congratulations! You have been shortlisted',
-            'rejected': 'Thank you for applying, but we decided to move forward with other candidates',
-            'hired': 'Congratulations! You have been selected for this position',
-        }
-        
-        status_message = status_messages.get(new_status, 'Your application status has been updated')
-        
-        # Status colors for HTML
-        status_colors = {
-            'new': '#3b82f6',  # blue
-            'reviewed': '#8b5cf6',  # purple
-            'shortlisted': '#10b981',  # green
-            'rejected': '#ef4444',  # red
-            'hired': '#06b6d4',  # cyan
-        }
-        
-        color = status_colors.get(new_status, '#3b82f6')
-        
-        subject = f'Application Status Update - {job_title} Position'
         
-        # HTML email body
-        html_message = f"""
-        <html>
-            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                    <div style="border-bottom: 3px solid #3b82f6; padding-bottom: 20px; margin-bottom: 30px;">
-                        <h1 style="color: #3b82f6; margin: 0;">CodeVanta</h1>
-                        <p style="color: #666; margin: 5px 0 0 0;">Talent Acquisition System</p>
-                    </div>
-                    
-                    <h2>Application Status Update</h2>
-                    
-                    <p>Dear {applicant_name},</p>
-                    
-                    <div style="background-color: #f9fafb; padding: 20px; border-left: 4px solid {color}; margin: 20px 0; border-radius: 4px;">
-                        <h3 style="margin-top: 0; color: {color};">Status: <strong>{new_status.upper()}</strong></h3>
-                        <p style="margin: 0;">{status_message}</p>
-                    </div>
-                    
-                    <p><strong>Position:</strong> {job_title}</p>
-                    
-                    {f'<div style="background-color: #f3f4f6; padding: 15px; margin: 20px 0; border-radius: 4px;"><strong>Recruiter Notes:</strong><p>{notes}</p></div>' if notes else ''}
-                    
-                    <p>If you have any questions or need further information, please don't hesitate to reach out to us at <strong>careers@codevanta.com</strong>.</p>
-                    
-                    <p>Best regards,<br/>
-                    <strong>CodeVanta Recruitment Team</strong></p>
-                    
-                    <hr style="border: none; border-top: 1px solid #ddd; margin: 30px 0;">
-                    
-                    <p style="font-size: 12px; color: #999; text-align: center;">
-                        This is an automated email. Please do not reply to this message.
-                    </p>
+    Returns:
+        Dict with subject, plain text message and html_message
+    """
+    # Status-specific messaging
+    status_messages = {
+        'new': 'Your application has been received',
+        'reviewed': 'Your application is being reviewed',
+        'shortlisted': 'Congratulations! You have been shortlisted',
+        'rejected': 'Thank you for applying, but we decided to move forward with other candidates',
+        'hired': 'Congratulations! You have been selected for this position',
+    }
+    
+    status_message = status_messages.get(new_status, 'Your application status has been updated')
+    
+    # Status colors for HTML
+    status_colors = {
+        'new': '#3b82f6',  # blue
+        'reviewed': '#8b5cf6',  # purple
+        'shortlisted': '#10b981',  # green
+        'rejected': '#ef4444',  # red
+        'hired': '#06b6d4',  # cyan
+    }
+    
+    color = status_colors.get(new_status, '#3b82f6')
+    
+    subject = f'Application Status Update - {job_title} Position'
+    
+    # HTML email body
+    html_message = f"""
+    <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                <div style="border-bottom: 3px solid #3b82f6; padding-bottom: 20px; margin-bottom: 30px;">
+                    <h1 style="color: #3b82f6; margin: 0;">CodeVanta</h1>
+                    <p style="color: #666; margin: 5px 0 0 0;">Talent Acquisition System</p>
                 </div>
-            </body>
-        </html>
-        """
-        
-        # Plain text fallback
-        message = f"""
+                
+                <h2>Application Status Update</h2>
+                
+                <p>Dear {applicant_name},</p>
+                
+                <div style="background-color: #f9fafb; padding: 20px; border-left: 4px solid {color}; margin: 20px 0; border-radius: 4px;">
+                    <h3 style="margin-top: 0; color: {color};">Status: <strong>{new_status.upper()}</strong></h3>
+                    <p style="margin: 0;">{status_message}</p>
+                </div>
+                
+                <p><strong>Position:</strong> {job_title}</p>
+                
+                {f'<div style="background-color: #f3f4f6; padding: 15px; margin: 20px 0; border-radius: 4px;"><strong>Recruiter Notes:</strong><p>{notes}</p></div>' if notes else ''}
+                
+                <p>If you have any questions or need further information, please don't hesitate to reach out to us at <strong>careers@codevanta.com</strong>.</p>
+                
+                <p>Best regards,<br/>
+                <strong>CodeVanta Recruitment Team</strong></p>
+                
+                <hr style="border: none; border-top: 1px solid #ddd; margin: 30px 0;">
+                
+                <p style="font-size: 12px; color: #999; text-align: center;">
+                    This is an automated email. Please do not reply to this message.
+                </p>
+            </div>
+        </body>
+    </html>
+    """
+    
+    # Plain text fallback
+    message = f"""
 Dear {applicant_name},
 
 We're writing to update you on your application for the {job_title} position.
@@ -194,25 +194,195 @@ If you have any questions, please contact us at careers@codevanta.com.
 
 Best regards,
 CodeVanta Recruitment Team
-        """
+    """
+    
+    return {
+        'subject': subject,
+        'message': message,
+        'html_message': html_message,
+    }
+
+
+def queue_email(to_email, content):
+    """
+    Write an email to the outbox.
+    
+    Args:
+        to_email: Recipient address
+        content: Dict from one of the build_* functions
         
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.EMAIL_HOST_USER,
-            recipient_list=[applicant_email],
-            html_message=html_message,
-            fail_silently=False,
-        )
+    Returns:
+        The queued OutboundEmail
+    """
+    return OutboundEmail.objects.create(
+        to_email=to_email,
+        subject=content['subject'],
+        body=content['message'],
+        html_body=content['html_message'],
+    )
+
+
+def queue_application_confirmation_email(applicant_data, job_title, applicant_email):
+    """
+    Queue confirmation email when applicant submits application.
+    
+    Args:
+        applicant_data: Dict with applicant info (name, email, etc.)
+        job_title: Title of the job position
+        applicant_email: Email address of the applicant
+    """
+    content = build_application_confirmation_email(applicant_data.get('name'), job_title)
+    return queue_email(applicant_email, content)
+
+
+def queue_status_update_email(applicant_name, applicant_email, job_title, new_status, notes=''):
+    """
+    Queue status update email when applicant status is changed.
+    
+    Args:
+        applicant_name: Name of the applicant
+        applicant_email: Email address of the applicant
+        job_title: Title of the job position
+        new_status: New status (new, reviewed, shortlisted, rejected, hired)
+        notes: Optional notes from recruiter
+    """
+    content = build_status_update_email(applicant_name, job_title, new_status, notes)
+    return queue_email(applicant_email, content)
+
+
+def queue_status_update_emails(recipients, new_status, notes=''):
+    """
+    Queue status update emails for many applicants with a single bulk insert.
+    
+    Args:
+        recipients: Iterable of (applicant_name, applicant_email, job_title)
+        new_status: New status (new, reviewed, shortlisted, rejected, hired)
+        notes: Optional notes from recruiter
         
-        return {
-            'success': True,
-            'message': 'Status update email sent successfully'
-        }
+    Returns:
+        Number of emails queued
+    """
+    emails = []
+    for applicant_name, applicant_email, job_title in recipients:
+        content = build_status_update_email(applicant_name, job_title, new_status, notes)
+        emails.append(OutboundEmail(
+            to_email=applicant_email,
+            subject=content['subject'],
+            body=content['message'],
+            html_body=content['html_message'],
+        ))
+    OutboundEmail.objects.bulk_create(emails, batch_size=500)
+    return len(emails)
+
+
+def claim_emails(worker_id, limit=50, stale_after=600):
+    """
+    Atomically claim up to `limit` due outbox rows for a delivery worker.
+    
+    Returns:
+        List of claimed OutboundEmail instances
+    """
+    now = timezone.now()
+    OutboundEmail.objects.filter(
+        status='sending', locked_at__lt=now - timedelta(seconds=stale_after)
+    ).update(status='queued', locked_by='')
+    
+    candidate_ids = list(
+        OutboundEmail.objects.filter(status='queued', run_after__lte=now)
+        .order_by('run_after', 'id')
+        .values_list('id', flat=True)[:limit]
+    )
+    if not candidate_ids:
+        return []
+    
+    OutboundEmail.objects.filter(id__in=candidate_ids, status='queued').update(
+        status='sending', locked_by=worker_id, locked_at=now
+    )
+    return list(
+        OutboundEmail.objects.filter(id__in=candidate_ids, status='sending', locked_by=worker_id)
+        .order_by('id')
+    )
+
+
+def deliver_outbox(worker_id, batch_size=50, connection=None):
+    """
+    Send one batch of queued emails over a single mail connection.
+    
+    The connection is opened once for the whole batch. Each message is
+    handed to it separately, and marked sent as soon as it is accepted, so
+    one rejected recipient doesn't hide which of the others were delivered
+    and a worker crash never resends them. Failures are retried with
+    exponential backoff and dead-lettered after ATS_EMAIL_MAX_ATTEMPTS.
+    
+    Args:
+        worker_id: Identifier stored on claimed rows
+        batch_size: Maximum emails to send
+        connection: Optional mail backend connection (defaults to EMAIL_BACKEND)
         
+    Returns:
+        Tuple of (sent, failed) counts
+    """
+    emails = claim_emails(worker_id, limit=batch_size)
+    if not emails:
+        return 0, 0
+    
+    max_attempts = getattr(settings, 'ATS_EMAIL_MAX_ATTEMPTS', 5)
+    connection = connection or get_connection(fail_silently=False)
+    sent = failed = 0
+    
+    try:
+        with span('email'):
+            connection.open()
     except Exception as e:
-        print(f"Error sending status update email: {str(e)}")
-        return {
-            'success': False,
-            'error': str(e)
-        }
+        logger.exception("Error opening email connection; %s emails released for retry", len(emails))
+        metrics.EMAIL_FAILURES.inc(len(emails), reason='connect')
+        # Nothing was attempted: release the batch without spending an attempt,
+        # but not for immediate reclaiming while the server is down
+        OutboundEmail.objects.filter(id__in=[email.id for email in emails]).update(
+            status='queued', locked_by='', last_error=str(e),
+            run_after=timezone.now() + timedelta(seconds=60)
+        )
+        return 0, len(emails)
+    
+    try:
+        for email in emails:
+            message = EmailMultiAlternatives(
+                subject=email.subject,
+                body=email.body,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[email.to_email],
+                connection=connection,
+            )
+            if email.html_body:
+                message.attach_alternative(email.html_body, 'text/html')
+            
+            try:
+                with span('email'), metrics.EMAIL_SEND_SECONDS.time(outcome='sent') as labels:
+                    try:
+                        connection.send_messages([message])
+                    except Exception:
+                        labels['outcome'] = 'failed'
+                        raise
+            except Exception as e:
+                metrics.EMAIL_FAILURES.inc(reason='send')
+                failed += 1
+                attempts = email.attempts + 1
+                logger.exception("Error sending email %s (attempt %s of %s)", email.id, attempts, max_attempts)
+                if attempts >= max_attempts:
+                    OutboundEmail.objects.filter(pk=email.pk).update(
+                        status='dead', attempts=attempts, last_error=str(e), locked_by=''
+                    )
+                else:
+                    OutboundEmail.objects.filter(pk=email.pk).update(
+                        status='queued', attempts=attempts, last_error=str(e), locked_by='',
+                        run_after=timezone.now() + timedelta(seconds=60 * 2 ** (attempts - 1))
+                    )
+            else:
+                OutboundEmail.objects.filter(pk=email.pk).update(
+                    status='sent', sent_at=timezone.now(), locked_by='', last_error=''
+                )
+                sent += 1
+    finally:
+        connection.close()
+    
+    return sent, failed
@@ -0,0 +1,113 @@
+"""
+Streaming applicant exports.
+Rows are read with a server-side cursor and only the exported columns,
+and written to the response as they are produced, so memory stays flat
+and the first byte goes out immediately however large the result is.
+"""
+
+import csv
+import io
+import json
+import zlib
+
+from django.db.models.functions import Substr
+from django.http import StreamingHttpResponse
+
+from .models import STATUS_CHOICES
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'applicants.csv'),
+    'jsonl': ('application/x-ndjson', 'applicants.jsonl'),
+}
+
+CSV_HEADER = ['Name', 'Email', 'Phone', 'Job', 'Status', 'Cover Letter Excerpt', 'Created At', 'Match Score']
+
+EXCERPT_LENGTH = 100
+
+
+def _export_rows(queryset, chunk_size):
+    """Yield (name, email, phone, job, status label, excerpt, created_at, score) tuples"""
+    status_labels = dict(STATUS_CHOICES)
+    # Fetch one character past the excerpt so we know whether to add an ellipsis
+    rows = queryset.annotate(
+        cover_excerpt=Substr('cover_letter', 1, EXCERPT_LENGTH + 1)
+    ).values_list(
+        'name', 'email', 'phone', 'job__title', 'status', 'cover_excerpt', 'created_at', 'match_score'
+    ).iterator(chunk_size=chunk_size)
+    
+    for name, email, phone, job_title, status, excerpt, created_at, match_score in rows:
+        excerpt = excerpt or ''
+        if len(excerpt) > EXCERPT_LENGTH:
+            excerpt = excerpt[:EXCERPT_LENGTH] + '...'
+        yield name, email, phone, job_title, status_labels.get(status, status), excerpt, created_at, match_score
+
+
+def _csv_chunks(rows, rows_per_chunk):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+    count = 0
+    for row in rows:
+        writer.writerow(row[:6] + (row[6].strftime('%Y-%m-%d %H:%M'), row[7]))
+        count += 1
+        if count % rows_per_chunk == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _jsonl_chunks(rows, rows_per_chunk):
+    lines = []
+    for name, email, phone, job_title, status, excerpt, created_at, match_score in rows:
+        lines.append(json.dumps({
+            'name': name,
+            'email': email,
+            'phone': phone,
+            'job': job_title,
+            'status': status,
+            'cover_letter_excerpt': excerpt,
+            'created_at': created_at.isoformat(),
+            'match_score': match_score,
+        }))
+        if len(lines) >= rows_per_chunk:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def _gzip_chunks(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 writes a gzip header
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_applicant_export(queryset, export_format='csv', use_gzip=False, chunk_size=2000):
+    """
+    Build a streaming export response for an applicant queryset.
+    
+    Args:
+        queryset: Filtered/ordered Applicant queryset
+        export_format: 'csv' or 'jsonl'
+        use_gzip: Compress the body with Content-Encoding: gzip
+        chunk_size: Rows fetched per database round trip
+        
+    Returns:
+        StreamingHttpResponse
+    """
+    content_type, filename = EXPORT_FORMATS[export_format]
+    chunk_writer = _csv_chunks if export_format == 'csv' else _jsonl_chunks
+    chunks = chunk_writer(_export_rows(queryset, chunk_size), rows_per_chunk=500)
+    
+    if use_gzip:
+        response = StreamingHttpResponse(_gzip_chunks(chunks), content_type=content_type)
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['Vary'] = 'Accept-Encoding'
+    return response
@@ -0,0 +1,156 @@
+"""
+Process-isolated resume parsing.
+PyPDF2 and python-docx run in a small pool of pre-started child processes
+with per-job CPU time and address-space limits (via `resource`, where the
+platform has it) and a wall-clock timeout enforced by the parent. Children
+are recycled after ATS_EXTRACTION_MAX_JOBS documents, and a child that
+hangs or dies is killed and the pool rebuilt, so a hostile file costs one
+child process instead of the calling worker.
+"""
+
+import io
+import multiprocessing
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+from .ats_scorer import ExtractionError, extraction_budgets, extract_resume_inline
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, the wall-clock timeout still applies
+    resource = None
+
+_pool = None
+_lock = threading.Lock()
+
+
+class _CPULimitExceeded(Exception):
+    pass
+
+
+def _on_cpu_limit(signum, frame):
+    raise _CPULimitExceeded()
+
+
+def _init_child(memory_bytes):
+    """Pool initializer: cap the child's address space and trap SIGXCPU"""
+    if resource is None:
+        return
+    if memory_bytes:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+    signal.signal(signal.SIGXCPU, _on_cpu_limit)
+
+
+def _set_cpu_budget(seconds):
+    # RLIMIT_CPU counts the child's whole lifetime, so each job gets
+    # "CPU used so far + its budget"; the hard limit stays unlimited
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = int(usage.ru_utime + usage.ru_stime)
+    soft = used + seconds if seconds else resource.RLIM_INFINITY
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, resource.RLIM_INFINITY))
+
+
+def _extract_in_child(content, filename, budgets, cpu_seconds):
+    """Pool entry point: parse one document under the CPU budget"""
+    if resource is not None:
+        _set_cpu_budget(cpu_seconds)
+    buffer = io.BytesIO(content)
+    buffer.name = filename
+    try:
+        return extract_resume_inline(buffer, *budgets)
+    except _CPULimitExceeded:
+        raise ExtractionError('cpu_limit', f"exceeded {cpu_seconds}s of CPU time")
+    except MemoryError:
+        raise ExtractionError('memory_limit', "exceeded the extraction memory limit")
+    finally:
+        if resource is not None:
+            _set_cpu_budget(0)
+
+
+def _noop():
+    return None
+
+
+def get_pool():
+    """Return the shared extraction pool, starting its children if needed"""
+    global _pool
+    with _lock:
+        if _pool is None:
+            workers = getattr(settings, 'ATS_EXTRACTION_WORKERS', 1)
+            memory_mb = getattr(settings, 'ATS_EXTRACTION_MEMORY_MB', 512)
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_child,
+                initargs=(memory_mb * 1024 * 1024,),
+                max_tasks_per_child=getattr(settings, 'ATS_EXTRACTION_MAX_JOBS', 50),
+            )
+            # Pre-start the children so the first resume doesn't pay for interpreter start-up
+            for future in [_pool.submit(_noop) for _ in range(workers)]:
+                future.result()
+        return _pool
+
+
+def _discard(pool, kill):
+    global _pool
+    with _lock:
+        if _pool is pool:
+            _pool = None
+    if kill:
+        for process in list((pool._processes or {}).values()):
+            process.kill()
+    pool.shutdown(wait=not kill, cancel_futures=True)
+
+
+def shutdown_pool(kill=False):
+    """
+    Stop the extraction pool; the next extraction starts a fresh one.
+
+    Args:
+        kill: Kill the children instead of letting them finish
+    """
+    pool = _pool
+    if pool is not None:
+        _discard(pool, kill)
+
+
+def extract_isolated(file):
+    """
+    Extract resume text in the extraction pool.
+
+    Args:
+        file: Django File/UploadedFile object
+
+    Returns:
+        ExtractedText
+
+    Raises:
+        ExtractionError: Unreadable or unsupported file, or a child that timed
+            out, ran past its CPU/memory limits or crashed
+    """
+    file.seek(0)
+    content = file.read()
+    file.seek(0)
+    budgets = extraction_budgets()
+    cpu_seconds = getattr(settings, 'ATS_EXTRACTION_CPU_SECONDS', 15)
+    timeout = getattr(settings, 'ATS_EXTRACTION_TIMEOUT', 20)
+
+    for attempt in range(2):
+        pool = get_pool()
+        future = pool.submit(_extract_in_child, content, file.name, budgets, cpu_seconds)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # A hung child can't be cancelled, only killed along with its pool
+            _discard(pool, kill=True)
+            raise ExtractionError('timeout', f"no result after {timeout}s")
+        except BrokenProcessPool:
+            # Another thread may have killed the pool under us; try once more on a fresh one
+            if attempt == 0 and pool is not _pool:
+                continue
+            _discard(pool, kill=True)
+            raise ExtractionError('crashed', "extraction process died (killed or out of memory)")
@@ -0,0 +1,172 @@
+"""
+Per-request timing: SQL queries and named stages.
+RequestTimingMiddleware collects, for each request, the number and time
+of SQL queries (through connection.execute_wrapper) and the time spent in
+named spans such as 'parse', 'score', 'email' and 'serialize'. The totals
+go out as a Server-Timing header and one JSON log line on the
+'ats.requests' logger. Query shapes repeated ATS_N_PLUS_ONE_THRESHOLD
+times or more in a request are reported as likely N+1 patterns.
+
+Spans may nest (scoring includes parsing and its own queries), so the
+figures overlap rather than add up to the total.
+"""
+
+import contextvars
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('ats.requests')
+
+_current = contextvars.ContextVar('ats_request_metrics', default=None)
+
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*%s\s*,?)+\)', re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+
+
+def sql_shape(sql):
+    """SQL with literals and IN-list lengths collapsed, to group repeats of one query"""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    return _IN_LIST.sub('IN (...)', sql)
+
+
+class RequestMetrics:
+    """Queries and span timings collected for one request (or other unit of work)"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.finished = None
+        self.query_count = 0
+        self.query_ms = 0.0
+        self.shapes = Counter()
+        self.spans = {}
+        self._open_spans = Counter()
+        self._stack = None
+        self._token = None
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self._record_query))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+        _current.reset(self._token)
+        self.finished = time.perf_counter()
+
+    def _record_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_count += 1
+            self.query_ms += (time.perf_counter() - start) * 1000
+            self.shapes[sql_shape(sql)] += 1
+
+    @property
+    def total_ms(self):
+        return ((self.finished or time.perf_counter()) - self.started) * 1000
+
+    def repeated_queries(self, threshold=None):
+        """Query shapes run at least `threshold` times: likely N+1 loops"""
+        if threshold is None:
+            threshold = getattr(settings, 'ATS_N_PLUS_ONE_THRESHOLD', 10)
+        return [
+            {'sql': shape[:300], 'count': count}
+            for shape, count in self.shapes.most_common() if count >= threshold
+        ]
+
+    def server_timing(self):
+        """Server-Timing header value"""
+        entries = [f'total;dur={self.total_ms:.1f}',
+                   f'db;dur={self.query_ms:.1f};desc="{self.query_count} queries"']
+        for name, (count, elapsed) in self.spans.items():
+            entries.append(f'{name};dur={elapsed:.1f}' + (f';desc="x{count}"' if count > 1 else ''))
+        return ', '.join(entries)
+
+    def as_dict(self):
+        return {
+            'duration_ms': round(self.total_ms, 2),
+            'db_queries': self.query_count,
+            'db_ms': round(self.query_ms, 2),
+            'spans': {name: {'count': count, 'ms': round(elapsed, 2)}
+                      for name, (count, elapsed) in self.spans.items()},
+        }
+
+
+@contextmanager
+def span(name):
+    """
+    Time a named stage of the current request.
+
+    A no-op outside RequestMetrics (e.g. in the background workers). Only
+    the outermost of nested spans with the same name is counted.
+    """
+    metrics = _current.get()
+    if metrics is None or metrics._open_spans[name]:
+        yield
+        return
+    metrics._open_spans[name] += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics._open_spans[name] -= 1
+        count, elapsed = metrics.spans.get(name, (0, 0.0))
+        metrics.spans[name] = (count + 1, elapsed + (time.perf_counter() - start) * 1000)
+
+
+class RequestTimingMiddleware:
+    """
+    Adds Server-Timing to every response and logs one JSON line per request.
+
+    Streaming responses (exports) get a header covering the work done before
+    the first byte; their log line is written once the stream is exhausted,
+    with the queries run while streaming included.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        with metrics:
+            response = self.get_response(request)
+
+        if getattr(settings, 'ATS_SERVER_TIMING', True):
+            response['Server-Timing'] = metrics.server_timing()
+        if response.streaming:
+            response.streaming_content = self._stream(response.streaming_content, metrics, request, response)
+        else:
+            self.log(request, response, metrics)
+        return response
+
+    def _stream(self, content, metrics, request, response):
+        metrics.finished = None
+        with metrics:
+            yield from content
+        self.log(request, response, metrics)
+
+    def log(self, request, response, metrics):
+        if not getattr(settings, 'ATS_REQUEST_LOG', True):
+            return
+        repeated = metrics.repeated_queries()
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            **metrics.as_dict(),
+        }
+        if repeated:
+            record['n_plus_one'] = repeated
+        logger.log(logging.WARNING if repeated else logging.INFO, json.dumps(record))
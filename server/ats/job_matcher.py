@@ -0,0 +1,140 @@
+"""
+Match one resume against every active job.
+Active jobs' profiles are folded into an inverted index (term -> jobs
+that ask for it). Matching walks the resume's keywords and skills through
+the index, so the cost grows with the resume's terms and the jobs that
+share them, not with jobs x job text. Scores are identical to
+`score_analysis` for each job.
+"""
+
+import threading
+from collections import defaultdict
+
+from .ats_scorer import analyze_text, extract_resume, normalize_text
+from .job_profiles import get_job_profile
+from .models import Job
+from .public_cache import jobs_validator
+from .resume_storage import resume_digest
+from .scoring_service import cached_extraction
+
+_index = None
+_lock = threading.Lock()
+
+
+class JobIndex:
+    """Inverted index over the keyword and skill sets of a group of jobs"""
+
+    def __init__(self, jobs):
+        """
+        Args:
+            jobs: Iterable of (job, JobProfile)
+        """
+        self.jobs = {}
+        self.keyword_postings = defaultdict(list)
+        self.skill_postings = defaultdict(list)
+        for job, profile in jobs:
+            self.jobs[job.pk] = (job.title, profile)
+            for keyword in profile.keywords:
+                self.keyword_postings[keyword].append(job.pk)
+            for skill in profile.skills:
+                self.skill_postings[skill].append(job.pk)
+
+    def match(self, resume_keywords, resume_skills, limit=10):
+        """
+        Score a resume against every indexed job it shares a term with.
+
+        Args:
+            resume_keywords: Keywords extracted from resume + cover letter
+            resume_skills: Technical skills extracted from resume + cover letter
+            limit: Maximum matches to return
+
+        Returns:
+            List of match dicts, best overall_score first
+        """
+        matched_keywords = defaultdict(list)
+        matched_skills = defaultdict(list)
+        for keyword in set(resume_keywords):
+            for job_id in self.keyword_postings.get(keyword, ()):
+                matched_keywords[job_id].append(keyword)
+        for skill in set(resume_skills):
+            for job_id in self.skill_postings.get(skill, ()):
+                matched_skills[job_id].append(skill)
+
+        matches = []
+        for job_id in matched_keywords.keys() | matched_skills.keys():
+            title, profile = self.jobs[job_id]
+            keywords, skills = matched_keywords[job_id], matched_skills[job_id]
+            # Same arithmetic as score_analysis, from the posting hits
+            keyword_score = round(len(keywords) / len(profile.keywords) * 100, 2) if keywords else 0.0
+            skill_score = round(len(skills) / len(profile.skills) * 100, 2) if skills else 0.0
+            overall_score = round(
+                keyword_score * profile.keyword_weight + skill_score * profile.skill_weight, 2
+            )
+            matches.append({
+                'job_id': job_id,
+                'job_title': title,
+                'overall_score': min(100, overall_score),
+                'keyword_score': keyword_score,
+                'skill_score': skill_score,
+                'matched_keywords': sorted(keywords)[:20],
+                'matched_skills': sorted(skills),
+            })
+
+        matches.sort(key=lambda match: (-match['overall_score'], match['job_id']))
+        return matches[:limit]
+
+
+def get_job_index():
+    """
+    Return the index over active jobs, rebuilding it when any job changed.
+
+    Costs one validator query per call; profiles come from the job profile
+    cache, so a rebuild only re-tokenizes jobs whose text changed.
+    """
+    global _index
+    validator = jobs_validator()
+    with _lock:
+        if _index is not None and _index[0] == validator:
+            return _index[1]
+
+    jobs = Job.objects.filter(is_active=True).only('id', 'title', 'description', 'requirements', 'updated_at')
+    index = JobIndex((job, get_job_profile(job)) for job in jobs)
+    with _lock:
+        _index = (validator, index)
+    return index
+
+
+def match_text(resume_text, cover_letter="", limit=10):
+    """
+    Rank active jobs for a resume's text.
+
+    Args:
+        resume_text: Text extracted from the resume
+        cover_letter: Optional cover letter text
+        limit: Maximum matches to return
+
+    Returns:
+        List of match dicts, best first
+    """
+    analysis = analyze_text(normalize_text(resume_text), cover_letter)
+    return get_job_index().match(analysis.keywords, analysis.skills, limit)
+
+
+def match_analysis(analysis, limit=10):
+    """Rank active jobs for a stored ResumeAnalysis (no re-parsing)"""
+    return get_job_index().match(analysis.keywords, analysis.skills, limit)
+
+
+def match_resume(resume_file, cover_letter="", limit=10, isolated=None):
+    """
+    Parse a resume once (or reuse the text cached for its digest) and rank active jobs.
+
+    Args:
+        isolated: Parse in the extraction pool regardless of ATS_EXTRACTION_ISOLATED
+
+    Raises:
+        ExtractionError: The resume could not be read
+    """
+    cached = cached_extraction(resume_digest(resume_file))
+    text = cached['text'] if cached else extract_resume(resume_file, isolated=isolated).text
+    return match_text(text, cover_letter, limit)
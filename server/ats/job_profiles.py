@@ -0,0 +1,76 @@
+"""
+In-process cache of precompiled JobProfiles.
+Entries are keyed by Job.id and invalidated when Job.updated_at changes,
+so a posting's text is tokenized once per version rather than once per applicant.
+"""
+
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .ats_scorer import build_job_profile
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def _max_size():
+    return getattr(settings, 'ATS_JOB_PROFILE_CACHE_SIZE', 256)
+
+
+def get_job_profile(job):
+    """
+    Return the cached JobProfile for a job, building it on a miss.
+    
+    Args:
+        job: Job instance
+        
+    Returns:
+        JobProfile for the job's current description and requirements
+    """
+    with _lock:
+        entry = _cache.get(job.pk)
+        if entry is not None and entry[0] == job.updated_at:
+            _cache.move_to_end(job.pk)
+            return entry[1]
+    
+    profile = build_job_profile(job.description, job.requirements or "")
+    
+    with _lock:
+        _cache[job.pk] = (job.updated_at, profile)
+        _cache.move_to_end(job.pk)
+        # Evict least recently used jobs
+        while len(_cache) > _max_size():
+            _cache.popitem(last=False)
+    return profile
+
+
+def invalidate_job_profile(job_id):
+    """Drop a job's cached profile"""
+    with _lock:
+        _cache.pop(job_id, None)
+
+
+def clear_job_profiles():
+    """Drop every cached profile"""
+    with _lock:
+        _cache.clear()
+
+
+def warm_job_profiles():
+    """
+    Precompile profiles for all active jobs.
+    
+    Returns:
+        Number of profiles built
+    """
+    from .models import Job
+    
+    count = 0
+    for job in Job.objects.filter(is_active=True).only(
+        'id', 'description', 'requirements', 'updated_at'
+    ).order_by('-created_at')[:_max_size()]:
+        get_job_profile(job)
+        count += 1
+    return count
@@ -0,0 +1,87 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from ats.ats_scorer import hash_file
+from ats.models import Applicant
+from ats.resume_storage import RESUME_DIR, content_addressed_name, digest_from_name
+
+
+class Command(BaseCommand):
+    help = 'Move existing resumes to content-addressed names, sharing one file per unique content'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report what would change without touching files or rows')
+        parser.add_argument('--keep-originals', action='store_true',
+                            help='Leave the old files in place after repointing applicants')
+        parser.add_argument('--delete-orphans', action='store_true',
+                            help=f'Also delete files directly under {RESUME_DIR}/ that no applicant references')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        storage = Applicant._meta.get_field('resume').storage
+        digests = {}
+        stored = set()
+        moved = missing = reclaimed = 0
+
+        legacy = (
+            Applicant.objects.exclude(resume='').order_by('id')
+            .values_list('id', 'resume', 'resume_name')
+        )
+        for applicant_id, name, resume_name in legacy.iterator(chunk_size=500):
+            if digest_from_name(name):
+                continue
+            if name not in digests:
+                if not storage.exists(name):
+                    missing += 1
+                    self.stderr.write(f"Missing file for applicant {applicant_id}: {name}")
+                    continue
+                with storage.open(name, 'rb') as f:
+                    digest = hash_file(f)
+                target = content_addressed_name(digest, name)
+                if target not in stored and not storage.exists(target):
+                    if not dry_run:
+                        with storage.open(name, 'rb') as f:
+                            target = storage.save(target, f)
+                else:
+                    reclaimed += storage.size(name)
+                digests[name] = target
+                stored.add(target)
+
+            if not dry_run:
+                Applicant.objects.filter(pk=applicant_id).update(
+                    resume=digests[name], resume_name=resume_name or os.path.basename(name)
+                )
+            moved += 1
+
+        removed = 0
+        if not (dry_run or options['keep_originals']):
+            for name in digests:
+                if not Applicant.objects.filter(resume=name).exists():
+                    storage.delete(name)
+                    removed += 1
+
+        orphans = self.find_orphans(storage)
+        if options['delete_orphans'] and not dry_run:
+            for name in orphans:
+                reclaimed += storage.size(name)
+                storage.delete(name)
+
+        prefix = '[dry run] ' if dry_run else ''
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}Repointed {moved} applicants to {len(set(digests.values()))} content-addressed files; "
+            f"removed {removed} old files, {missing} missing, "
+            f"{len(orphans)} unreferenced files{' deleted' if options['delete_orphans'] else ''}; "
+            f"{reclaimed / 1024 / 1024:.1f} MB reclaimed from duplicates"
+        ))
+
+    def find_orphans(self, storage):
+        """Files directly under resumes/ that no applicant points at"""
+        try:
+            _, files = storage.listdir(RESUME_DIR)
+        except FileNotFoundError:
+            return []
+        names = [f"{RESUME_DIR}/{filename}" for filename in files]
+        referenced = set(Applicant.objects.filter(resume__in=names).values_list('resume', flat=True))
+        return [name for name in names if name not in referenced]
@@ -0,0 +1,46 @@
+import os
+import socket
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from ats.email_service import deliver_outbox
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued outbox emails in batches over a reused mail connection'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50,
+                            help='Emails sent per connection')
+        parser.add_argument('--poll-interval', type=float, default=5.0,
+                            help='Seconds to sleep when the outbox is empty')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once nothing more can be delivered')
+    
+    def handle(self, *args, **options):
+        worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.stdout.write(f"Email delivery worker {worker_id} started")
+        total_sent = total_failed = 0
+        try:
+            while True:
+                sent, failed = deliver_outbox(worker_id, batch_size=options['batch_size'])
+                total_sent += sent
+                total_failed += failed
+                if sent or failed:
+                    self.stdout.write(f"Delivered {sent} emails, {failed} failed")
+                # Nothing claimed: the outbox is empty or nothing is due yet
+                if not (sent or failed):
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                elif not sent and not options['once']:
+                    # Back off while the mail server is failing
+                    time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            self.stdout.write("Interrupted, shutting down")
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"Email delivery worker stopped: {total_sent} sent, {total_failed} failed"
+        ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from ats.search import rebuild_index, search_available
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the applicant full-text search index from scratch'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000,
+                            help='Applicants read per database round trip')
+    
+    def handle(self, *args, **options):
+        if not search_available():
+            self.stdout.write(self.style.WARNING(
+                'This database has no supported full-text index; search falls back to substring matching'
+            ))
+            return
+        count = rebuild_index(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} applicants"))
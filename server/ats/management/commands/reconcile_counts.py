@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from ats.rollups import reconcile
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-(job, status) applicant count rollup from the applicant table'
+    
+    def handle(self, *args, **options):
+        drift = reconcile()
+        for (job_id, status), (stored, actual) in sorted(drift.items()):
+            self.stdout.write(f"  job {job_id} / {status}: {stored} -> {actual}")
+        
+        if drift:
+            self.stdout.write(self.style.WARNING(f"Fixed {len(drift)} drifted count(s)"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Counts are consistent"))
@@ -0,0 +1,185 @@
+import hashlib
+import json
+import os
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+
+from ats.job_profiles import get_job_profile
+from ats.models import Applicant, Job, ResumeAnalysis, ScoringTask
+from ats.process_pool import create_pool, score_rows
+
+
+class Command(BaseCommand):
+    help = 'Recompute match scores from stored resume analyses for one job or every applicant'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--job', type=int, help='Only rescore applicants of this job')
+        parser.add_argument('--all', action='store_true', help='Rescore every applicant')
+        parser.add_argument('--workers', type=int, default=settings.ATS_SCORING_WORKERS,
+                            help='Scoring processes; 1 scores in this process')
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Applicants per scoring chunk and bulk update')
+        parser.add_argument('--checkpoint', default=os.path.join(settings.BASE_DIR, '.rescore_checkpoint.json'),
+                            help='File recording progress so an interrupted run can resume')
+        parser.add_argument('--restart', action='store_true',
+                            help='Ignore any saved checkpoint and start from the beginning')
+    
+    def handle(self, *args, **options):
+        if bool(options['job']) == options['all']:
+            raise CommandError('Pass exactly one of --job ID or --all')
+        
+        if options['job']:
+            jobs = Job.objects.filter(pk=options['job'])
+            if not jobs.exists():
+                raise CommandError(f"Job {options['job']} does not exist")
+            scope = f"job-{options['job']}"
+        else:
+            jobs = Job.objects.all()
+            scope = 'all'
+        
+        jobs = list(jobs)
+        profiles = {job.pk: get_job_profile(job) for job in jobs}
+        version = self.profile_version(jobs)
+        checkpoints = self.load_checkpoints(options['checkpoint'])
+        saved = checkpoints.get(scope)
+        last_id = 0
+        if saved and not options['restart']:
+            # Applicants before the checkpoint were scored against these profiles only
+            if isinstance(saved, dict) and saved.get('profiles') == version:
+                last_id = saved['after']
+                self.stdout.write(f"Resuming {scope} after applicant {last_id}")
+            else:
+                self.stdout.write(f"Job text changed since the {scope} checkpoint; starting from the beginning")
+        
+        queryset = Applicant.objects.filter(job_id__in=profiles, id__gt=last_id).order_by('id')
+        rows = queryset.values_list(
+            'id', 'job_id', 'analysis__id', 'analysis__keywords', 'analysis__skills'
+        ).iterator(chunk_size=options['chunk_size'])
+        
+        workers = max(1, options['workers'])
+        pool = None
+        if workers > 1:
+            connections.close_all()
+            pool = create_pool(workers)
+        
+        checkpoint = (scope, version, options['checkpoint'], checkpoints)
+        started = time.perf_counter()
+        scored = queued = 0
+        pending = deque()
+        try:
+            for chunk in self.chunked(rows, options['chunk_size']):
+                # Applicants never analyzed need their file parsed: hand them to the worker queue
+                missing = [row[0] for row in chunk if row[2] is None]
+                chunk = [row for row in chunk if row[2] is not None]
+                if missing:
+                    already_queued = set(ScoringTask.objects.filter(
+                        applicant_id__in=missing, status__in=['queued', 'running']
+                    ).values_list('applicant_id', flat=True))
+                    new_tasks = [
+                        ScoringTask(applicant_id=applicant_id, reparse=True)
+                        for applicant_id in missing if applicant_id not in already_queued
+                    ]
+                    ScoringTask.objects.bulk_create(new_tasks)
+                    queued += len(new_tasks)
+                
+                chunk_last_id = max(chunk[-1][0] if chunk else 0, missing[-1] if missing else 0)
+                chunk_profiles = {job_id: profiles[job_id] for job_id in {row[1] for row in chunk}}
+                if pool:
+                    pending.append((pool.submit(score_rows, chunk, chunk_profiles), chunk_last_id))
+                    # Keep a bounded number of chunks in flight; write back in order
+                    while len(pending) > workers * 2:
+                        scored += self.write_back(pending.popleft(), checkpoint)
+                else:
+                    result = score_rows(chunk, chunk_profiles)
+                    scored += self.save_results(result, chunk_last_id, checkpoint)
+                self.report(scored, started)
+            
+            while pending:
+                scored += self.write_back(pending.popleft(), checkpoint)
+        finally:
+            if pool:
+                pool.shutdown(cancel_futures=True)
+        
+        # Finished cleanly: the next run starts from the beginning
+        checkpoints.pop(scope, None)
+        self.save_checkpoints(options['checkpoint'], checkpoints)
+        
+        elapsed = time.perf_counter() - started
+        rate = scored / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Rescored {scored} applicants in {elapsed:.1f}s ({rate:.0f} applicants/s); "
+            f"queued {queued} without a stored analysis"
+        ))
+    
+    def profile_version(self, jobs):
+        """Digest of the scope's job versions; a profile is rebuilt whenever Job.updated_at changes"""
+        digest = hashlib.sha256()
+        for pk, updated_at in sorted((job.pk, job.updated_at.isoformat()) for job in jobs):
+            digest.update(f"{pk}:{updated_at};".encode())
+        return digest.hexdigest()[:16]
+    
+    def chunked(self, rows, size):
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    
+    def write_back(self, item, checkpoint):
+        future, chunk_last_id = item
+        return self.save_results(future.result(), chunk_last_id, checkpoint)
+    
+    def save_results(self, results, chunk_last_id, checkpoint):
+        now = timezone.now()
+        applicants = []
+        analyses = []
+        for applicant_id, analysis_id, result in results:
+            applicants.append(Applicant(
+                id=applicant_id,
+                match_score=int(result['overall_score']),
+                keywords=", ".join(result['matched_keywords'][:10]),
+                scoring_status='done',
+                updated_at=now,
+            ))
+            analyses.append(ResumeAnalysis(
+                id=analysis_id,
+                keyword_score=result['keyword_score'],
+                skill_score=result['skill_score'],
+            ))
+        
+        with transaction.atomic():
+            Applicant.objects.bulk_update(
+                applicants, ['match_score', 'keywords', 'scoring_status', 'updated_at']
+            )
+            ResumeAnalysis.objects.bulk_update(analyses, ['keyword_score', 'skill_score'])
+        
+        scope, version, checkpoint_path, checkpoints = checkpoint
+        checkpoints[scope] = {'after': chunk_last_id, 'profiles': version}
+        self.save_checkpoints(checkpoint_path, checkpoints)
+        return len(results)
+    
+    def report(self, scored, started):
+        elapsed = time.perf_counter() - started
+        if elapsed:
+            self.stdout.write(f"  {scored} rescored ({scored / elapsed:.0f} applicants/s)")
+    
+    def load_checkpoints(self, path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+    
+    def save_checkpoints(self, path, checkpoints):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(checkpoints, f)
+        os.replace(tmp_path, path)
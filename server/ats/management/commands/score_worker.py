@@ -0,0 +1,71 @@
+import os
+import socket
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from ats.job_profiles import warm_job_profiles
+from ats.process_pool import create_pool, run_scoring_task
+from ats.task_queue import claim_tasks
+
+
+class Command(BaseCommand):
+    help = 'Drain the ATS scoring queue using a pool of worker processes'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=settings.ATS_SCORING_WORKERS,
+                            help='Scoring processes; 1 scores in this process')
+        parser.add_argument('--batch-size', type=int, default=20,
+                            help='Tasks claimed per poll')
+        parser.add_argument('--poll-interval', type=float, default=2.0,
+                            help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--max-tasks-per-child', type=int, default=200,
+                            help='Recycle a scoring process after this many tasks')
+        parser.add_argument('--warm-profiles', action='store_true',
+                            help='Precompile job profiles for active jobs on boot')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once the queue is empty')
+    
+    def handle(self, *args, **options):
+        processes = max(1, options['processes'])
+        worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        
+        warm_profiles = options['warm_profiles'] or settings.ATS_WARM_JOB_PROFILES
+        
+        pool = None
+        if processes > 1:
+            connections.close_all()
+            # The children do the scoring, so they warm their own caches (again after each recycle)
+            pool = create_pool(processes, options['max_tasks_per_child'], warm_profiles=warm_profiles)
+        elif warm_profiles:
+            self.stdout.write(f"Warmed {warm_job_profiles()} job profiles")
+        
+        self.stdout.write(f"Scoring worker {worker_id} started with {processes} process(es)")
+        scored = failed = 0
+        try:
+            while True:
+                task_ids = claim_tasks(worker_id, limit=options['batch_size'])
+                if not task_ids:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+                
+                if pool:
+                    results = list(pool.map(run_scoring_task, task_ids))
+                else:
+                    results = [run_scoring_task(task_id) for task_id in task_ids]
+                
+                scored += results.count(True)
+                failed += results.count(False)
+                self.stdout.write(f"Processed {len(task_ids)} tasks ({scored} scored, {failed} failed so far)")
+        except KeyboardInterrupt:
+            self.stdout.write("Interrupted, shutting down")
+        finally:
+            if pool:
+                pool.shutdown(cancel_futures=True)
+        
+        self.stdout.write(self.style.SUCCESS(f"Scoring worker stopped: {scored} scored, {failed} failed"))
@@ -0,0 +1,334 @@
+"""
+Operational metrics in the Prometheus text format, without a client library.
+Each process keeps its counters and histograms in memory and writes them
+to its own JSON file under ATS_METRICS_DIR at most every
+ATS_METRICS_FLUSH_SECONDS. The /api/metrics/ view sums the files of every
+process, so the totals cover all gunicorn workers and the background
+workers. When a process exits, or when a scrape finds a file whose process
+on this host is gone, that file is folded into aggregate.json and deleted,
+so the counters stay monotonic across worker restarts while the number of
+files stays bounded by the number of live processes.
+"""
+
+import atexit
+import functools
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows keeps every file, as before
+    fcntl = None
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+INF_LABEL = 'le="+Inf"'
+
+AGGREGATE = 'aggregate.json'
+
+_HOST = socket.gethostname()
+
+_values = {}
+_lock = threading.Lock()
+_last_flush = 0.0
+_owner = (None, None)
+
+REGISTRY = {}
+
+
+class Metric:
+    """A counter or histogram with a fixed set of label names"""
+
+    def __init__(self, name, kind, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.kind = kind
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        REGISTRY[name] = self
+
+    def _key(self, labels):
+        return json.dumps([str(labels.get(label, '')) for label in self.labels])
+
+    def inc(self, amount=1, **labels):
+        """Add to a counter"""
+        key = self._key(labels)
+        with _lock:
+            _file_id()
+            series = _values.setdefault(self.name, {})
+            series[key] = series.get(key, 0) + amount
+        _maybe_flush()
+
+    def observe(self, value, **labels):
+        """Record one histogram observation (in seconds for the *_seconds metrics)"""
+        key = self._key(labels)
+        with _lock:
+            _file_id()
+            series = _values.setdefault(self.name, {})
+            # Per-bucket (not cumulative) counts, then sum and count
+            state = series.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+        _maybe_flush()
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the block; labels may be filled in inside it"""
+        start = time.perf_counter()
+        try:
+            yield labels
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+
+EXTRACTION_SECONDS = Metric(
+    'ats_extraction_seconds', 'histogram', 'Resume text extraction time', ('file_type', 'pages'))
+EXTRACTION_FAILURES = Metric(
+    'ats_extraction_failures_total', 'counter', 'Resumes that could not be read', ('file_type', 'code'))
+SCORE_SECONDS = Metric(
+    'ats_score_seconds', 'histogram', 'Time to score one applicant (including parsing when needed)')
+EMAIL_SEND_SECONDS = Metric(
+    'ats_email_send_seconds', 'histogram', 'SMTP send latency per message', ('outcome',))
+EMAIL_FAILURES = Metric(
+    'ats_email_failures_total', 'counter', 'Email sends that failed', ('reason',))
+INTAKE_REQUESTS = Metric(
+    'ats_intake_requests_total', 'counter', 'Public application submissions by response status', ('status',))
+
+
+def page_bucket(pages):
+    """Page counts as a small set of label values"""
+    if not pages:
+        return 'unknown'
+    for limit in (1, 5, 20):
+        if pages <= limit:
+            return '1' if limit == 1 else f'<={limit}'
+    return '>20'
+
+
+def file_type(name):
+    """Upload extension as a label; anything unexpected is 'other' so clients can't add series"""
+    extension = os.path.splitext(name or '')[1].lstrip('.').lower()
+    return extension if extension in ('pdf', 'docx', 'doc') else 'other'
+
+
+def count_responses(metric):
+    """View decorator: count responses by status code (outermost, above @api_view)"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = view(request, *args, **kwargs)
+            metric.inc(status=response.status_code)
+            return response
+        return wrapper
+    return decorator
+
+
+def metrics_dir():
+    return getattr(settings, 'ATS_METRICS_DIR', None) or os.path.join(tempfile.gettempdir(), 'ats-metrics')
+
+
+def _file_id():
+    # A forked worker (gunicorn --preload) must not share, or double count,
+    # the values and file of the process it was forked from
+    global _owner
+    if _owner[0] != os.getpid():
+        _values.clear()
+        _owner = (os.getpid(), f'{_HOST}-{os.getpid()}-{uuid.uuid4().hex[:8]}')
+    return _owner[1]
+
+
+def _write_json(directory, name, data):
+    temp_path = os.path.join(directory, f'.{name}.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(temp_path, os.path.join(directory, name))
+
+
+def _read_json(directory, name):
+    try:
+        with open(os.path.join(directory, name), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _merge(merged, values):
+    for metric, series in values.items():
+        target = merged.setdefault(metric, {})
+        for key, value in series.items():
+            if isinstance(value, list):
+                current = target.setdefault(key, [0] * len(value))
+                target[key] = [a + b for a, b in zip(current, value)]
+            else:
+                target[key] = target.get(key, 0) + value
+    return merged
+
+
+def _is_dead(file_id):
+    """True for a file written by a process on this host that has exited"""
+    parts = file_id.rsplit('-', 2)
+    if len(parts) != 3 or parts[0] != _HOST or not parts[1].isdigit() or int(parts[1]) == os.getpid():
+        return False
+    pid = int(parts[1])
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        # Exists, but owned by another user
+        return False
+    return False
+
+
+def _fold(directory, file_ids):
+    """
+    Add the given process files to the aggregate file and delete them.
+
+    The aggregate lists the files it already holds until they are gone, so
+    a crash between writing it and deleting them can't count them twice.
+    """
+    if fcntl is None or not file_ids:
+        return
+    with open(os.path.join(directory, '.lock'), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        aggregate = _read_json(directory, AGGREGATE) or {'values': {}, 'folded': []}
+        present = {name[:-5] for name in os.listdir(directory) if name.endswith('.json')}
+        folded = set(aggregate['folded']) & present
+        for file_id in file_ids:
+            values = _read_json(directory, f'{file_id}.json')
+            if file_id in folded or values is None:
+                continue
+            _merge(aggregate['values'], values)
+            folded.add(file_id)
+        aggregate['folded'] = sorted(folded)
+        _write_json(directory, AGGREGATE, aggregate)
+        for file_id in folded:
+            try:
+                os.remove(os.path.join(directory, f'{file_id}.json'))
+            except OSError:
+                pass
+
+
+def _maybe_flush():
+    if time.monotonic() - _last_flush >= getattr(settings, 'ATS_METRICS_FLUSH_SECONDS', 1.0):
+        flush()
+
+
+def flush():
+    """Write this process's values to its file (atomically)"""
+    global _last_flush
+    with _lock:
+        _last_flush = time.monotonic()
+        file_id = _file_id()
+        if not _values:
+            return
+        payload = json.dumps(_values)
+    directory = metrics_dir()
+    try:
+        os.makedirs(directory, exist_ok=True)
+        temp_path = os.path.join(directory, f'.{file_id}.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(payload)
+        os.replace(temp_path, os.path.join(directory, f'{file_id}.json'))
+    except OSError:
+        # Metrics must never break the code they observe
+        pass
+
+
+def fold_own_file():
+    """Move this process's values into the aggregate file (at exit)"""
+    global _owner
+    flush()
+    with _lock:
+        file_id = _file_id()
+        # Anything recorded after this starts a new file from zero
+        _owner = (None, None)
+        _values.clear()
+    try:
+        _fold(metrics_dir(), [file_id])
+    except OSError:
+        pass
+
+
+atexit.register(fold_own_file)
+
+
+def collect():
+    """
+    Values summed over every process's file (this one flushed first).
+
+    Returns:
+        {metric name: {label key: value}}
+    """
+    flush()
+    directory = metrics_dir()
+    try:
+        file_ids = [name[:-5] for name in os.listdir(directory) if name.endswith('.json') and name != AGGREGATE]
+        _fold(directory, [file_id for file_id in file_ids if _is_dead(file_id)])
+        file_ids = [name[:-5] for name in os.listdir(directory) if name.endswith('.json') and name != AGGREGATE]
+    except OSError:
+        file_ids = []
+
+    aggregate = _read_json(directory, AGGREGATE) or {'values': {}, 'folded': []}
+    merged = _merge({}, aggregate['values'])
+    for file_id in set(file_ids) - set(aggregate['folded']):
+        values = _read_json(directory, f'{file_id}.json')
+        if values is not None:
+            _merge(merged, values)
+    return merged
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)] + list(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def render(values=None):
+    """Prometheus text exposition (format 0.0.4) of all registered metrics"""
+    values = collect() if values is None else values
+    lines = []
+    for name, metric in REGISTRY.items():
+        lines.append(f'# HELP {name} {metric.documentation}')
+        lines.append(f'# TYPE {name} {metric.kind}')
+        for key, value in sorted(values.get(name, {}).items()):
+            label_values = json.loads(key)
+            if metric.kind == 'counter':
+                lines.append(f'{name}{_labels(metric.labels, label_values)} {value}')
+                continue
+            cumulative = 0
+            for bound, count in zip(metric.buckets, value):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f'{name}_bucket{_labels(metric.labels, label_values, [le])} {cumulative}')
+            lines.append(f'{name}_bucket{_labels(metric.labels, label_values, [INF_LABEL])} {value[-1]}')
+            lines.append(f'{name}_sum{_labels(metric.labels, label_values)} {value[-2]}')
+            lines.append(f'{name}_count{_labels(metric.labels, label_values)} {value[-1]}')
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    """Forget this process's values and delete its file and the aggregate (tests)"""
+    with _lock:
+        _values.clear()
+        file_id = _file_id()
+    for name in (f'{file_id}.json', AGGREGATE):
+        try:
+            os.remove(os.path.join(metrics_dir(), name))
+        except OSError:
+            pass
@@ -1,7 +1,11 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.db.models.functions import Coalesce, Lower
+from django.utils import timezone
 import os
 
+from .resume_storage import dedupe_upload, resume_upload_to
+
 STATUS_CHOICES = [
     ("new", "New"),
     ("reviewed", "Reviewed"),
@@ -10,6 +14,26 @@ STATUS_CHOICES = [
     ("hired", "Hired"),
 ]
 
+SCORING_STATUS_CHOICES = [
+    ("pending", "Pending"),
+    ("done", "Done"),
+    ("failed", "Failed"),
+]
+
+EMAIL_STATUS_CHOICES = [
+    ("queued", "Queued"),
+    ("sending", "Sending"),
+    ("sent", "Sent"),
+    ("dead", "Dead"),
+]
+
+TASK_STATUS_CHOICES = [
+    ("queued", "Queued"),
+    ("running", "Running"),
+    ("done", "Done"),
+    ("failed", "Failed"),
+]
+
 class Recruiter(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     company_name = models.CharField(max_length=200, default="CodeVanta")
@@ -18,6 +42,23 @@ class Recruiter(models.Model):
     def __str__(self):
         return f"{self.user.email} - {self.company_name}"
 
+class JobQuerySet(models.QuerySet):
+    def with_application_counts(self):
+        """
+        Annotate total and per-status applicant counts using one conditional aggregate
+        over the ApplicantStatusCount rollup, so the cost is O(jobs), not O(applicants)
+        """
+        status_counts = {
+            f'applications_{value}': Coalesce(
+                models.Sum('status_rollups__count', filter=models.Q(status_rollups__status=value)), 0
+            )
+            for value, _ in STATUS_CHOICES
+        }
+        return self.annotate(
+            applications_total=Coalesce(models.Sum('status_rollups__count'), 0), **status_counts
+        )
+
+
 class Job(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
@@ -28,36 +69,158 @@ class Job(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = JobQuerySet.as_manager()
+    
     def __str__(self):
         return self.title
     
+    # The count properties read annotations from with_application_counts() when
+    # present and only fall back to reading the rollup for unannotated instances
     @property
     def application_count(self):
-        return self.applicant_set.count()
+        if hasattr(self, 'applications_total'):
+            return self.applications_total
+        return sum(self.status_counts.values())
     
     @property
     def new_applications_count(self):
-        return self.applicant_set.filter(status='new').count()
+        if hasattr(self, 'applications_new'):
+            return self.applications_new
+        return self.status_counts.get('new', 0)
+    
+    @property
+    def status_counts(self):
+        if hasattr(self, 'applications_total'):
+            counts = {value: getattr(self, f'applications_{value}') for value, _ in STATUS_CHOICES}
+        else:
+            counts = dict(self.status_rollups.values_list('status', 'count'))
+        return {value: count for value, count in counts.items() if count}
 
 class Applicant(models.Model):
     name = models.CharField(max_length=200)
     email = models.EmailField()
     phone = models.CharField(max_length=50, blank=True)
-    resume = models.FileField(upload_to='resumes/')
+    resume = models.FileField(upload_to=resume_upload_to)
+    resume_name = models.CharField(max_length=255, blank=True, help_text="Original filename of the uploaded resume")
     cover_letter = models.TextField(blank=True)
     job = models.ForeignKey(Job, on_delete=models.CASCADE)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='new')
     notes = models.TextField(blank=True)
     keywords = models.TextField(blank=True, help_text="Extracted keywords from resume and cover letter")
     match_score = models.IntegerField(default=0, help_text="Match score based on keywords")
+    scoring_status = models.CharField(max_length=20, choices=SCORING_STATUS_CHOICES, default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        # Shaped for the applicant list filters/orderings and the dashboard
+        indexes = [
+            models.Index(fields=['job', 'status', '-created_at'], name='applicant_job_status_created'),
+            models.Index(fields=['job', '-match_score', '-id'], name='applicant_job_score'),
+            models.Index(fields=['status', '-created_at'], name='applicant_status_created'),
+            # (field, id) for every keyset pagination ordering; scores tie a lot
+            models.Index(fields=['-created_at', '-id'], name='applicant_created'),
+            models.Index(fields=['-updated_at', '-id'], name='applicant_updated'),
+            models.Index(fields=['name', 'id'], name='applicant_name'),
+            models.Index(fields=['-match_score', '-id'], name='applicant_score'),
+        ]
+        constraints = [
+            # One application per email per job, enforced by the database
+            models.UniqueConstraint(Lower('email'), 'job', name='unique_applicant_email_per_job'),
+        ]
+    
     def __str__(self):
         return f"{self.name} - {self.job.title}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded (job, status) so the rollup signal can see transitions
+        if 'job_id' in instance.__dict__ and 'status' in instance.__dict__:
+            instance._rollup_key = (instance.job_id, instance.status)
+        return instance
+    
+    def save(self, *args, **kwargs):
+        # Identical resume files are stored once and shared between applications
+        dedupe_upload(self)
+        super().save(*args, **kwargs)
+    
     def get_resume_filename(self):
-        return os.path.basename(self.resume.name)
+        return self.resume_name or os.path.basename(self.resume.name)
+    
+    # Note: ATS scoring runs in the background worker (see task_queue.py)
+    # so resume parsing never happens inside the request
+
+
+class ApplicantStatusCount(models.Model):
+    """Rollup of applicant counts per (job, status), kept current by ats.rollups"""
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='status_rollups')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    count = models.IntegerField(default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'status'], name='unique_job_status_count'),
+        ]
     
-    # Note: ATS scoring is now handled in views.py using ats_scorer.py
-    # This ensures resume file processing happens correctly
\ No newline at end of file
+    def __str__(self):
+        return f"{self.job_id}/{self.status}: {self.count}"
+
+
+class ResumeAnalysis(models.Model):
+    """Extracted resume content and score breakdown, so rescoring never re-parses the file"""
+    applicant = models.OneToOneField(Applicant, on_delete=models.CASCADE, related_name='analysis')
+    text = models.TextField(blank=True, help_text="Normalized text extracted from the resume")
+    content_hash = models.CharField(max_length=64, db_index=True, help_text="SHA-256 of the resume file")
+    truncated = models.CharField(max_length=50, blank=True, help_text="Extraction budgets that cut the text short (pages, chars, time)")
+    extraction_error = models.JSONField(null=True, blank=True, help_text="{code, detail} if the resume could not be read")
+    extracted_at = models.DateTimeField()
+    keywords = models.JSONField(default=list, blank=True)
+    skills = models.JSONField(default=list, blank=True)
+    keyword_score = models.FloatField(default=0)
+    skill_score = models.FloatField(default=0)
+    
+    def __str__(self):
+        return f"Analysis for {self.applicant.name}"
+
+
+class ScoringTask(models.Model):
+    """DB-backed queue entry asking the scoring worker to (re)score an applicant"""
+    applicant = models.ForeignKey(Applicant, on_delete=models.CASCADE, related_name='scoring_tasks')
+    reparse = models.BooleanField(default=True, help_text="Re-extract text from the resume file")
+    status = models.CharField(max_length=20, choices=TASK_STATUS_CHOICES, default='queued')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=64, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        indexes = [models.Index(fields=['status', 'run_after'])]
+    
+    def __str__(self):
+        return f"Scoring task {self.pk} for applicant {self.applicant_id} ({self.status})"
+
+
+class OutboundEmail(models.Model):
+    """Transactional email outbox, written with the change that triggers it and drained by deliver_emails"""
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    status = models.CharField(max_length=20, choices=EMAIL_STATUS_CHOICES, default='queued')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=64, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [models.Index(fields=['status', 'run_after'])]
+    
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email} ({self.status})"
@@ -0,0 +1,170 @@
+"""
+Pagination for the applicant list.
+Page-number pagination stays the default. Passing `?cursor=` (empty for the
+first page) switches to keyset pagination: each page is fetched with a
+WHERE on the last row's (ordering value, id) instead of COUNT(*) + OFFSET.
+Every ordering field has a (field, id) index on Applicant, so deep pages
+cost the same as the first one.
+"""
+
+import base64
+import json
+from collections import OrderedDict
+
+from django.db import connections
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination:
+    """
+    Keyset pagination over one ordering field with id as the tiebreaker.
+
+    The cursor is an opaque token holding the boundary row's
+    (value, id) and the direction to read in.
+    """
+
+    cursor_query_param = 'cursor'
+    ordering_param = 'ordering'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    # Ordering field -> parser for values read back from a cursor
+    ordering_fields = {
+        'created_at': parse_datetime,
+        'updated_at': parse_datetime,
+        'match_score': int,
+        'name': str,
+    }
+    default_ordering = '-created_at'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, page_size):
+        self.page_size = page_size
+
+    def get_ordering(self, request):
+        ordering = request.query_params.get(self.ordering_param, '').split(',')[0].strip()
+        if ordering.lstrip('-') in self.ordering_fields:
+            return ordering
+        return self.default_ordering
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def decode_cursor(self, token, field):
+        try:
+            data = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+            value = self.ordering_fields[field](data['v'])
+            pk, reverse = int(data['i']), bool(data['r'])
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if value is None:
+            raise NotFound(self.invalid_cursor_message)
+        return value, pk, reverse
+
+    def after_row(self, queryset, field, value, pk, descending):
+        """
+        Rows after (value, pk) in the ordering, as one row-value comparison.
+
+        `(field, id) < (value, pk)` is a range condition on the (field, id)
+        index, so the scan starts at the cursor. The equivalent
+        `field < value OR (field = value AND id < pk)` makes the database
+        filter every row tied on the field, which is most of the table for
+        match_score.
+        """
+        connection = connections[queryset.db]
+        quote = connection.ops.quote_name
+        model_field = queryset.model._meta.get_field(field)
+        table = quote(queryset.model._meta.db_table)
+        sql = (f'({table}.{quote(model_field.column)}, {table}.{quote(queryset.model._meta.pk.column)})'
+               f' {"<" if descending else ">"} (%s, %s)')
+        params = (model_field.get_db_prep_value(value, connection), pk)
+        return queryset.filter(RawSQL(sql, params, output_field=BooleanField()))
+
+    def encode_cursor(self, value, pk, reverse):
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        data = json.dumps({'v': value, 'i': pk, 'r': reverse}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        ordering = self.get_ordering(request)
+        self.field = field = ordering.lstrip('-')
+        descending = ordering.startswith('-')
+        page_size = self.get_page_size(request)
+
+        token = request.query_params.get(self.cursor_query_param)
+        reverse = False
+        if token:
+            value, pk, reverse = self.decode_cursor(token, field)
+            # Reading backwards walks the index in the opposite direction
+            queryset = self.after_row(queryset, field, value, pk, descending=descending != reverse)
+
+        if descending != reverse:
+            queryset = queryset.order_by(f'-{field}', '-id')
+        else:
+            queryset = queryset.order_by(field, 'id')
+
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        # Forward pages have a next page when we over-fetched, and a previous
+        # page whenever we started from a cursor; backward pages mirror that
+        self.has_next = has_more if not reverse else bool(token)
+        self.has_previous = bool(token) if not reverse else has_more
+        self.page = rows
+        return rows
+
+    def _link(self, row, reverse):
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, 'page')
+        cursor = self.encode_cursor(getattr(row, self.field), row.pk, reverse)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        if not (self.has_next and self.page):
+            return None
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not (self.has_previous and self.page):
+            return None
+        return self._link(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+
+class ApplicantPagination(PageNumberPagination):
+    """
+    Page numbers by default (with a total count); keyset pagination when the
+    request carries a `cursor` parameter.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if KeysetPagination.cursor_query_param in request.query_params:
+            self.keyset = KeysetPagination(self.get_page_size(request))
+            return self.keyset.paginate_queryset(queryset, request, view)
+        self.keyset = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
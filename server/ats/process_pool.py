@@ -0,0 +1,63 @@
+"""
+Helpers for running ATS work in child processes.
+Children are started with 'spawn' so they never inherit the parent's
+database connections, and set Django up themselves on boot.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def setup_django(warm_profiles=False):
+    """Pool initializer: configure Django in a freshly spawned child"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+    import django
+    django.setup()
+    
+    # Profiles are cached per process, so each child has to build its own
+    if warm_profiles:
+        from .job_profiles import warm_job_profiles
+        warm_job_profiles()
+
+
+def create_pool(processes, max_tasks_per_child=None, warm_profiles=False):
+    """
+    Create a process pool whose children are ready to use the ORM.
+    
+    Args:
+        processes: Number of child processes
+        max_tasks_per_child: Recycle each child after this many tasks
+        warm_profiles: Precompile active job profiles in every child as it starts
+    """
+    return ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=setup_django,
+        initargs=(warm_profiles,),
+        max_tasks_per_child=max_tasks_per_child,
+    )
+
+
+def run_scoring_task(task_id):
+    """Pool entry point for ScoringTask rows (imported lazily, after setup)"""
+    from .task_queue import run_scoring_task as run_task
+    return run_task(task_id)
+
+
+def score_rows(rows, profiles):
+    """
+    Pool entry point for bulk rescoring: score stored analyses in memory.
+    
+    Args:
+        rows: List of (applicant_id, job_id, analysis_id, keywords, skills)
+        profiles: Dict of job_id -> JobProfile
+        
+    Returns:
+        List of (applicant_id, analysis_id, score dict)
+    """
+    from .ats_scorer import StoredTerms, score_analysis
+    return [
+        (applicant_id, analysis_id, score_analysis(StoredTerms(keywords, skills), profiles[job_id]))
+        for applicant_id, job_id, analysis_id, keywords, skills in rows
+    ]
@@ -0,0 +1,103 @@
+"""
+Caching for the anonymous career endpoints.
+Each request costs one validator query (job updated_at / active count),
+which drives ETag and Last-Modified so repeat visitors get a 304. The
+serialized payload is kept in the Django cache alongside the validator it
+was built for, so a stale entry is never served even from another
+worker's local-memory cache, and Job save/delete drops the entries early.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, Q
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from .models import Job
+
+JOBS_KEY = 'ats:public_jobs'
+JOB_KEY = 'ats:public_job:{}'
+
+
+def _timeout():
+    return getattr(settings, 'ATS_PUBLIC_CACHE_TIMEOUT', 300)
+
+
+def _make_etag(*parts):
+    digest = hashlib.md5(':'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return f'"{digest}"'
+
+
+def jobs_validator():
+    """
+    Validator for the public job list.
+
+    The max is taken over all jobs so deactivating one also changes it;
+    the active count catches deletions.
+
+    Returns:
+        Tuple of (etag, last_modified datetime or None)
+    """
+    stats = Job.objects.aggregate(
+        last_modified=Max('updated_at'),
+        active=Count('id', filter=Q(is_active=True)),
+    )
+    last_modified = stats['last_modified']
+    return _make_etag('jobs', last_modified and last_modified.isoformat(), stats['active']), last_modified
+
+
+def job_validator(pk):
+    """
+    Validator for one public job.
+
+    Returns:
+        Tuple of (etag, last_modified), or None if the job isn't public
+    """
+    updated_at = Job.objects.filter(pk=pk, is_active=True).values_list('updated_at', flat=True).first()
+    if updated_at is None:
+        return None
+    return _make_etag('job', pk, updated_at.isoformat()), updated_at
+
+
+def cached_response(request, key, validator, build):
+    """
+    Answer a public GET from the conditional headers or the payload cache.
+
+    Args:
+        request: Incoming request
+        key: Cache key for the payload
+        validator: (etag, last_modified) for the current data
+        build: Callable returning the serialized payload on a cache miss
+
+    Returns:
+        A 304 or 200 response carrying ETag, Last-Modified and Cache-Control
+    """
+    etag, last_modified = validator
+    last_modified_ts = int(last_modified.timestamp()) if last_modified else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified_ts)
+    if response is None:
+        entry = cache.get(key)
+        if entry is not None and entry[0] == etag:
+            payload = entry[1]
+        else:
+            payload = build()
+            cache.set(key, (etag, payload), _timeout())
+        response = Response(payload)
+
+    response['ETag'] = etag
+    if last_modified_ts is not None:
+        response['Last-Modified'] = http_date(last_modified_ts)
+    patch_cache_control(response, public=True, max_age=getattr(settings, 'ATS_PUBLIC_MAX_AGE', 60))
+    return response
+
+
+def invalidate_public_jobs(job_id=None):
+    """Drop the cached public list (and one job's detail) after a change"""
+    keys = [JOBS_KEY]
+    if job_id is not None:
+        keys.append(JOB_KEY.format(job_id))
+    cache.delete_many(keys)
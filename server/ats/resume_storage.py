@@ -0,0 +1,69 @@
+"""
+Content-addressed resume storage.
+Resume files are stored as resumes/<2 hex>/<sha256><ext>, so an identical
+file uploaded for several applications is written once and shared. The
+digest in the name doubles as the key of the extracted-text cache (see
+scoring_service), so it never has to be recomputed for stored files.
+"""
+
+import os
+import re
+
+from .ats_scorer import hash_file
+
+RESUME_DIR = 'resumes'
+
+_DIGEST_NAME = re.compile(r'(?:^|/)resumes/[0-9a-f]{2}/([0-9a-f]{64})(?:\.[\w]+)?$')
+
+
+def content_addressed_name(digest, filename):
+    """Storage name for a resume with the given digest, keeping its extension"""
+    ext = os.path.splitext(filename)[1].lower()
+    return f"{RESUME_DIR}/{digest[:2]}/{digest}{ext}"
+
+
+def digest_from_name(name):
+    """The SHA-256 encoded in a content-addressed name, or None for legacy names"""
+    match = _DIGEST_NAME.search(name or '')
+    return match.group(1) if match else None
+
+
+def resume_digest(file):
+    """
+    SHA-256 of a resume, read from its storage name when it has one.
+
+    Args:
+        file: FieldFile or uploaded file
+
+    Returns:
+        Hex digest string
+    """
+    return digest_from_name(getattr(file, 'name', '')) or hash_file(file)
+
+
+def resume_upload_to(instance, filename):
+    """upload_to for Applicant.resume: name the file after its content"""
+    digest = getattr(instance, '_resume_digest', None) or hash_file(instance.resume)
+    return content_addressed_name(digest, filename)
+
+
+def dedupe_upload(instance):
+    """
+    Point a new, not yet saved resume upload at an identical stored file.
+
+    Called from Applicant.save(). When the content is already stored, the
+    field is switched to the existing name and marked committed, so the
+    storage write is skipped; otherwise upload_to names the new file.
+
+    Args:
+        instance: Applicant whose resume may be a pending upload
+    """
+    resume = instance.resume
+    if not resume or resume._committed:
+        return
+    instance.resume_name = os.path.basename(resume.name)[:255]
+    instance._resume_digest = digest = hash_file(resume)
+    name = content_addressed_name(digest, resume.name)
+    if resume.storage.exists(name):
+        resume.name = name
+        resume._committed = True
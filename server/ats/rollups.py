@@ -0,0 +1,134 @@
+"""
+Applicant status rollups.
+Maintains ApplicantStatusCount incrementally: model signals cover
+save/delete, and bulk paths that use queryset.update() go through
+update_status() so the dashboard never has to count applicants.
+"""
+
+from collections import Counter
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Count, F
+
+from .models import Applicant, ApplicantStatusCount
+
+
+def apply_deltas(deltas):
+    """
+    Add count deltas to the rollup.
+    
+    Args:
+        deltas: Mapping of (job_id, status) -> change in applicant count
+    """
+    for (job_id, status), delta in deltas.items():
+        if not delta or job_id is None:
+            continue
+        rows = ApplicantStatusCount.objects.filter(job_id=job_id, status=status)
+        if rows.update(count=F('count') + delta) or delta < 0:
+            continue
+        # First applicant in this bucket; another writer may create it concurrently
+        ApplicantStatusCount.objects.bulk_create(
+            [ApplicantStatusCount(job_id=job_id, status=status, count=0)], ignore_conflicts=True
+        )
+        rows.update(count=F('count') + delta)
+
+
+def record_transitions(old_keys, new_status):
+    """
+    Apply the deltas for rows that moved from their (job_id, status) to new_status.
+    
+    Args:
+        old_keys: Iterable of (job_id, old_status), one per updated applicant
+        new_status: Status the applicants now have
+    """
+    deltas = Counter()
+    for job_id, old_status in old_keys:
+        if old_status != new_status:
+            deltas[(job_id, old_status)] -= 1
+            deltas[(job_id, new_status)] += 1
+    apply_deltas(deltas)
+
+
+def update_status(queryset, new_status, **changes):
+    """
+    Set status on a queryset with one UPDATE and keep the rollup in step.
+    
+    Args:
+        queryset: Applicant queryset to update
+        new_status: Status to set
+        changes: Extra field values to set in the same UPDATE
+        
+    Returns:
+        Number of applicants updated
+    """
+    with transaction.atomic():
+        buckets = list(
+            queryset.order_by().values_list('job_id', 'status').annotate(total=Count('id'))
+        )
+        updated = queryset.update(status=new_status, **changes)
+        
+        deltas = Counter()
+        for job_id, old_status, total in buckets:
+            if old_status != new_status:
+                deltas[(job_id, old_status)] -= total
+                deltas[(job_id, new_status)] += total
+        apply_deltas(deltas)
+    return updated
+
+
+def reconcile(using=DEFAULT_DB_ALIAS):
+    """
+    Rebuild the rollup from the applicant table.
+    
+    Args:
+        using: Database alias
+        
+    Returns:
+        Dict of (job_id, status) -> (rollup count, actual count) for buckets that were wrong
+    """
+    with transaction.atomic(using=using):
+        actual = {
+            (job_id, status): total
+            for job_id, status, total in Applicant.objects.using(using).order_by()
+            .values_list('job_id', 'status').annotate(total=Count('id'))
+        }
+        stored = {
+            (job_id, status): count
+            for job_id, status, count in ApplicantStatusCount.objects.using(using).select_for_update()
+            .values_list('job_id', 'status', 'count')
+        }
+        
+        drift = {
+            key: (stored.get(key, 0), actual.get(key, 0))
+            for key in set(actual) | set(stored)
+            if stored.get(key, 0) != actual.get(key, 0)
+        }
+        if drift:
+            ApplicantStatusCount.objects.using(using).all().delete()
+            ApplicantStatusCount.objects.using(using).bulk_create(
+                [ApplicantStatusCount(job_id=job_id, status=status, count=total)
+                 for (job_id, status), total in actual.items()],
+                batch_size=1000
+            )
+    return drift
+
+
+def backfill(using=DEFAULT_DB_ALIAS):
+    """
+    Fill an empty rollup from the applicant table.
+    
+    Databases that had applicants before the rollup existed would
+    otherwise show zero counts until reconcile_counts is run. Run after
+    every migrate; once the rollup has rows it is a single EXISTS query.
+    
+    Args:
+        using: Database alias
+        
+    Returns:
+        Number of (job, status) buckets written
+    """
+    if ApplicantStatusCount._meta.db_table not in connections[using].introspection.table_names():
+        return 0
+    if ApplicantStatusCount.objects.using(using).exists() or not Applicant.objects.using(using).exists():
+        return 0
+    return len(reconcile(using=using))
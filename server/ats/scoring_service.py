@@ -0,0 +1,114 @@
+"""
+Scoring service module.
+Keeps a stored ResumeAnalysis per applicant and scores from it, so the
+resume file is only parsed when it actually changes, and only once per
+unique file content across applicants.
+"""
+
+from django.utils import timezone
+
+from .ats_scorer import analyze_resume, analyze_text, score_analysis
+from . import metrics
+from .instrumentation import span
+from .job_profiles import get_job_profile
+from .models import ResumeAnalysis
+from .resume_storage import resume_digest
+
+
+def get_analysis(applicant):
+    """Return the applicant's stored ResumeAnalysis, or None"""
+    try:
+        return applicant.analysis
+    except ResumeAnalysis.DoesNotExist:
+        return None
+
+
+def cached_extraction(content_hash):
+    """
+    Text already extracted from an identical resume file, if any.
+    
+    ResumeAnalysis rows double as the digest -> text cache: any successful
+    extraction of the same content can be reused, so each unique file is
+    parsed once no matter how many applications share it.
+    
+    Returns:
+        Dict with 'text' and 'truncated', or None
+    """
+    row = (
+        ResumeAnalysis.objects.filter(content_hash=content_hash, extraction_error__isnull=True)
+        .values('text', 'truncated')
+        .first()
+    )
+    if row is None:
+        return None
+    return {'text': row['text'], 'truncated': [reason for reason in row['truncated'].split(',') if reason]}
+
+
+def analyze_applicant(applicant, reparse=False):
+    """
+    Build or refresh the stored analysis for an applicant.
+    
+    The resume is only read when there is no analysis yet or when `reparse`
+    is set (e.g. a new resume was uploaded), and even then its text comes
+    from the digest cache if the same file was extracted before. Otherwise
+    keyword and skill sets are rebuilt from the stored text, which covers
+    cover letter edits.
+    
+    Args:
+        applicant: Applicant instance
+        reparse: Re-read the resume file (through the digest cache)
+        
+    Returns:
+        (ResumeAnalysis, TextAnalysis of resume + cover letter)
+    """
+    analysis = get_analysis(applicant)
+    
+    if analysis is None or reparse:
+        content_hash = resume_digest(applicant.resume)
+        result = cached_extraction(content_hash)
+        if result is not None:
+            result.update(content_hash=content_hash, error=None,
+                          analysis=analyze_text(result['text'], applicant.cover_letter or ""))
+        else:
+            result = analyze_resume(applicant.resume, applicant.cover_letter or "", content_hash=content_hash)
+        analysis = analysis or ResumeAnalysis(applicant=applicant)
+        analysis.text = result['text']
+        analysis.content_hash = result['content_hash']
+        analysis.truncated = ','.join(result['truncated'])
+        analysis.extraction_error = result['error']
+        analysis.extracted_at = timezone.now()
+        terms = result['analysis']
+    else:
+        terms = analyze_text(analysis.text, applicant.cover_letter or "")
+    
+    # Lists only for the JSON columns; scoring uses the analysis' sets
+    analysis.keywords = sorted(terms.keywords)
+    analysis.skills = sorted(terms.skills)
+    applicant.analysis = analysis
+    return analysis, terms
+
+
+def score_applicant(applicant, reparse=False):
+    """
+    Score an applicant against their job and persist the breakdown.
+    
+    Args:
+        applicant: Applicant instance (with resume)
+        reparse: Re-read the resume file (through the digest cache)
+        
+    Returns:
+        Score dictionary from `score_analysis`
+    """
+    with span('score'), metrics.SCORE_SECONDS.time():
+        analysis, terms = analyze_applicant(applicant, reparse=reparse)
+        result = score_analysis(terms, get_job_profile(applicant.job))
+    
+    analysis.keyword_score = result['keyword_score']
+    analysis.skill_score = result['skill_score']
+    analysis.save()
+    
+    applicant.match_score = int(result['overall_score'])
+    applicant.keywords = ", ".join(result['matched_keywords'][:10])
+    applicant.scoring_status = 'done'
+    applicant.save(update_fields=['match_score', 'keywords', 'scoring_status', 'updated_at'])
+    return result
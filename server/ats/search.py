@@ -0,0 +1,272 @@
+"""
+Applicant full-text search.
+Indexes name, email, cover letter and stored resume text in a
+backend-native index: a tsvector table with a GIN index on PostgreSQL,
+an FTS5 virtual table on SQLite. The index is updated incrementally from
+model signals, and results are ranked by relevance blended with match_score.
+"""
+
+import re
+
+from django.db import connections, router, transaction
+from django.db.models import Q
+
+from .models import Applicant
+
+SQLITE_TABLE = 'ats_applicant_fts'
+POSTGRES_TABLE = 'ats_applicant_search'
+
+# Share of the final rank that comes from text relevance; the rest is match_score
+RELEVANCE_WEIGHT = 0.7
+
+# Candidates pulled from the index before blending in match_score
+CANDIDATE_LIMIT = 200
+
+_fts5_available = {}
+
+
+def _connection():
+    return connections[router.db_for_write(Applicant)]
+
+
+def _backend(connection):
+    if connection.vendor == 'postgresql':
+        return 'postgresql'
+    if connection.vendor == 'sqlite' and _sqlite_has_fts5(connection):
+        return 'sqlite'
+    return None
+
+
+def _sqlite_has_fts5(connection):
+    if connection.alias not in _fts5_available:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("CREATE VIRTUAL TABLE temp.ats_fts5_probe USING fts5(x)")
+                cursor.execute("DROP TABLE temp.ats_fts5_probe")
+            _fts5_available[connection.alias] = True
+        except Exception:
+            _fts5_available[connection.alias] = False
+    return _fts5_available[connection.alias]
+
+
+def search_available(connection=None):
+    """True if the database has a native full-text index we can use"""
+    return _backend(connection or _connection()) is not None
+
+
+def ensure_search_index(connection=None):
+    """Create the backend's search table/index if it doesn't exist yet"""
+    connection = connection or _connection()
+    backend = _backend(connection)
+    with connection.cursor() as cursor:
+        if backend == 'postgresql':
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {POSTGRES_TABLE} ("
+                f" applicant_id bigint PRIMARY KEY, document tsvector NOT NULL)"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {POSTGRES_TABLE}_document_gin"
+                f" ON {POSTGRES_TABLE} USING gin(document)"
+            )
+        elif backend == 'sqlite':
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_TABLE}"
+                f" USING fts5(name, email, cover_letter, resume_text, tokenize='unicode61')"
+            )
+
+
+def _split_email(email):
+    # Index the parts of an address so 'example' or 'ada' find ada@example.com
+    return re.sub(r'[@._+-]', ' ', email or '')
+
+
+def _upsert(cursor, backend, rows, replace=True):
+    """
+    Write search documents with one executemany per statement.
+    
+    Args:
+        rows: (applicant_id, name, email, cover_letter, resume_text) tuples
+        replace: Drop existing documents first (not needed on an emptied table)
+    """
+    rows = list(rows)
+    if not rows:
+        return
+    if backend == 'postgresql':
+        cursor.executemany(
+            f"INSERT INTO {POSTGRES_TABLE} (applicant_id, document) VALUES (%s,"
+            f" setweight(to_tsvector('simple', %s), 'A') ||"
+            f" setweight(to_tsvector('simple', %s), 'A') ||"
+            f" setweight(to_tsvector('simple', %s), 'B') ||"
+            f" setweight(to_tsvector('simple', %s), 'C'))"
+            f" ON CONFLICT (applicant_id) DO UPDATE SET document = EXCLUDED.document",
+            [[applicant_id, name or '', _split_email(email), resume_text or '', cover_letter or '']
+             for applicant_id, name, email, cover_letter, resume_text in rows]
+        )
+        return
+    if replace:
+        cursor.executemany(f"DELETE FROM {SQLITE_TABLE} WHERE rowid = %s", [[row[0]] for row in rows])
+    cursor.executemany(
+        f"INSERT INTO {SQLITE_TABLE} (rowid, name, email, cover_letter, resume_text)"
+        f" VALUES (%s, %s, %s, %s, %s)",
+        [[applicant_id, name or '', _split_email(email), cover_letter or '', resume_text or '']
+         for applicant_id, name, email, cover_letter, resume_text in rows]
+    )
+
+
+def _document_rows(queryset):
+    return queryset.values_list('id', 'name', 'email', 'cover_letter', 'analysis__text')
+
+
+def index_applicant(applicant_id):
+    """Add or refresh one applicant's search document"""
+    connection = _connection()
+    backend = _backend(connection)
+    if backend is None:
+        return
+    rows = _document_rows(Applicant.objects.filter(pk=applicant_id))
+    with connection.cursor() as cursor:
+        _upsert(cursor, backend, rows)
+
+
+def remove_applicant(applicant_id):
+    """Drop an applicant's search document"""
+    connection = _connection()
+    backend = _backend(connection)
+    if backend == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {POSTGRES_TABLE} WHERE applicant_id = %s", [applicant_id])
+    elif backend == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SQLITE_TABLE} WHERE rowid = %s", [applicant_id])
+
+
+def rebuild_index(chunk_size=2000, connection=None):
+    """
+    Re-index every applicant, e.g. after bulk imports that bypass signals.
+
+    The rebuild is one transaction, so searches keep seeing the previous
+    index until it commits and a failed rebuild leaves it untouched.
+    Documents are inserted `chunk_size` at a time.
+
+    Returns:
+        Number of applicants indexed
+    """
+    connection = connection or _connection()
+    backend = _backend(connection)
+    if backend is None:
+        return 0
+    ensure_search_index(connection)
+
+    table = POSTGRES_TABLE if backend == 'postgresql' else SQLITE_TABLE
+    count = 0
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table}")
+        applicants = Applicant.objects.using(connection.alias).order_by('id')
+        rows = _document_rows(applicants).iterator(chunk_size=chunk_size)
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == chunk_size:
+                _upsert(cursor, backend, batch, replace=False)
+                count += len(batch)
+                batch = []
+        _upsert(cursor, backend, batch, replace=False)
+        count += len(batch)
+    return count
+
+
+def backfill_index(connection=None):
+    """
+    Fill an empty search index from the applicant table.
+
+    Databases that had applicants before the index existed would
+    otherwise find none of them until each one is saved again. Run after
+    every migrate; once the index has rows it is a single query.
+
+    Returns:
+        Number of applicants indexed
+    """
+    connection = connection or _connection()
+    backend = _backend(connection)
+    if backend is None or Applicant._meta.db_table not in connection.introspection.table_names():
+        return 0
+    ensure_search_index(connection)
+    table = POSTGRES_TABLE if backend == 'postgresql' else SQLITE_TABLE
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT 1 FROM {table} LIMIT 1")
+        if cursor.fetchone() is not None:
+            return 0
+    if not Applicant.objects.using(connection.alias).exists():
+        return 0
+    return rebuild_index(connection=connection)
+
+
+def _query_terms(query):
+    return re.findall(r'\w+', query.lower())
+
+
+def _ranked_candidates(connection, backend, terms, limit):
+    """Return [(applicant_id, relevance)] best first, relevance >= 0"""
+    with connection.cursor() as cursor:
+        if backend == 'postgresql':
+            cursor.execute(
+                f"SELECT applicant_id, ts_rank_cd(document, query) AS rank"
+                f" FROM {POSTGRES_TABLE}, to_tsquery('simple', %s) query"
+                f" WHERE document @@ query ORDER BY rank DESC LIMIT %s",
+                [' & '.join(f"{term}:*" for term in terms), limit]
+            )
+            return cursor.fetchall()
+
+        # Column weights: name, email, cover letter, resume text
+        cursor.execute(
+            f"SELECT rowid, -bm25({SQLITE_TABLE}, 10.0, 10.0, 2.0, 4.0) AS rank"
+            f" FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH %s ORDER BY rank DESC LIMIT %s",
+            [' '.join(f'"{term}"*' for term in terms), limit]
+        )
+        return cursor.fetchall()
+
+
+def search_applicants(query, limit=50):
+    """
+    Search applicants by name, email, cover letter and resume text.
+
+    Args:
+        query: Free-text query; every word must match (as a prefix)
+        limit: Maximum applicants to return
+
+    Returns:
+        List of Applicant instances, best blended rank first
+    """
+    terms = _query_terms(query)
+    if not terms:
+        return []
+
+    connection = _connection()
+    backend = _backend(connection)
+    if backend is None:
+        return _fallback_search(query, limit)
+
+    candidates = _ranked_candidates(connection, backend, terms, CANDIDATE_LIMIT)
+    if not candidates:
+        return []
+
+    best = max(rank for _, rank in candidates) or 1.0
+    relevance = {applicant_id: max(rank, 0) / best for applicant_id, rank in candidates}
+    applicants = Applicant.objects.filter(id__in=relevance).select_related('job')
+
+    def blended(applicant):
+        return (RELEVANCE_WEIGHT * relevance[applicant.id]
+                + (1 - RELEVANCE_WEIGHT) * applicant.match_score / 100)
+
+    return sorted(applicants, key=blended, reverse=True)[:limit]
+
+
+def _fallback_search(query, limit):
+    """Substring search for databases without a full-text index"""
+    return list(Applicant.objects.filter(
+        Q(name__icontains=query) |
+        Q(email__icontains=query) |
+        Q(cover_letter__icontains=query) |
+        Q(keywords__icontains=query) |
+        Q(analysis__text__icontains=query)
+    ).select_related('job').order_by('-match_score')[:limit])
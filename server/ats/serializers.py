@@ -1,8 +1,31 @@
+from urllib.parse import urljoin
+
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
 from django.contrib.auth.models import User
 from rest_framework.authtoken.models import Token
+from .instrumentation import span
 from .models import STATUS_CHOICES, Recruiter, Job, Applicant
 
+
+class TimedListSerializer(serializers.ListSerializer):
+    """Records rendering a whole page of objects as the 'serialize' span"""
+    
+    @property
+    def data(self):
+        with span('serialize'):
+            return super().data
+
+
+class TimedDataMixin:
+    """'serialize' span for single objects; pair with Meta.list_serializer_class = TimedListSerializer"""
+    
+    @property
+    def data(self):
+        with span('serialize'):
+            return super().data
+
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -19,33 +42,109 @@ class LoginSerializer(serializers.Serializer):
     username = serializers.CharField(required=True)
     password = serializers.CharField(required=True, write_only=True)
 
-class JobSerializer(serializers.ModelSerializer):
+class JobSerializer(TimedDataMixin, serializers.ModelSerializer):
     application_count = serializers.IntegerField(read_only=True)
     new_applications_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = Job
         fields = '__all__'
+        list_serializer_class = TimedListSerializer
+
+class PublicJobSerializer(TimedDataMixin, serializers.ModelSerializer):
+    """Job as shown on the careers site: no applicant counts"""
+    
+    class Meta:
+        model = Job
+        fields = '__all__'
+        list_serializer_class = TimedListSerializer
 
-class ApplicantSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """
+    Lets the client pick fields with `?fields=a,b` and add optional ones
+    with `?expand=c,d`. Fields in `expandable_fields` are left out unless
+    expanded or named in `fields`. Pruning happens once per serializer, not
+    per row, and `get_only_fields()` gives the matching columns for `.only()`.
+    Only reads are pruned: a write validates every writable field whatever
+    the query string says.
+    """
+    
+    expandable_fields = ()
+    # Serializer fields that aren't backed by a model field of the same name
+    field_sources = {}
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return
+        
+        requested = _split_param(request.query_params.get('fields'))
+        expanded = _split_param(request.query_params.get('expand'))
+        for name in list(self.fields):
+            if requested and name not in requested and name not in expanded:
+                self.fields.pop(name)
+            elif name in self.expandable_fields and name not in expanded and name not in requested:
+                self.fields.pop(name)
+    
+    def get_only_fields(self):
+        """Model fields (as .only() paths) needed to render the selected fields"""
+        only = {'id'}
+        for name, field in self.fields.items():
+            if name in self.field_sources:
+                only.update(self.field_sources[name])
+            elif field.source != '*':
+                only.add('__'.join(field.source_attrs))
+        return sorted(only)
+
+
+def _split_param(value):
+    return {name.strip() for name in (value or '').split(',') if name.strip()}
+
+
+class ApplicantSerializer(TimedDataMixin, SparseFieldsMixin, serializers.ModelSerializer):
     job_title = serializers.CharField(source='job.title', read_only=True)
     resume_url = serializers.SerializerMethodField()
     resume_filename = serializers.SerializerMethodField()
     
+    field_sources = {
+        'resume_url': ('resume',),
+        'resume_filename': ('resume', 'resume_name'),
+    }
+    
     class Meta:
         model = Applicant
         fields = '__all__'
-        read_only_fields = ('created_at', 'updated_at', 'match_score', 'keywords')
+        read_only_fields = ('created_at', 'updated_at', 'match_score', 'keywords', 'scoring_status')
+        list_serializer_class = TimedListSerializer
     
     def get_resume_url(self, obj):
         request = self.context.get('request')
         if obj.resume and request:
-            return request.build_absolute_uri(obj.resume.url)
+            # Resolve the site root once per response rather than once per row
+            if '_absolute_root' not in self.context:
+                self.context['_absolute_root'] = request.build_absolute_uri('/')
+            return urljoin(self.context['_absolute_root'], obj.resume.url)
         return None
     
     def get_resume_filename(self, obj):
         return obj.get_resume_filename()
 
+class ApplicantListSerializer(ApplicantSerializer):
+    """
+    Compact row for the applicant table, dashboard and search results.
+    Long text fields are only sent when asked for with `?expand=`.
+    """
+    
+    expandable_fields = ('cover_letter', 'notes', 'keywords', 'phone', 'resume', 'resume_filename')
+    
+    class Meta(ApplicantSerializer.Meta):
+        read_only_fields = fields = (
+            'id', 'name', 'email', 'phone', 'job', 'job_title', 'status', 'match_score',
+            'scoring_status', 'resume', 'resume_url', 'resume_filename', 'cover_letter',
+            'notes', 'keywords', 'created_at', 'updated_at',
+        )
+
 class ApplicantStatusUpdateSerializer(serializers.Serializer):
     status = serializers.ChoiceField(choices=STATUS_CHOICES)
     notes = serializers.CharField(required=False, allow_blank=True)
@@ -66,4 +165,4 @@ class DashboardStatsSerializer(serializers.Serializer):
     shortlisted_applicants = serializers.IntegerField()
     rejected_applicants = serializers.IntegerField()
     hired_applicants = serializers.IntegerField()
-    recent_applicants = ApplicantSerializer(many=True)
\ No newline at end of file
+    recent_applicants = ApplicantListSerializer(many=True)
\ No newline at end of file
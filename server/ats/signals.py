@@ -0,0 +1,81 @@
+import logging
+
+from django.db import DatabaseError, connections, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Applicant, Job, ResumeAnalysis
+from .public_cache import invalidate_public_jobs
+from .tfidf import forget_job
+from .rollups import apply_deltas, backfill
+from .search import backfill_index, index_applicant, remove_applicant
+
+logger = logging.getLogger(__name__)
+
+SEARCH_FIELDS = {'name', 'email', 'cover_letter'}
+
+
+@receiver(post_save, sender=Applicant)
+def update_status_rollup_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    new_key = (instance.job_id, instance.status)
+    old_key = None if created else getattr(instance, '_rollup_key', None)
+    
+    if created:
+        apply_deltas({new_key: 1})
+    elif old_key and old_key != new_key:
+        apply_deltas({old_key: -1, new_key: 1})
+    instance._rollup_key = new_key
+
+
+@receiver(post_delete, sender=Applicant)
+def update_status_rollup_on_delete(sender, instance, **kwargs):
+    apply_deltas({(instance.job_id, instance.status): -1})
+
+
+def _update_search_index(func, applicant_id):
+    # A missing or broken search index must never fail the write itself
+    try:
+        with transaction.atomic():
+            func(applicant_id)
+    except DatabaseError:
+        logger.exception("Search index update failed for applicant %s", applicant_id)
+
+
+@receiver(post_save, sender=Applicant)
+def update_search_index_on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and not SEARCH_FIELDS & set(update_fields)):
+        return
+    _update_search_index(index_applicant, instance.pk)
+
+
+@receiver(post_save, sender=ResumeAnalysis)
+def update_search_index_on_analysis_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _update_search_index(index_applicant, instance.applicant_id)
+
+
+@receiver(post_delete, sender=Applicant)
+def update_search_index_on_delete(sender, instance, **kwargs):
+    _update_search_index(remove_applicant, instance.pk)
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_public_job_cache(sender, instance, **kwargs):
+    invalidate_public_jobs(instance.pk)
+
+
+@receiver(post_delete, sender=Job)
+def drop_tfidf_index(sender, instance, **kwargs):
+    forget_job(instance.pk)
+
+
+def create_search_index(sender, using, **kwargs):
+    # Creates the table when missing and fills it if existing applicants aren't indexed
+    backfill_index(connections[using])
+
+
+def backfill_status_rollups(sender, using, **kwargs):
+    backfill(using=using)
@@ -0,0 +1,116 @@
+"""
+Skill Matcher Module
+Compiles a synonym-aware skill taxonomy into an Aho-Corasick automaton that
+finds every word-bounded skill mention in a single pass over the text. The
+failure links are folded into a full transition table, so each character
+costs one dict lookup.
+"""
+
+import json
+from collections import deque
+from typing import Dict, Iterable, Set
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+class SkillMatcher:
+    """
+    Aho-Corasick automaton over lowercased skill patterns.
+
+    Each pattern maps to a canonical skill name, so aliases such as
+    'k8s' or 'js' are reported as 'kubernetes' and 'javascript'.
+    """
+
+    def __init__(self, taxonomy: Dict[str, Iterable[str]]):
+        """
+        Args:
+            taxonomy: Mapping of canonical skill -> patterns that mention it
+        """
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        self._delta = []
+        self.skills = frozenset(taxonomy)
+
+        for canonical, patterns in taxonomy.items():
+            for pattern in set(patterns) | {canonical}:
+                self._add(' '.join(pattern.lower().split()), canonical)
+        self._build_failure_links()
+
+    @classmethod
+    def from_file(cls, path) -> 'SkillMatcher':
+        """Load a JSON taxonomy file of {"canonical": ["alias", ...]}"""
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def _add(self, pattern: str, canonical: str):
+        if not pattern:
+            return
+        state = 0
+        for ch in pattern:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[state][ch] = next_state
+            state = next_state
+        # Only require a boundary where the pattern itself starts/ends with a word character
+        self._out[state].append(
+            (len(pattern), canonical, _is_word_char(pattern[0]), _is_word_char(pattern[-1]))
+        )
+
+    def _build_failure_links(self):
+        self._delta = [None] * len(self._goto)
+        self._delta[0] = dict(self._goto[0])
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            # Breadth-first, so the failure state's row is already complete
+            self._delta[state] = {**self._delta[self._fail[state]], **self._goto[state]}
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(ch, 0)
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def find(self, text: str) -> Set[str]:
+        """
+        Find all canonical skills mentioned in text
+
+        Args:
+            text: Text to scan (case and whitespace are normalized here)
+
+        Returns:
+            Set of canonical skill names
+        """
+        return self.find_normalized(' '.join(text.lower().split()))
+
+    def find_normalized(self, text: str) -> Set[str]:
+        """`find` for text that is already lowercased with single spaces (TextAnalysis.normalized)"""
+        delta, out = self._delta, self._out
+        last = len(text) - 1
+        found = set()
+        state = 0
+
+        for i, ch in enumerate(text):
+            state = delta[state].get(ch, 0)
+            if not out[state]:
+                continue
+
+            for length, canonical, head_word, tail_word in out[state]:
+                if canonical in found:
+                    continue
+                if tail_word and i < last and _is_word_char(text[i + 1]):
+                    continue
+                start = i - length + 1
+                if head_word and start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                found.add(canonical)
+
+        return found
@@ -0,0 +1,124 @@
+"""
+Background scoring queue.
+Scoring requests are stored as ScoringTask rows and drained by
+`manage.py score_worker`, so resume parsing never runs inside a request
+and no external broker is needed.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Applicant, ScoringTask
+from .scoring_service import score_applicant
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_scoring(applicant, reparse=True):
+    """
+    Queue an applicant for (re)scoring and mark their score as pending.
+    
+    With ATS_SCORING_ASYNC disabled the applicant is scored immediately
+    instead, which keeps local development usable without a worker.
+    
+    Args:
+        applicant: Applicant instance
+        reparse: Re-extract text from the resume file
+        
+    Returns:
+        The queued ScoringTask, or None when scored inline
+    """
+    Applicant.objects.filter(pk=applicant.pk).update(scoring_status='pending')
+    applicant.scoring_status = 'pending'
+    
+    if not getattr(settings, 'ATS_SCORING_ASYNC', True):
+        try:
+            score_applicant(applicant, reparse=reparse)
+        except Exception:
+            logger.exception("ATS scoring failed for applicant %s", applicant.pk)
+            Applicant.objects.filter(pk=applicant.pk).update(scoring_status='failed')
+            applicant.scoring_status = 'failed'
+        return None
+    
+    # Fold into an already queued task for the same applicant
+    task = ScoringTask.objects.filter(applicant=applicant, status='queued').first()
+    if task:
+        if reparse and not task.reparse:
+            task.reparse = True
+            task.save(update_fields=['reparse', 'updated_at'])
+        return task
+    return ScoringTask.objects.create(applicant=applicant, reparse=reparse)
+
+
+def claim_tasks(worker_id, limit=20, stale_after=600):
+    """
+    Atomically claim up to `limit` due tasks for a worker.
+    
+    Claiming is a conditional UPDATE on status, so concurrent workers never
+    get the same task, on PostgreSQL and SQLite alike. Tasks left running by
+    a worker that died longer than `stale_after` seconds ago are requeued.
+    
+    Returns:
+        List of claimed task ids
+    """
+    now = timezone.now()
+    ScoringTask.objects.filter(
+        status='running', locked_at__lt=now - timedelta(seconds=stale_after)
+    ).update(status='queued', locked_by='', updated_at=now)
+    
+    candidate_ids = list(
+        ScoringTask.objects.filter(status='queued', run_after__lte=now)
+        .order_by('run_after', 'id')
+        .values_list('id', flat=True)[:limit]
+    )
+    if not candidate_ids:
+        return []
+    
+    ScoringTask.objects.filter(id__in=candidate_ids, status='queued').update(
+        status='running', locked_by=worker_id, locked_at=now,
+        attempts=F('attempts') + 1, updated_at=now
+    )
+    return list(
+        ScoringTask.objects.filter(id__in=candidate_ids, status='running', locked_by=worker_id)
+        .values_list('id', flat=True)
+    )
+
+
+def run_scoring_task(task_id):
+    """
+    Score the applicant behind a claimed task and record the outcome.
+    
+    Failures are retried with exponential backoff up to
+    ATS_SCORING_MAX_ATTEMPTS, after which the applicant is marked failed.
+    
+    Returns:
+        True if the applicant was scored
+    """
+    try:
+        task = ScoringTask.objects.select_related('applicant__job').get(pk=task_id)
+    except ScoringTask.DoesNotExist:
+        return False
+    
+    now = timezone.now()
+    try:
+        score_applicant(task.applicant, reparse=task.reparse)
+    except Exception as e:
+        logger.exception("ATS scoring failed for applicant %s (attempt %s)", task.applicant_id, task.attempts)
+        if task.attempts < getattr(settings, 'ATS_SCORING_MAX_ATTEMPTS', 3):
+            ScoringTask.objects.filter(pk=task.pk).update(
+                status='queued', locked_by='', last_error=str(e), updated_at=now,
+                run_after=now + timedelta(seconds=30 * 2 ** (task.attempts - 1))
+            )
+        else:
+            ScoringTask.objects.filter(pk=task.pk).update(
+                status='failed', last_error=str(e), updated_at=now
+            )
+            Applicant.objects.filter(pk=task.applicant_id).update(scoring_status='failed')
+        return False
+    
+    ScoringTask.objects.filter(pk=task.pk).update(status='done', last_error='', updated_at=now)
+    return True
@@ -1,3 +1,1612 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import tracemalloc
+import zlib
+from collections import Counter
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import PyPDF2
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import CommandError, call_command
+from django.core.management.sql import emit_post_migrate_signal
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import ats_scorer
+from .ats_scorer import (
+    ExtractedText, ExtractionError, StoredTerms, TextAnalysis, analyze_resume, build_job_profile,
+    calculate_keyword_match_score, calculate_skill_match_score, extract_keywords, extract_pdf, extract_technical_skills, score_analysis,
+)
+from . import extraction_pool
+from . import job_profiles
+from . import metrics
+from . import search as search_index
+from . import process_pool
+from . import tfidf
+from . import views
+from .extraction_pool import extract_isolated, shutdown_pool
+from .instrumentation import RequestMetrics, span
+from .job_profiles import get_job_profile
+from .email_service import deliver_outbox
+from .models import Applicant, ApplicantStatusCount, Job, OutboundEmail, ResumeAnalysis, ScoringTask
+from .resume_storage import digest_from_name
+from .rollups import reconcile, update_status
+from .scoring_service import score_applicant
+from .task_queue import claim_tasks, enqueue_scoring, run_scoring_task
+from .skill_matcher import SkillMatcher
+
+TEST_MEDIA_ROOT = tempfile.mkdtemp()
+
+# Keep metric files written by any test out of the project's metrics/ dir
+_test_metrics_dir = override_settings(ATS_METRICS_DIR=os.path.join(TEST_MEDIA_ROOT, 'metrics'))
+
+
+def setUpModule():
+    _test_metrics_dir.enable()
+
+
+def tearDownModule():
+    metrics.reset()
+    _test_metrics_dir.disable()
+
+
+def make_job(**kwargs):
+    defaults = {
+        'title': 'Backend Engineer',
+        'description': 'Python developer building Django REST APIs',
+        'requirements': 'docker, kubernetes, postgresql',
+    }
+    defaults.update(kwargs)
+    return Job.objects.create(**defaults)
+
+
+def make_applicant(job, **kwargs):
+    defaults = {
+        'name': 'Ada Lovelace',
+        'email': 'ada@example.com',
+        'resume': SimpleUploadedFile('resume.pdf', b'%PDF-1.4'),
+    }
+    defaults.update(kwargs)
+    return Applicant.objects.create(job=job, **defaults)
+
+
+def make_pdf(page_texts):
+    """Build a minimal PDF with one line of text per page"""
+    objects = ['<< /Type /Catalog /Pages 2 0 R >>', None,
+               '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    kids = []
+    for text in page_texts:
+        stream = f'BT /F1 12 Tf 72 720 Td ({text}) Tj ET'
+        objects.append(f'<< /Length {len(stream)} >>\nstream\n{stream}\nendstream')
+        objects.append(f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+                       f'/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>')
+        kids.append(f'{len(objects)} 0 R')
+    objects[1] = f'<< /Type /Pages /Kids [{" ".join(kids)}] /Count {len(kids)} >>'
+
+    out = io.BytesIO()
+    out.write(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(f'{number} 0 obj\n{body}\nendobj\n'.encode('latin-1'))
+    xref = out.tell()
+    out.write(f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode('ascii'))
+    for offset in offsets:
+        out.write(f'{offset:010d} 00000 n \n'.encode('ascii'))
+    out.write(f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n'
+              f'startxref\n{xref}\n%%EOF\n'.encode('ascii'))
+    return out.getvalue()
+
+
+def make_pdf_bomb(megabytes):
+    """A one-page PDF whose content stream inflates to `megabytes` of spaces"""
+    compressor = zlib.compressobj(9)
+    stream = b''.join(compressor.compress(b' ' * (1 << 20)) for _ in range(megabytes))
+    stream += compressor.flush()
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << >> /Contents 4 0 R >>',
+        b'<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream' % (len(stream), stream),
+    ]
+    out = io.BytesIO()
+    out.write(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b'%d 0 obj\n%s\nendobj\n' % (number, body))
+    xref = out.tell()
+    out.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b'%010d 00000 n \n' % offset)
+    out.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT, ATS_SCORING_ASYNC=True, ATS_REQUEST_LOG=False)
+class ATSTestCase(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEST_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        self.user = User.objects.create_user('recruiter', 'recruiter@example.com', 'secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+
+class FlakyConnection:
+    """Mail connection stand-in that rejects one recipient"""
+
+    def __init__(self, bad_recipient):
+        self.bad_recipient = bad_recipient
+        self.opened = 0
+        self.sent = []
+
+    def open(self):
+        self.opened += 1
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        for message in messages:
+            if self.bad_recipient in message.to:
+                raise ConnectionError('550 mailbox unavailable')
+            self.sent.append(message)
+        return len(messages)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class SkillMatcherTests(TestCase):
+    def skills(self, text):
+        return set(extract_technical_skills(text))
+
+    def test_skills_only_match_whole_words(self):
+        text = 'React framework, Google and MongoDB interest, digital restaurant, Javascript'
+        self.assertEqual(self.skills(text), {'react', 'mongodb', 'javascript'})
+        self.assertEqual(self.skills('R, Go, REST and git.'), {'r', 'go', 'rest', 'git'})
+        self.assertEqual(self.skills('node_modules java_home'), set())
+
+    def test_every_alias_reports_its_canonical_skill(self):
+        with open(ats_scorer.DEFAULT_SKILL_TAXONOMY_PATH, encoding='utf-8') as f:
+            taxonomy = json.load(f)
+        for canonical, aliases in taxonomy.items():
+            for alias in aliases:
+                with self.subTest(alias=alias):
+                    self.assertIn(canonical, self.skills(f'Experienced with {alias.upper()}, daily.'))
+        self.assertEqual(self.skills('k8s and js'), {'kubernetes', 'javascript'})
+
+    def test_punctuated_skills(self):
+        self.assertEqual(self.skills('C++, C# and CI/CD (ASP.NET).'), {'c++', 'c#', 'ci/cd', 'asp.net'})
+        self.assertEqual(self.skills('abc++ xc# ci/cdx'), set())
+        self.assertEqual(self.skills('Node.js  \n scikit-learn'), {'node', 'javascript', 'scikit-learn'})
+        self.assertEqual(self.skills('machine\n  learning'), {'machine learning'})
+
+    def test_taxonomy_path_setting(self):
+        path = os.path.join(tempfile.mkdtemp(), 'skills.json')
+        self.addCleanup(shutil.rmtree, os.path.dirname(path))
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'cobol': ['cbl'], 'pl/i': []}, f)
+        self.addCleanup(setattr, ats_scorer, '_skill_matcher', ats_scorer._skill_matcher)
+        ats_scorer._skill_matcher = None
+        with override_settings(ATS_SKILL_TAXONOMY_PATH=path):
+            self.assertEqual(self.skills('CBL, PL/I and Python'), {'cobol', 'pl/i'})
+        self.assertEqual(SkillMatcher.from_file(path).skills, {'cobol', 'pl/i'})
+
+
+class StoredAnalysisTests(ATSTestCase):
+    def setUp(self):
+        super().setUp()
+        self.job = make_job(description='Python developer', requirements='django')
+        self.other_job = make_job(title='Platform', description='Kubernetes operator', requirements='terraform')
+        self.applicant = make_applicant(
+            self.job, resume=SimpleUploadedFile('cv.pdf', make_pdf(['Python Django developer'])))
+        score_applicant(self.applicant, reparse=True)
+
+    @override_settings(ATS_SCORING_ASYNC=False)
+    def test_cover_letter_and_job_edits_rescore_without_parsing(self):
+        url = f'/api/applicants/{self.applicant.id}/'
+        with mock.patch.object(ats_scorer, 'extract_resume') as extract, \
+                mock.patch('ats.scoring_service.resume_digest') as digest:
+            response = self.client.patch(url, {'cover_letter': 'Also Kubernetes and Terraform'}, format='json')
+            self.assertEqual(response.status_code, 200)
+            analysis = ResumeAnalysis.objects.get(applicant=self.applicant)
+            self.assertIn('kubernetes', analysis.skills)
+            self.assertIn('Python Django developer', analysis.text)
+
+            response = self.client.patch(url, {'job': self.other_job.id}, format='json')
+            self.assertEqual(response.status_code, 200)
+        # Neither parsed nor even read: the stored text is enough
+        extract.assert_not_called()
+        digest.assert_not_called()
+
+        applicant = Applicant.objects.get(pk=self.applicant.pk)
+        expected = score_analysis(analysis, get_job_profile(self.other_job))
+        self.assertEqual((applicant.job_id, applicant.scoring_status), (self.other_job.id, 'done'))
+        self.assertEqual(applicant.match_score, int(expected['overall_score']))
+
+    def test_scoring_uses_the_analysis_without_converting_it(self):
+        with mock.patch.object(ats_scorer, 'StoredTerms', side_effect=AssertionError('converted')), \
+                mock.patch('ats.scoring_service.score_analysis', wraps=score_analysis) as scored:
+            score_applicant(self.applicant)
+            score_applicant(self.applicant, reparse=True)
+        self.assertEqual([type(call.args[0]) for call in scored.call_args_list], [TextAnalysis, TextAnalysis])
+        # Lists only in the stored row
+        self.assertEqual(self.applicant.analysis.skills, ['django', 'python'])
+
+
+class JobProfileCacheTests(ATSTestCase):
+    def setUp(self):
+        super().setUp()
+        job_profiles.clear_job_profiles()
+        self.addCleanup(job_profiles.clear_job_profiles)
+        self.build = mock.patch.object(job_profiles, 'build_job_profile',
+                                       wraps=job_profiles.build_job_profile).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_profile_is_reused_until_the_job_changes(self):
+        job = make_job()
+        first = get_job_profile(job)
+        self.assertIs(get_job_profile(Job.objects.get(pk=job.pk)), first)
+        self.assertEqual(self.build.call_count, 1)
+
+        job.requirements = 'terraform'
+        job.save()
+        profile = get_job_profile(job)
+        self.assertEqual(self.build.call_count, 2)
+        self.assertIn('terraform', profile.skills)
+        self.assertNotIn('docker', profile.skills)
+
+    @override_settings(ATS_JOB_PROFILE_CACHE_SIZE=2)
+    def test_least_recently_used_job_is_evicted(self):
+        jobs = [make_job(title=f'Job {i}') for i in range(3)]
+        get_job_profile(jobs[0])
+        get_job_profile(jobs[1])
+        get_job_profile(jobs[0])  # jobs[1] is now the least recently used
+        get_job_profile(jobs[2])
+        self.assertEqual(list(job_profiles._cache), [jobs[0].pk, jobs[2].pk])
+
+        self.build.reset_mock()
+        get_job_profile(jobs[0])
+        self.assertEqual(self.build.call_count, 0)
+        get_job_profile(jobs[1])
+        self.assertEqual(self.build.call_count, 1)
+
+    @override_settings(ATS_JOB_PROFILE_CACHE_SIZE=3)
+    def test_warm_up_stops_at_cache_size(self):
+        for i in range(5):
+            make_job(title=f'Job {i}')
+        make_job(title='Closed', is_active=False)
+        self.assertEqual(job_profiles.warm_job_profiles(), 3)
+        self.assertEqual((self.build.call_count, len(job_profiles._cache)), (3, 3))
+
+
+class ScoringQueueTests(ATSTestCase):
+    def setUp(self):
+        super().setUp()
+        self.job = make_job()
+        self.applicant = make_applicant(self.job)
+
+    def run_once(self, error=ValueError('unreadable')):
+        with mock.patch('ats.task_queue.score_applicant', side_effect=error), \
+                self.assertLogs('ats.task_queue', 'ERROR'):
+            task_id, = claim_tasks('worker')
+            self.assertFalse(run_scoring_task(task_id))
+        return ScoringTask.objects.get(pk=task_id)
+
+    def test_create_returns_pending_and_queues_a_task(self):
+        response = self.client.post('/api/applicants/', {
+            'name': 'Grace Hopper', 'email': 'grace@example.com', 'job': self.job.id,
+            'resume': SimpleUploadedFile('cv.pdf', make_pdf(['Python developer'])),
+        }, format='multipart')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['scoring_status'], 'pending')
+        task = ScoringTask.objects.get(applicant_id=response.json()['id'])
+        self.assertEqual((task.status, task.reparse), ('queued', True))
+
+        self.assertTrue(run_scoring_task(claim_tasks('worker')[0]))
+        self.assertEqual(Applicant.objects.get(pk=task.applicant_id).scoring_status, 'done')
+
+    def test_repeated_enqueues_fold_into_one_task(self):
+        enqueue_scoring(self.applicant, reparse=False)
+        enqueue_scoring(self.applicant, reparse=False)
+        self.assertFalse(ScoringTask.objects.get().reparse)
+        enqueue_scoring(self.applicant, reparse=True)
+        enqueue_scoring(self.applicant, reparse=False)
+        task = ScoringTask.objects.get()
+        self.assertEqual((task.status, task.reparse), ('queued', True))
+
+        # Once claimed, a new request needs a task of its own
+        claim_tasks('worker')
+        enqueue_scoring(self.applicant, reparse=False)
+        self.assertEqual(ScoringTask.objects.filter(status='queued').count(), 1)
+
+    def test_claims_never_overlap(self):
+        for i in range(3):
+            enqueue_scoring(make_applicant(self.job, email=f'a{i}@example.com'))
+        claimed = {}
+
+        def race(execute, sql, params, many, context):
+            # Let another worker claim everything between this worker's
+            # candidate SELECT and its conditional UPDATE
+            if 'first' not in claimed and params and 'second' in params:
+                claimed['first'] = claim_tasks('first', limit=10)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(race):
+            claimed['second'] = claim_tasks('second', limit=2)
+        self.assertEqual(len(claimed['first']), 3)
+        self.assertEqual(claimed['second'], [])
+        self.assertEqual(claim_tasks('third'), [])
+
+    def test_stale_running_tasks_are_requeued(self):
+        stale = enqueue_scoring(self.applicant)
+        fresh = enqueue_scoring(make_applicant(self.job, email='b@example.com'))
+        self.assertEqual(sorted(claim_tasks('dead')), sorted([stale.pk, fresh.pk]))
+        ScoringTask.objects.filter(pk=stale.pk).update(locked_at=timezone.now() - timedelta(seconds=601))
+
+        self.assertEqual(claim_tasks('alive', stale_after=600), [stale.pk])
+        stale.refresh_from_db()
+        self.assertEqual((stale.locked_by, stale.attempts), ('alive', 2))
+        self.assertEqual(ScoringTask.objects.get(pk=fresh.pk).locked_by, 'dead')
+
+    @override_settings(ATS_SCORING_MAX_ATTEMPTS=3)
+    def test_failures_back_off_then_fail(self):
+        enqueue_scoring(self.applicant)
+        for attempt, delay in ((1, 30), (2, 60)):
+            task = self.run_once()
+            self.assertEqual((task.status, task.attempts, task.last_error), ('queued', attempt, 'unreadable'))
+            self.assertEqual(task.run_after - task.updated_at, timedelta(seconds=delay))
+            self.assertEqual(claim_tasks('worker'), [])  # not due yet
+            ScoringTask.objects.filter(pk=task.pk).update(run_after=timezone.now())
+
+        task = self.run_once()
+        self.assertEqual((task.status, task.attempts), ('failed', 3))
+        self.assertEqual(Applicant.objects.get(pk=self.applicant.pk).scoring_status, 'failed')
+        self.assertEqual(claim_tasks('worker'), [])
+
+    def test_pool_children_warm_job_profiles(self):
+        with mock.patch('ats.job_profiles.warm_job_profiles') as warm:
+            process_pool.setup_django()
+            warm.assert_not_called()
+            process_pool.setup_django(warm_profiles=True)
+            warm.assert_called_once_with()
+
+        with mock.patch('ats.management.commands.score_worker.create_pool') as create_pool, \
+                mock.patch('ats.management.commands.score_worker.warm_job_profiles') as warm:
+            call_command('score_worker', '--once', '--warm-profiles', processes=2, stdout=io.StringIO())
+        self.assertTrue(create_pool.call_args.kwargs['warm_profiles'])
+        warm.assert_not_called()
+
+
+class RescoreCommandTests(ATSTestCase):
+    def setUp(self):
+        super().setUp()
+        self.backend = make_job(description='Python Django developer', requirements='postgresql')
+        self.frontend = make_job(title='Frontend', description='React developer', requirements='css')
+        self.applicants = []
+        for i, job in enumerate([self.backend, self.backend, self.frontend, self.backend]):
+            applicant = make_applicant(job, email=f'a{i}@example.com')
+            ResumeAnalysis.objects.create(applicant=applicant, content_hash='x', extracted_at=timezone.now(),
+                                          keywords=['python', 'developer'], skills=['python', 'django'])
+            self.applicants.append(applicant)
+        self.unanalyzed = make_applicant(self.backend, email='new@example.com')
+        self.checkpoint = os.path.join(tempfile.mkdtemp(), 'checkpoint.json')
+        self.addCleanup(shutil.rmtree, os.path.dirname(self.checkpoint))
+
+    def rescore(self, *args, **options):
+        out = io.StringIO()
+        call_command('rescore', *args, workers=1, checkpoint=self.checkpoint, stdout=out, **options)
+        return out.getvalue()
+
+    def scores(self):
+        return dict(Applicant.objects.values_list('id', 'match_score'))
+
+    def expected(self, applicant):
+        analysis = ResumeAnalysis.objects.get(applicant=applicant)
+        return int(score_analysis(analysis, get_job_profile(applicant.job))['overall_score'])
+
+    def test_job_or_all_is_required(self):
+        with self.assertRaises(CommandError):
+            self.rescore()
+        with self.assertRaises(CommandError):
+            self.rescore('--all', job=self.backend.id)
+
+    def test_job_scope_rescores_only_that_job(self):
+        self.rescore(job=self.frontend.id)
+        scores = self.scores()
+        frontend = self.applicants[2]
+        self.assertEqual(scores[frontend.id], self.expected(frontend))
+        self.assertGreater(scores[frontend.id], 0)
+        self.assertEqual([scores[a.id] for a in self.applicants if a.job_id == self.backend.id], [0, 0, 0])
+        self.assertEqual(ResumeAnalysis.objects.get(applicant=frontend).skill_score,
+                         score_analysis(StoredTerms(['python', 'developer'], ['python', 'django']), get_job_profile(self.frontend))['skill_score'])
+
+    def test_all_writes_back_with_one_bulk_update_per_chunk(self):
+        with CaptureQueriesContext(connection) as queries:
+            output = self.rescore('--all', chunk_size=10)
+        updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE "ats_applicant"')]
+        self.assertEqual(len(updates), 1)
+        for applicant in self.applicants:
+            self.assertEqual(self.scores()[applicant.id], self.expected(applicant))
+        self.assertEqual(set(Applicant.objects.filter(id__in=[a.id for a in self.applicants])
+                             .values_list('scoring_status', flat=True)), {'done'})
+        self.assertIn('Rescored 4 applicants', output)
+        # A finished run leaves no checkpoint behind
+        with open(self.checkpoint) as f:
+            self.assertEqual(json.load(f), {})
+
+    def interrupted_rescore(self):
+        """Score the first chunk of two, then crash"""
+        real = process_pool.score_rows
+        calls = []
+
+        def crash_on_second_chunk(*args):
+            calls.append(1)
+            if len(calls) == 2:
+                raise KeyboardInterrupt
+            return real(*args)
+
+        with mock.patch('ats.management.commands.rescore.score_rows', side_effect=crash_on_second_chunk), \
+                self.assertRaises(KeyboardInterrupt):
+            self.rescore('--all', chunk_size=2)
+        Applicant.objects.update(match_score=0)
+
+    def test_resumes_from_checkpoint(self):
+        self.interrupted_rescore()
+        output = self.rescore('--all', chunk_size=2)
+        self.assertIn(f'Resuming all after applicant {self.applicants[1].id}', output)
+        scores = self.scores()
+        self.assertEqual([scores[a.id] > 0 for a in self.applicants], [False, False, True, True])
+
+        self.interrupted_rescore()
+        self.rescore('--all', '--restart')
+        self.assertTrue(all(self.scores()[a.id] > 0 for a in self.applicants))
+
+    def test_checkpoint_is_discarded_when_a_job_changes(self):
+        self.interrupted_rescore()
+        self.backend.requirements = 'django'
+        self.backend.save()
+
+        output = self.rescore('--all', chunk_size=2)
+        self.assertIn('Job text changed since the all checkpoint', output)
+        for applicant in self.applicants:
+            self.assertEqual(self.scores()[applicant.id], self.expected(applicant))
+
+    def test_applicants_without_analysis_are_queued_once(self):
+        output = self.rescore('--all')
+        task = ScoringTask.objects.get()
+        self.assertEqual((task.applicant_id, task.status, task.reparse), (self.unanalyzed.id, 'queued', True))
+        self.assertIn('queued 1 without a stored analysis', output)
+        self.rescore('--all')
+        self.assertEqual(ScoringTask.objects.count(), 1)
+
+
+class EmailOutboxTests(ATSTestCase):
+    def test_status_update_queues_email_instead_of_sending(self):
+        applicant = make_applicant(make_job())
+
+        response = self.client.post(
+            f'/api/applicants/{applicant.id}/update_status/', {'status': 'shortlisted'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['email_queued'])
+        self.assertEqual(len(mail.outbox), 0)
+        queued = OutboundEmail.objects.get()
+        self.assertEqual(queued.to_email, 'ada@example.com')
+        self.assertEqual(queued.status, 'queued')
+
+    def test_deliver_outbox_sends_batch_and_marks_sent(self):
+        job = make_job()
+        for i in range(3):
+            applicant = make_applicant(job, email=f'candidate{i}@example.com')
+            self.client.post(f'/api/applicants/{applicant.id}/update_status/', {'status': 'reviewed'})
+
+        sent, failed = deliver_outbox('test-worker')
+
+        self.assertEqual((sent, failed), (3, 0))
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].alternatives[0][1], 'text/html')
+        self.assertFalse(OutboundEmail.objects.exclude(status='sent').exists())
+
+    @override_settings(ATS_EMAIL_MAX_ATTEMPTS=2)
+    def test_failed_email_is_retried_then_dead_lettered(self):
+        job = make_job()
+        for email in ('ok@example.com', 'bad@example.com'):
+            applicant = make_applicant(job, email=email)
+            self.client.post(f'/api/applicants/{applicant.id}/update_status/', {'status': 'rejected'})
+        flaky = FlakyConnection('bad@example.com')
+
+        self.assertEqual(deliver_outbox('test-worker', connection=flaky), (1, 1))
+        self.assertEqual(flaky.opened, 1)
+        bad = OutboundEmail.objects.get(to_email='bad@example.com')
+        self.assertEqual((bad.status, bad.attempts), ('queued', 1))
+
+        OutboundEmail.objects.filter(pk=bad.pk).update(run_after=bad.created_at)
+        with self.assertLogs('ats.email_service', 'ERROR') as logs:
+            self.assertEqual(deliver_outbox('test-worker', connection=flaky), (0, 1))
+        bad.refresh_from_db()
+        self.assertEqual((bad.status, bad.attempts), ('dead', 2))
+        self.assertIn('550', bad.last_error)
+        self.assertIn(f'Error sending email {bad.id} (attempt 2 of 2)', logs.output[0])
+        self.assertIn('550', logs.output[0])
+
+    def test_each_email_is_marked_sent_before_the_next_send(self):
+        for i in range(3):
+            OutboundEmail.objects.create(to_email=f'c{i}@example.com', subject='Update', body='Hi')
+
+        class CrashingConnection(FlakyConnection):
+            def send_messages(self, messages):
+                if len(self.sent) == 2:
+                    raise KeyboardInterrupt  # the worker dies mid-batch
+                return super().send_messages(messages)
+
+        with self.assertRaises(KeyboardInterrupt):
+            deliver_outbox('test-worker', connection=CrashingConnection('nobody@example.com'))
+        statuses = list(OutboundEmail.objects.order_by('id').values_list('status', flat=True))
+        self.assertEqual(statuses, ['sent', 'sent', 'sending'])
+
+    def test_once_keeps_going_past_a_batch_of_failures(self):
+        for address in ('bad@example.com', 'bad@example.com', 'ok1@example.com', 'ok2@example.com'):
+            OutboundEmail.objects.create(to_email=address, subject='Update', body='Hi')
+        flaky = FlakyConnection('bad@example.com')
+        with mock.patch('ats.email_service.get_connection', return_value=flaky):
+            call_command('deliver_emails', '--once', batch_size=2, stdout=io.StringIO())
+        self.assertEqual(sorted(m.to[0] for m in flaky.sent), ['ok1@example.com', 'ok2@example.com'])
+        self.assertEqual(OutboundEmail.objects.filter(status='queued', attempts=1).count(), 2)
+
+    def test_connection_failure_releases_batch_for_later(self):
+        OutboundEmail.objects.create(to_email='c@example.com', subject='Update', body='Hi')
+        down = mock.Mock(**{'open.side_effect': ConnectionRefusedError('down')})
+        with self.assertLogs('ats.email_service', 'ERROR') as logs:
+            self.assertEqual(deliver_outbox('test-worker', connection=down), (0, 1))
+        self.assertIn('ConnectionRefusedError: down', logs.output[0])
+        email = OutboundEmail.objects.get()
+        self.assertEqual((email.status, email.attempts), ('queued', 0))
+        self.assertGreater(email.run_after, timezone.now())
+        # So a --once run ends instead of retrying while the server is down
+        self.assertEqual(deliver_outbox('test-worker', connection=down), (0, 0))
+
+
+class BulkStatusUpdateTests(ATSTestCase):
+    def bulk_update(self, ids, **data):
+        return self.client.post(
+            '/api/applicants/bulk_update_status/',
+            {'applicant_ids': ids, **data},
+            format='json'
+        )
+
+    def test_updates_status_and_notes_and_queues_one_email_each(self):
+        job = make_job()
+        applicants = [make_applicant(job, email=f'c{i}@example.com') for i in range(3)]
+        other = make_applicant(job, email='untouched@example.com')
+        ids = [a.id for a in applicants]
+
+        response = self.bulk_update(ids, status='shortlisted', notes='Phone screen next week')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(response.data['updated_ids']), sorted(ids))
+        self.assertEqual(response.data['emails_queued'], 3)
+        self.assertEqual(
+            set(Applicant.objects.filter(id__in=ids).values_list('status', 'notes')),
+            {('shortlisted', 'Phone screen next week')}
+        )
+        other.refresh_from_db()
+        self.assertEqual((other.status, other.notes), ('new', ''))
+        self.assertEqual(
+            sorted(OutboundEmail.objects.values_list('to_email', flat=True)),
+            ['c0@example.com', 'c1@example.com', 'c2@example.com']
+        )
+
+    def test_query_count_does_not_grow_with_selection(self):
+        job = make_job()
+        small = [make_applicant(job, email=f's{i}@example.com').id for i in range(2)]
+        large = [make_applicant(job, email=f'l{i}@example.com').id for i in range(40)]
+        make_applicant(job, email='already-reviewed@example.com', status='reviewed')
+
+        with CaptureQueriesContext(connection) as small_queries:
+            self.bulk_update(small, status='reviewed', notes='ok')
+        with CaptureQueriesContext(connection) as large_queries:
+            self.bulk_update(large, status='reviewed', notes='ok')
+
+        self.assertEqual(len(small_queries), len(large_queries))
+
+    def test_invalid_payload_returns_400(self):
+        response = self.bulk_update([1], status='not-a-status')
+
+        self.assertEqual(response.status_code, 400)
+
+
+class JobCountQueryTests(ATSTestCase):
+    def make_jobs(self, count):
+        for i in range(count):
+            job = make_job(title=f'Job {i}')
+            make_applicant(job, email=f'new{i}@example.com')
+            make_applicant(job, email=f'hired{i}@example.com', status='hired')
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_job_listings_cost_constant_queries(self):
+        self.make_jobs(2)
+        small = {url: self.count_queries(url) for url in
+                 ('/api/jobs/', '/api/jobs/with_stats/', '/api/public/jobs/')}
+        self.make_jobs(8)
+
+        for url, query_count in small.items():
+            self.assertEqual(self.count_queries(url), query_count, url)
+
+    def test_counts_come_from_annotations(self):
+        self.make_jobs(1)
+        make_applicant(Job.objects.get(), email='another@example.com')
+
+        job_data = self.client.get('/api/jobs/with_stats/').data[0]
+
+        self.assertEqual(job_data['application_count'], 3)
+        self.assertEqual(job_data['new_applications_count'], 2)
+        self.assertEqual(job_data['status_counts'], {'new': 2, 'hired': 1})
+
+
+class ExportTests(ATSTestCase):
+    def setUp(self):
+        super().setUp()
+        job = make_job()
+        make_applicant(job, email='short@example.com', cover_letter='Hello')
+        make_applicant(job, email='long@example.com', cover_letter='x' * 150, status='hired')
+
+    def test_csv_export_streams_rows(self):
+        response = self.client.get('/api/applicants/export_csv/', {'ordering': 'email'})
+
+        self.assertTrue(response.streaming)
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0][:2], ['Name', 'Email'])
+        self.assertEqual([row[1] for row in rows[1:]], ['long@example.com', 'short@example.com'])
+        self.assertEqual(rows[1][4], 'Hired')
+        self.assertEqual(rows[1][5], 'x' * 100 + '...')
+
+    def test_jsonl_export_with_gzip(self):
+        response = self.client.get(
+            '/api/applicants/export_csv/', {'format': 'jsonl', 'status': 'hired'},
+            HTTP_ACCEPT_ENCODING='gzip, deflate'
+        )
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        body = gzip.decompress(b''.join(response.streaming_content)).decode()
+        records = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([r['email'] for r in records], ['long@example.com'])
+        self.assertEqual(records[0]['status'], 'Hired')
+
+    def test_unknown_format_is_rejected(self):
+        response = self.client.get('/api/applicants/export_csv/', {'format': 'xml'})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class StatusRollupTests(ATSTestCase):
+    def rollup(self):
+        return {
+            (job_id, status): count
+            for job_id, status, count in ApplicantStatusCount.objects.filter(count__gt=0)
+            .values_list('job_id', 'status', 'count')
+        }
+
+    def test_rollup_follows_create_transition_bulk_update_and_delete(self):
+        job = make_job()
+        first = make_applicant(job, email='a@example.com')
+        second = make_applicant(job, email='b@example.com')
+        self.assertEqual(self.rollup(), {(job.id, 'new'): 2})
+
+        self.client.post(f'/api/applicants/{first.id}/update_status/', {'status': 'reviewed'})
+        self.assertEqual(self.rollup(), {(job.id, 'new'): 1, (job.id, 'reviewed'): 1})
+
+        self.client.post(
+            '/api/applicants/bulk_update_status/',
+            {'applicant_ids': [first.id, second.id], 'status': 'hired'}, format='json'
+        )
+        self.assertEqual(self.rollup(), {(job.id, 'hired'): 2})
+
+        update_status(Applicant.objects.filter(pk=second.pk), 'rejected')
+        Applicant.objects.get(pk=first.pk).delete()
+        self.assertEqual(self.rollup(), {(job.id, 'rejected'): 1})
+
+    def test_dashboard_reads_rollup_and_reconcile_repairs_drift(self):
+        job = make_job()
+        make_applicant(job, email='a@example.com')
+        make_applicant(job, email='b@example.com', status='shortlisted')
+        ApplicantStatusCount.objects.filter(status='new').update(count=7)
+
+        self.assertEqual(self.client.get('/api/applicants/dashboard_stats/').data['new_applicants'], 7)
+
+        drift = reconcile()
+
+        self.assertEqual(drift, {(job.id, 'new'): (7, 1)})
+        stats = self.client.get('/api/applicants/dashboard_stats/').data
+        self.assertEqual((stats['total_applicants'], stats['new_applicants'], stats['shortlisted_applicants']), (2, 1, 1))
+
+    def test_migrate_backfills_an_empty_rollup(self):
+        job = make_job()
+        make_applicant(job, email='a@example.com')
+        make_applicant(job, email='b@example.com', status='hired')
+        ApplicantStatusCount.objects.all().delete()  # a database that predates the rollup
+
+        emit_post_migrate_signal(verbosity=0, interactive=False, db='default')
+        self.assertEqual(self.rollup(), {(job.id, 'new'): 1, (job.id, 'hired'): 1})
+        self.assertEqual(self.client.get('/api/applicants/dashboard_stats/').data['total_applicants'], 2)
+
+        # A populated rollup is left to the signals and reconcile_counts
+        ApplicantStatusCount.objects.filter(status='new').update(count=5)
+        with CaptureQueriesContext(connection) as queries:
+            emit_post_migrate_signal(verbosity=0, interactive=False, db='default')
+        self.assertEqual(self.rollup()[(job.id, 'new')], 5)
+        self.assertFalse([q for q in queries if 'GROUP BY' in q['sql']])
+
+
+class SearchTests(ATSTestCase):
+    def add_resume_text(self, applicant, text):
+        ResumeAnalysis.objects.create(
+            applicant=applicant, text=text, content_hash='0' * 64, extracted_at=timezone.now()
+        )
+
+    def search(self, query):
+        response = self.client.get('/api/search/', {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return [row['email'] for row in response.data]
+
+    def test_search_covers_resume_text_and_ranks_by_relevance_and_score(self):
+        job = make_job()
+        strong = make_applicant(job, name='Grace Hopper', email='grace@navy.mil', match_score=90)
+        weak = make_applicant(job, name='Alan Turing', email='alan@bletchley.uk', match_score=10)
+        make_applicant(job, name='Linus', email='linus@kernel.org', cover_letter='I like C')
+        self.add_resume_text(strong, 'Built Kubernetes operators and compilers')
+        self.add_resume_text(weak, 'Kubernetes hobbyist')
+
+        self.assertEqual(self.search('kubernetes'), ['grace@navy.mil', 'alan@bletchley.uk'])
+        self.assertEqual(self.search('kube'), ['grace@navy.mil', 'alan@bletchley.uk'])
+        self.assertEqual(self.search('bletchley'), ['alan@bletchley.uk'])
+        self.assertEqual(self.search('grace compilers'), ['grace@navy.mil'])
+
+    def test_index_follows_updates_and_deletes(self):
+        applicant = make_applicant(make_job(), name='Ada Lovelace')
+
+        applicant.name = 'Ada King'
+        applicant.save()
+        self.assertEqual(self.search('lovelace'), [])
+        self.assertEqual(self.search('king'), ['ada@example.com'])
+
+        applicant.delete()
+        self.assertEqual(self.search('king'), [])
+
+    def test_query_syntax_is_not_passed_through(self):
+        make_applicant(make_job())
+
+        self.assertEqual(self.search('"ada*" ^(-'), ['ada@example.com'])
+
+    def test_rebuild_inserts_in_batches_inside_one_transaction(self):
+        if not search_index.search_available():
+            self.skipTest('no full-text index on this database')
+        job = make_job()
+        for i in range(5):
+            make_applicant(job, name=f'Candidate{i}', email=f'c{i}@example.com')
+        Applicant.objects.filter(email='c0@example.com').update(name='Renamed')  # bypasses signals
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(search_index.rebuild_index(chunk_size=2), 5)
+        inserts = [q['sql'] for q in queries if 'INSERT INTO' in q['sql']]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(self.search('renamed'), ['c0@example.com'])
+
+        # A rebuild that fails part way leaves the previous index in place
+        Applicant.objects.filter(email='c1@example.com').update(name='Halfway')
+        real_upsert = search_index._upsert
+        calls = []
+
+        def failing_upsert(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 2:
+                raise RuntimeError('crash')
+            return real_upsert(*args, **kwargs)
+
+        with mock.patch.object(search_index, '_upsert', side_effect=failing_upsert), self.assertRaises(RuntimeError):
+            search_index.rebuild_index(chunk_size=2)
+        self.assertEqual(len(self.search('candidate')), 4)
+        self.assertEqual(self.search('halfway'), [])
+
+    def test_migrate_fills_an_empty_index(self):
+        if not search_index.search_available():
+            self.skipTest('no full-text index on this database')
+        make_applicant(make_job(), name='Ada Lovelace')
+        table = search_index.POSTGRES_TABLE if connection.vendor == 'postgresql' else search_index.SQLITE_TABLE
+        with connection.cursor() as cursor:
+            # A database whose applicants predate the index
+            cursor.execute(f"DELETE FROM {table}")
+        self.assertEqual(self.search('lovelace'), [])
+
+        emit_post_migrate_signal(verbosity=0, interactive=False, db='default')
+        self.assertEqual(self.search('lovelace'), ['ada@example.com'])
+
+        # A populated index is left to the signals and rebuild_search_index
+        with mock.patch.object(search_index, 'rebuild_index') as rebuild:
+            emit_post_migrate_signal(verbosity=0, interactive=False, db='default')
+        rebuild.assert_not_called()
+
+    def test_index_update_failures_are_logged(self):
+        if not search_index.search_available():
+            self.skipTest('no full-text index on this database')
+        with mock.patch.object(search_index, '_upsert', side_effect=DatabaseError('locked')), \
+                self.assertLogs('ats.signals', 'ERROR') as logs:
+            applicant = make_applicant(make_job())
+        self.assertTrue(Applicant.objects.filter(pk=applicant.pk).exists())
+        self.assertIn(f'applicant {applicant.pk}', logs.output[0])
+
+
+class DuplicateApplicationTests(ATSTestCase):
+    def test_email_is_unique_per_job_ignoring_case(self):
+        job = make_job()
+        make_applicant(job, email='Ada@Example.com')
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            make_applicant(job, email='ada@example.COM')
+        make_applicant(make_job(), email='ada@example.com')
+
+    def test_duplicate_application_returns_400(self):
+        job = make_job()
+        make_applicant(job, email='ada@example.com')
+        response = APIClient().post('/api/public/applications/', {
+            'job': job.id,
+            'name': 'Ada Lovelace',
+            'email': 'ADA@example.com',
+            'resume': SimpleUploadedFile('resume.pdf', b'%PDF-1.4'),
+        }, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Applicant.objects.filter(job=job).count(), 1)
+
+    def test_recruiter_create_maps_integrity_error_to_400(self):
+        job = make_job()
+        make_applicant(job, email='ada@example.com')
+        response = self.client.post('/api/applicants/', {
+            'job': job.id,
+            'name': 'Ada Lovelace',
+            'email': 'Ada@example.com',
+            'resume': SimpleUploadedFile('resume.pdf', b'%PDF-1.4'),
+        }, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('email', response.json())
+
+    def test_recruiter_edit_into_a_duplicate_returns_400(self):
+        job, other_job = make_job(), make_job()
+        make_applicant(job, email='ada@example.com')
+        by_email = make_applicant(job, email='grace@example.com')
+        by_job = make_applicant(other_job, email='ADA@example.com')
+
+        response = self.client.patch(f'/api/applicants/{by_email.id}/', {'email': 'Ada@Example.com'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('email', response.json())
+        response = self.client.patch(f'/api/applicants/{by_job.id}/', {'job': job.id}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        by_email.refresh_from_db()
+        by_job.refresh_from_db()
+        self.assertEqual((by_email.email, by_job.job_id), ('grace@example.com', other_job.id))
+
+
+class KeysetPaginationTests(ATSTestCase):
+    def setUp(self):
+        super().setUp()
+        job = make_job()
+        # Repeated scores exercise the id tiebreaker
+        self.applicants = [
+            make_applicant(job, email=f'a{i}@example.com', match_score=score)
+            for i, score in enumerate([50, 80, 80, 20, 80, 50, 95])
+        ]
+
+    def walk(self, url):
+        ids, pages = [], []
+        while url:
+            with CaptureQueriesContext(connection) as ctx:
+                data = self.client.get(url).json()
+            self.assertFalse(any('COUNT(' in q['sql'].upper() for q in ctx.captured_queries))
+            self.assertNotIn('count', data)
+            pages.append(data)
+            ids += [row['id'] for row in data['results']]
+            url = data['next']
+        return ids, pages
+
+    def test_walks_score_ordering_with_id_tiebreak_and_back(self):
+        ids, pages = self.walk('/api/applicants/?cursor=&ordering=-match_score&page_size=3')
+        expected = [a.id for a in sorted(self.applicants, key=lambda a: (-a.match_score, -a.id))]
+        self.assertEqual(ids, expected)
+        self.assertEqual(len(pages), 3)
+        self.assertIsNone(pages[0]['previous'])
+
+        previous = self.client.get(pages[2]['previous']).json()
+        self.assertEqual([row['id'] for row in previous['results']], expected[3:6])
+        self.assertIsNotNone(previous['next'])
+
+    def test_name_ordering_and_default_pagination_unchanged(self):
+        ids, _ = self.walk('/api/applicants/?cursor=&ordering=name&page_size=2')
+        self.assertEqual(ids, sorted(a.id for a in self.applicants))
+
+        data = self.client.get('/api/applicants/').json()
+        self.assertEqual(data['count'], len(self.applicants))
+
+    def test_bad_cursor_is_404(self):
+        response = self.client.get('/api/applicants/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+
+    def test_long_runs_of_equal_scores_have_no_gaps_or_duplicates(self):
+        job = Applicant.objects.first().job
+        self.applicants += [
+            make_applicant(job, email=f'tie{i}@example.com', match_score=70) for i in range(40)
+        ]
+        expected = [a.id for a in sorted(self.applicants, key=lambda a: (-a.match_score, -a.id))]
+        ids, pages = self.walk('/api/applicants/?cursor=&ordering=-match_score&page_size=4')
+        self.assertEqual(ids, expected)
+
+        # And back again from the last page
+        backwards, url = [], pages[-1]['previous']
+        while url:
+            data = self.client.get(url).json()
+            backwards = [row['id'] for row in data['results']] + backwards
+            url = data['previous']
+        self.assertEqual(backwards + [row['id'] for row in pages[-1]['results']], expected)
+
+        Applicant.objects.filter(email__startswith='tie').update(updated_at=timezone.now())
+        ids, _ = self.walk('/api/applicants/?cursor=&ordering=-updated_at&page_size=5')
+        self.assertEqual(ids, list(Applicant.objects.order_by('-updated_at', '-id').values_list('id', flat=True)))
+
+    def test_pages_seek_through_the_score_index(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('checks the SQLite query plan')
+        data = self.client.get('/api/applicants/?cursor=&ordering=-match_score&page_size=2').json()
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(data['next'])
+        sql = next(q['sql'] for q in ctx.captured_queries if 'ORDER BY' in q['sql'])
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn('SEARCH ats_applicant USING INDEX applicant_score', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+
+class SparseFieldsTests(ATSTestCase):
+    def setUp(self):
+        super().setUp()
+        self.applicant = make_applicant(make_job(), cover_letter='A long cover letter', notes='Strong')
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        sql = ' '.join(q['sql'] for q in ctx.captured_queries if 'ats_applicant' in q['sql'])
+        return response.json(), sql
+
+    def test_list_rows_are_compact_and_skip_heavy_columns(self):
+        data, sql = self.get('/api/applicants/')
+        row = data['results'][0]
+        self.assertEqual(row['job_title'], 'Backend Engineer')
+        self.assertTrue(row['resume_url'].startswith('http://testserver/'))
+        self.assertNotIn('cover_letter', row)
+        self.assertNotIn('cover_letter', sql)
+
+        data, sql = self.get('/api/applicants/?expand=cover_letter')
+        self.assertEqual(data['results'][0]['cover_letter'], 'A long cover letter')
+        self.assertIn('cover_letter', sql)
+
+    def test_fields_narrows_payload_and_query(self):
+        data, sql = self.get('/api/applicants/?fields=id,name,match_score')
+        self.assertEqual(set(data['results'][0]), {'id', 'name', 'match_score'})
+        self.assertNotIn('"email"', sql)
+
+        data, _ = self.get(f'/api/applicants/{self.applicant.id}/')
+        self.assertEqual(data['notes'], 'Strong')
+
+    def test_writes_are_not_pruned(self):
+        url = f'/api/applicants/{self.applicant.id}/?fields=id'
+        response = self.client.patch(url, {'notes': 'Hire', 'cover_letter': 'Updated'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.applicant.refresh_from_db()
+        self.assertEqual((self.applicant.notes, self.applicant.cover_letter), ('Hire', 'Updated'))
+
+        response = self.client.post('/api/applicants/?fields=id', {
+            'job': self.applicant.job_id, 'name': 'Grace Hopper', 'email': 'grace@example.com',
+            'resume': SimpleUploadedFile('resume.pdf', b'%PDF-1.4'),
+        }, format='multipart')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['email'], 'grace@example.com')
+
+
+class PublicJobCacheTests(ATSTestCase):
+    def setUp(self):
+        super().setUp()
+        self.job = make_job()
+        self.anonymous = APIClient()
+
+    def test_conditional_get_returns_304(self):
+        response = self.anonymous.get('/api/public/jobs/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('Last-Modified', response)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.anonymous.get('/api/public/jobs/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+        detail = self.anonymous.get(f'/api/public/jobs/{self.job.id}/')
+        response = self.anonymous.get(
+            f'/api/public/jobs/{self.job.id}/', HTTP_IF_MODIFIED_SINCE=detail['Last-Modified']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_payload_is_cached_until_a_job_changes(self):
+        first = self.anonymous.get('/api/public/jobs/')
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.anonymous.get('/api/public/jobs/').json(), first.json())
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+        self.job.title = 'Platform Engineer'
+        self.job.save()
+        response = self.anonymous.get('/api/public/jobs/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['title'], 'Platform Engineer')
+
+        self.job.is_active = False
+        self.job.save()
+        self.assertEqual(self.anonymous.get('/api/public/jobs/').json(), [])
+        self.assertEqual(self.anonymous.get(f'/api/public/jobs/{self.job.id}/').status_code, 404)
+
+
+class BoundedExtractionTests(TestCase):
+    def setUp(self):
+        self.pdf = make_pdf([f'page {i} python django' for i in range(10)])
+
+    def test_full_document_within_budgets(self):
+        result = extract_pdf(io.BytesIO(self.pdf), max_pages=20, max_chars=10000, time_budget=5)
+        self.assertEqual((result.pages_read, result.page_count, result.truncated), (10, 10, ()))
+        self.assertIn('page 9 python', result.text)
+
+    def test_page_budget_stops_without_parsing_the_rest(self):
+        with mock.patch.object(PyPDF2.PageObject, 'extract_text', autospec=True,
+                               side_effect=lambda page: 'text') as extract:
+            result = extract_pdf(io.BytesIO(self.pdf), max_pages=3, max_chars=10000, time_budget=5)
+        self.assertEqual(extract.call_count, 3)
+        self.assertEqual((result.pages_read, result.page_count, result.truncated), (3, 10, ('pages',)))
+
+    def test_char_and_time_budgets(self):
+        result = extract_pdf(io.BytesIO(self.pdf), max_pages=20, max_chars=30, time_budget=5)
+        self.assertEqual(result.truncated, ('chars',))
+        self.assertLessEqual(len(result.text), 30)
+
+        result = extract_pdf(io.BytesIO(self.pdf), max_pages=20, max_chars=10000, time_budget=0)
+        self.assertEqual((result.pages_read, result.truncated), (1, ('time',)))
+
+    @override_settings(ATS_PDF_MAX_PAGES=2)
+    def test_analysis_records_truncation(self):
+        resume = SimpleUploadedFile('resume.pdf', self.pdf)
+        self.assertEqual(analyze_resume(resume)['truncated'], ['pages'])
+
+
+@override_settings(ATS_EXTRACTION_ISOLATED=True)
+class ExtractionPoolTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutdown_pool()
+        super().tearDownClass()
+
+    def extract(self, name, content):
+        return extract_isolated(SimpleUploadedFile(name, content))
+
+    def test_extracts_in_child_and_reports_structured_errors(self):
+        self.assertEqual(self.extract('cv.pdf', make_pdf(['python developer'])).text, 'python developer')
+
+        with self.assertRaises(ExtractionError) as ctx:
+            self.extract('cv.pdf', b'not a pdf')
+        self.assertEqual(ctx.exception.code, 'unreadable')
+
+        analysis = analyze_resume(SimpleUploadedFile('cv.txt', b'plain text'), 'python')
+        self.assertEqual(analysis['error']['code'], 'unsupported_type')
+        self.assertEqual(analysis['text'], '')
+
+    @skipUnless(extraction_pool.resource, 'needs resource rlimits')
+    @override_settings(ATS_EXTRACTION_MEMORY_MB=200)
+    def test_memory_limit_stops_decompression_bomb(self):
+        shutdown_pool()
+        with self.assertRaises(ExtractionError) as ctx:
+            self.extract('cv.pdf', make_pdf_bomb(300))
+        self.assertEqual(ctx.exception.code, 'memory_limit')
+        shutdown_pool()
+
+    @override_settings(ATS_EXTRACTION_MEMORY_MB=0, ATS_EXTRACTION_TIMEOUT=0.05)
+    def test_hung_child_is_killed_and_pool_replaced(self):
+        shutdown_pool()
+        with self.assertRaises(ExtractionError) as ctx:
+            self.extract('cv.pdf', make_pdf_bomb(400))
+        self.assertEqual(ctx.exception.code, 'timeout')
+
+        with override_settings(ATS_EXTRACTION_TIMEOUT=20):
+            self.assertEqual(self.extract('cv.pdf', make_pdf(['recovered'])).text, 'recovered')
+        shutdown_pool()
+
+
+@override_settings(ATS_EXTRACTION_ISOLATED=False)
+class ResumeDedupTests(ATSTestCase):
+    def setUp(self):
+        super().setUp()
+        self.pdf = make_pdf(['python django developer'])
+
+    def test_identical_uploads_share_one_file_and_one_extraction(self):
+        first = make_applicant(make_job(), resume=SimpleUploadedFile('Ada CV.pdf', self.pdf))
+        second = make_applicant(make_job(title='Data Engineer'), email='ada@example.org',
+                                resume=SimpleUploadedFile('cv-final.PDF', self.pdf))
+
+        self.assertEqual(first.resume.name, second.resume.name)
+        self.assertIsNotNone(digest_from_name(first.resume.name))
+        self.assertEqual(len(first.resume.storage.listdir(first.resume.name.rsplit('/', 1)[0])[1]), 1)
+        self.assertEqual(second.get_resume_filename(), 'cv-final.PDF')
+
+        with mock.patch.object(ats_scorer, 'extract_resume', wraps=ats_scorer.extract_resume) as extract:
+            score_applicant(first, reparse=True)
+            score_applicant(second, reparse=True)
+        self.assertEqual(extract.call_count, 1)
+        self.assertEqual(second.analysis.text, first.analysis.text)
+        self.assertIn('django', second.analysis.skills)
+
+    def test_dedupe_command_moves_legacy_files(self):
+        job = make_job()
+        storage = Applicant._meta.get_field('resume').storage
+        applicants = []
+        for i in range(3):
+            applicant = make_applicant(job, email=f'legacy{i}@example.com')
+            legacy_name = storage.save(f'resumes/legacy_{i}.pdf', ContentFile(self.pdf))
+            Applicant.objects.filter(pk=applicant.pk).update(resume=legacy_name, resume_name='')
+            applicants.append(legacy_name)
+
+        call_command('dedupe_resumes', stdout=io.StringIO())
+
+        names = set(Applicant.objects.filter(job=job).values_list('resume', flat=True))
+        self.assertEqual(len(names), 1)
+        self.assertIsNotNone(digest_from_name(names.pop()))
+        self.assertFalse(any(storage.exists(name) for name in applicants))
+        self.assertEqual(Applicant.objects.get(email='legacy0@example.com').resume_name, 'legacy_0.pdf')
+
+
+@override_settings(ATS_EXTRACTION_ISOLATED=False)
+class JobMatchTests(ATSTestCase):
+    def setUp(self):
+        super().setUp()
+        self.jobs = [
+            make_job(title='Backend', description='Python Django developer', requirements='postgresql, docker'),
+            make_job(title='Frontend', description='React TypeScript developer', requirements='css'),
+            make_job(title='Ops', description='Kubernetes operator', requirements='docker, terraform'),
+            make_job(title='Closed', description='Python Django developer', is_active=False),
+        ]
+        self.pdf = make_pdf(['Python Django developer with docker and postgresql'])
+
+    def test_matches_equal_per_job_scores(self):
+        applicant = make_applicant(self.jobs[0], resume=SimpleUploadedFile('cv.pdf', self.pdf))
+        score_applicant(applicant)
+
+        response = self.client.get(f'/api/applicants/{applicant.id}/job_matches/')
+        matches = response.json()['matches']
+        self.assertEqual([m['job_title'] for m in matches][:2], ['Backend', 'Ops'])
+        self.assertNotIn('Closed', [m['job_title'] for m in matches])
+        for match in matches:
+            expected = score_analysis(applicant.analysis, get_job_profile(Job.objects.get(pk=match['job_id'])))
+            self.assertEqual(match['overall_score'], expected['overall_score'])
+            self.assertEqual(set(match['matched_skills']), set(expected['matched_skills']))
+
+    def test_public_match_and_index_refresh(self):
+        def match():
+            response = APIClient().post('/api/public/jobs/match/', {
+                'resume': SimpleUploadedFile('cv.pdf', self.pdf)}, format='multipart')
+            self.assertEqual(response.status_code, 200)
+            return [m['job_title'] for m in response.json()['matches']]
+
+        self.assertEqual(match()[0], 'Backend')
+        self.jobs[0].is_active = False
+        self.jobs[0].save()
+        self.assertNotIn('Backend', match())
+
+        response = APIClient().post('/api/public/jobs/match/', {
+            'resume': SimpleUploadedFile('cv.pdf', b'junk')}, format='multipart')
+        self.assertEqual(response.json()['code'], 'unreadable')
+
+    @override_settings(ATS_EXTRACTION_ISOLATED=False, ATS_PUBLIC_MATCH_RATE='2/min')
+    def test_public_match_is_isolated_and_rate_limited(self):
+        def post(i):
+            return APIClient().post('/api/public/jobs/match/', {
+                'resume': SimpleUploadedFile('cv.pdf', make_pdf([f'Python developer {i}']))}, format='multipart')
+
+        parsed = ExtractedText('Python Django developer')
+        with mock.patch('ats.extraction_pool.extract_isolated', return_value=parsed) as isolated, \
+                mock.patch.object(ats_scorer, 'extract_resume_inline') as inline:
+            self.assertEqual([post(i).status_code for i in range(2)], [200, 200])
+            throttled = post(2)
+        self.assertEqual(isolated.call_count, 2)
+        inline.assert_not_called()
+        self.assertEqual(throttled.status_code, 429)
+        self.assertIn('Retry-After', throttled)
+
+    def test_public_match_turns_requests_away_when_busy(self):
+        with mock.patch.object(views, '_public_match_slots', threading.BoundedSemaphore(1)) as slots, \
+                mock.patch('ats.views.match_resume') as match:
+            slots.acquire()
+            response = APIClient().post('/api/public/jobs/match/', {
+                'resume': SimpleUploadedFile('cv.pdf', self.pdf)}, format='multipart')
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response['Retry-After'], '5')
+            match.assert_not_called()
+
+            slots.release()
+            match.return_value = []
+            response = APIClient().post('/api/public/jobs/match/', {
+                'resume': SimpleUploadedFile('cv.pdf', self.pdf)}, format='multipart')
+            self.assertEqual(response.status_code, 200)
+            # The slot is given back after the request
+            self.assertTrue(slots.acquire(blocking=False))
+
+    def test_unanalyzed_applicant_is_409(self):
+        applicant = make_applicant(self.jobs[0])
+        self.assertEqual(self.client.get(f'/api/applicants/{applicant.id}/job_matches/').status_code, 409)
+
+
+@skipUnless(tfidf.TFIDF_AVAILABLE, 'numpy/scipy not installed')
+class TfidfRankingTests(ATSTestCase):
+    DOCS = {
+        1: 'python django developer postgresql docker',
+        2: 'react typescript frontend developer css',
+        3: 'python python data pipelines spark',
+        4: 'kubernetes docker terraform operator',
+    }
+    QUERY = 'python django developer docker'
+
+    def setUp(self):
+        super().setUp()
+        # Job ids are reused across rolled-back tests
+        tfidf._indexes.clear()
+        self.addCleanup(tfidf._indexes.clear)
+
+    def make_index(self, docs):
+        index = tfidf.TfidfIndex()
+        for applicant_id, text in docs.items():
+            index.add(applicant_id, text)
+        return index
+
+    def test_incremental_updates_match_a_rebuild(self):
+        index = self.make_index({1: self.DOCS[1], 2: self.DOCS[2]})
+        index.rank(self.QUERY)
+        index.add(3, self.DOCS[3])
+        index.add(4, 'unrelated placeholder')
+        index.add(4, self.DOCS[4])
+        index.add(5, 'python')
+        index.remove(5)
+
+        self.assertEqual(index.rank(self.QUERY), self.make_index(self.DOCS).rank(self.QUERY))
+        ranked = index.rank(self.QUERY, limit=2)
+        self.assertEqual([applicant_id for applicant_id, _ in ranked], [1, 3])
+        self.assertLessEqual(ranked[0][1], 100)
+
+    def test_ranking_endpoint_follows_database(self):
+        job = make_job(description='Python Django developer', requirements='docker')
+        applicants = {}
+        for applicant_id, text in self.DOCS.items():
+            applicant = make_applicant(job, email=f'{applicant_id}@example.com', match_score=applicant_id)
+            ResumeAnalysis.objects.create(applicant=applicant, text=text, extracted_at=timezone.now())
+            applicants[applicant_id] = applicant
+
+        def ranking(engine='tfidf'):
+            response = self.client.get(f'/api/jobs/{job.id}/ranking/', {'engine': engine, 'limit': 3})
+            self.assertEqual(response.status_code, 200)
+            return [row['id'] for row in response.json()['results']]
+
+        self.assertEqual(ranking()[:2], [applicants[1].id, applicants[3].id])
+        applicants[1].delete()
+        newcomer = make_applicant(job, email='new@example.com')
+        ResumeAnalysis.objects.create(applicant=newcomer, text=self.DOCS[1], extracted_at=timezone.now())
+        self.assertEqual(ranking()[0], newcomer.id)
+        self.assertNotIn(applicants[1].id, ranking())
+        self.assertEqual(ranking('keywords'), [applicants[4].id, applicants[3].id, applicants[2].id])
+
+    def test_repeated_syncs_do_not_grow_the_matrix(self):
+        job = make_job()
+        extracted_at = timezone.now()
+        analyses = []
+        for applicant_id, text in self.DOCS.items():
+            applicant = make_applicant(job, email=f'{applicant_id}@example.com')
+            # All in one timestamp, the case the >= watermark re-reads
+            analyses.append(ResumeAnalysis.objects.create(applicant=applicant, text=text, extracted_at=extracted_at))
+
+        index = tfidf.get_job_index(job.id)
+        rows = index.matrix().shape[0]
+        for _ in range(3):
+            self.assertIs(tfidf.get_job_index(job.id), index)
+        self.assertEqual(index.matrix().shape[0], rows)
+        self.assertEqual(len(index.alive), index.size)
+
+        # A late row with the same timestamp is still picked up, and a re-extraction replaces its row
+        late = make_applicant(job, email='late@example.com')
+        ResumeAnalysis.objects.create(applicant=late, text='scala spark', extracted_at=extracted_at)
+        analyses[0].text, analyses[0].extracted_at = 'golang', timezone.now()
+        analyses[0].save()
+        index = tfidf.get_job_index(job.id)
+        self.assertEqual((index.size, len(index.alive) - index.size), (5, 1))
+        self.assertEqual(tfidf.get_job_index(job.id).matrix().shape[0], 6)
+
+    @override_settings(ATS_TFIDF_INDEX_CACHE_SIZE=2)
+    def test_indexes_are_evicted_least_recently_used(self):
+        first, second, third = make_job(), make_job(), make_job()
+        for job in (first, second, first, third):
+            tfidf.get_job_index(job.id)
+        self.assertEqual(list(tfidf._indexes), [first.id, third.id])
+
+        tfidf._indexes.clear()
+        self.assertEqual(tfidf.warm_job_indexes(), 2)
+        self.assertEqual(set(tfidf._indexes), {second.id, third.id})
+
+    @override_settings(ATS_TFIDF_INLINE_BUILD_ROWS=2)
+    def test_large_job_is_indexed_in_the_background(self):
+        job = make_job(description='Python Django developer', requirements='docker')
+        for applicant_id, text in self.DOCS.items():
+            applicant = make_applicant(job, email=f'{applicant_id}@example.com', match_score=applicant_id)
+            ResumeAnalysis.objects.create(applicant=applicant, text=text, extracted_at=timezone.now())
+
+        def ranking():
+            response = self.client.get(f'/api/jobs/{job.id}/ranking/', {'engine': 'tfidf'})
+            self.assertEqual(response.status_code, 200)
+            return response.json()
+
+        with mock.patch.object(tfidf.threading, 'Thread') as thread:
+            for _ in range(2):
+                data = ranking()
+                self.assertEqual((data['engine'], data['tfidf_index']), ('keywords', 'building'))
+                self.assertEqual(data['results'][0]['match_score'], 4)
+        # One build per job, however many requests arrive meanwhile
+        thread.assert_called_once()
+        self.assertFalse(tfidf.index_ready(job.id))
+
+        # Run the build here; closing this thread's connection would end the test transaction
+        with mock.patch.object(tfidf, 'connection'):
+            thread.call_args.kwargs['target'](*thread.call_args.kwargs['args'])
+        data = ranking()
+        self.assertEqual(data['engine'], 'tfidf')
+        self.assertNotIn('tfidf_index', data)
+        self.assertFalse(tfidf._building)
+
+
+@override_settings(ATS_REQUEST_LOG=True)
+class RequestTimingTests(ATSTestCase):
+    def logged(self, path):
+        with self.assertLogs('ats.requests', level='INFO') as logs:
+            response = self.client.get(path)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertEqual(len(logs.records), 1)
+        return response, logs.records[0], json.loads(logs.records[0].getMessage())
+
+    def test_server_timing_and_log_line(self):
+        job = make_job()
+        make_applicant(job)
+        response, _, record = self.logged('/api/applicants/')
+
+        self.assertRegex(response['Server-Timing'], r'^total;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries"')
+        self.assertIn('serialize;dur=', response['Server-Timing'])
+        self.assertEqual((record['method'], record['path'], record['status']), ('GET', '/api/applicants/', 200))
+        self.assertGreater(record['db_queries'], 0)
+        self.assertEqual(record['spans']['serialize']['count'], 1)
+        self.assertNotIn('n_plus_one', record)
+
+    def test_streamed_queries_are_logged_after_the_stream(self):
+        job = make_job()
+        make_applicant(job)
+        response, _, record = self.logged('/api/applicants/export_csv/')
+        # The export query runs while streaming, after the header was sent
+        self.assertIn('desc="0 queries"', response['Server-Timing'])
+        self.assertGreaterEqual(record['db_queries'], 1)
+
+    @override_settings(ATS_N_PLUS_ONE_THRESHOLD=3)
+    def test_repeated_query_shapes_are_flagged(self):
+        jobs = [make_job(title=f'Job {i}') for i in range(4)]
+        with RequestMetrics() as metrics:
+            for job in jobs:
+                Job.objects.filter(pk=job.pk, title__in=['a', 'b'][:job.pk % 2 + 1]).exists()
+            Applicant.objects.exists()
+        repeated = metrics.repeated_queries()
+        self.assertEqual(len(repeated), 1)
+        self.assertEqual(repeated[0]['count'], 4)
+
+        # Listing jobs is a single query however many there are
+        _, record, data = self.logged('/api/jobs/')
+        self.assertEqual(record.levelname, 'INFO')
+        self.assertNotIn('n_plus_one', data)
+
+    def test_nested_spans_count_once(self):
+        with RequestMetrics() as metrics:
+            with span('score'):
+                with span('score'), span('parse'):
+                    pass
+            with span('score'):
+                pass
+        self.assertEqual(metrics.spans['score'][0], 2)
+        self.assertEqual(metrics.spans['parse'][0], 1)
+        with span('outside'):
+            pass
+        self.assertNotIn('outside', metrics.spans)
+
+
+@override_settings(ATS_EXTRACTION_ISOLATED=False, ATS_METRICS_TOKEN='scrape-secret',
+                   EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class MetricsTests(ATSTestCase):
+    def scrape(self, **headers):
+        return APIClient().get('/api/metrics/', **headers)
+
+    def series(self):
+        return self.scrape(HTTP_AUTHORIZATION='Bearer scrape-secret').content.decode()
+
+    def test_hooks_record_without_changing_results(self):
+        job = make_job()
+        response = APIClient().post('/api/public/applications/', {
+            'name': 'Ada', 'email': 'ada@example.com', 'job': job.id,
+            'resume': SimpleUploadedFile('cv.pdf', make_pdf(['Python Django developer'])),
+        }, format='multipart')
+        self.assertEqual(response.status_code, 201)
+        score_applicant(Applicant.objects.get())
+        with self.assertRaises(ExtractionError):
+            ats_scorer.extract_resume(SimpleUploadedFile('cv.pdf', b'junk'))
+        deliver_outbox('test-worker', connection=FlakyConnection('ada@example.com'))
+
+        text = self.series()
+        self.assertIn('ats_intake_requests_total{status="201"} 1', text)
+        self.assertIn('ats_extraction_seconds_count{file_type="pdf",pages="1"} 1', text)
+        self.assertIn('ats_extraction_seconds_bucket{file_type="pdf",pages="1",le="+Inf"} 1', text)
+        self.assertIn('ats_extraction_failures_total{file_type="pdf",code="unreadable"} 1', text)
+        self.assertIn('ats_score_seconds_count 1', text)
+        self.assertIn('ats_email_send_seconds_count{outcome="failed"} 1', text)
+        self.assertIn('ats_email_failures_total{reason="send"} 1', text)
+
+    def test_values_are_summed_across_process_files(self):
+        metrics.INTAKE_REQUESTS.inc(status=201)
+        metrics.SCORE_SECONDS.observe(0.02)
+        other = {
+            'ats_intake_requests_total': {'["201"]': 2},
+            'ats_score_seconds': {'[]': [0, 0, 1] + [0] * 9 + [0.02, 1]},
+        }
+        with open(os.path.join(metrics.metrics_dir(), 'other-worker.json'), 'w') as f:
+            json.dump(other, f)
+        self.addCleanup(os.remove, os.path.join(metrics.metrics_dir(), 'other-worker.json'))
+
+        text = self.series()
+        self.assertIn('ats_intake_requests_total{status="201"} 3', text)
+        self.assertIn('ats_score_seconds_bucket{le="0.025"} 2', text)
+        self.assertIn('ats_score_seconds_count 2', text)
+        self.assertIn('# TYPE ats_score_seconds histogram', text)
+
+    def write_process_file(self, file_id, count):
+        os.makedirs(metrics.metrics_dir(), exist_ok=True)
+        path = os.path.join(metrics.metrics_dir(), f'{file_id}.json')
+        with open(path, 'w') as f:
+            json.dump({'ats_intake_requests_total': {'["201"]': count}}, f)
+        self.addCleanup(lambda: os.path.exists(path) and os.remove(path))
+        return path
+
+    def test_files_of_exited_processes_are_folded_into_the_aggregate(self):
+        exited = subprocess.Popen([sys.executable, '-c', ''])
+        exited.wait()
+        dead = self.write_process_file(f'{metrics._HOST}-{exited.pid}-deadbeef', 2)
+        # Another host's pids mean nothing here, so its file is left alone
+        remote = self.write_process_file(f'other-host-{exited.pid}-deadbeef', 3)
+        metrics.INTAKE_REQUESTS.inc(status=201)
+
+        self.assertIn('ats_intake_requests_total{status="201"} 6', self.series())
+        self.assertFalse(os.path.exists(dead))
+        self.assertTrue(os.path.exists(remote))
+        self.assertIn('ats_intake_requests_total{status="201"} 6', self.series())
+
+        # At exit a process folds its own file, and later values start from zero
+        metrics.fold_own_file()
+        self.assertEqual(
+            sorted(name for name in os.listdir(metrics.metrics_dir()) if name.endswith('.json')),
+            sorted([metrics.AGGREGATE, os.path.basename(remote)]))
+        metrics.INTAKE_REQUESTS.inc(status=201)
+        self.assertIn('ats_intake_requests_total{status="201"} 7', self.series())
+
+    def test_file_already_in_the_aggregate_is_not_counted_twice(self):
+        # A crash after the aggregate was written but before the file was deleted
+        path = self.write_process_file(f'{metrics._HOST}-999999999-deadbeef', 2)
+        with open(os.path.join(metrics.metrics_dir(), metrics.AGGREGATE), 'w') as f:
+            json.dump({'values': {'ats_intake_requests_total': {'["201"]': 2}},
+                       'folded': [os.path.basename(path)[:-5]]}, f)
+
+        self.assertIn('ats_intake_requests_total{status="201"} 2', self.series())
+        self.assertFalse(os.path.exists(path))
+        self.assertIn('ats_intake_requests_total{status="201"} 2', self.series())
+
+    def test_requires_staff_or_scrape_token(self):
+        self.assertEqual(self.scrape().status_code, 401)
+        self.assertEqual(self.scrape(HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+
+
+class TextAnalysisTests(TestCase):
+    TEXT = ('Senior  Node.js / React developer;\tC++ and C#, CI/CD on Kubernetes (k8s).\n'
+            'Machine\n learning with scikit-learn, SQL-Server and the REST APIs for our team.')
+
+    def test_matches_separate_keyword_and_skill_extraction(self):
+        for chunk in (ats_scorer.TOKENIZE_CHUNK, 7):
+            with self.subTest(chunk=chunk), mock.patch.object(ats_scorer, 'TOKENIZE_CHUNK', chunk):
+                analysis = TextAnalysis.of(self.TEXT)
+                self.assertEqual(analysis.token_counts, Counter(extract_keywords(self.TEXT)))
+                self.assertEqual(analysis.skills, set(extract_technical_skills(self.TEXT)))
+                self.assertEqual(analysis.normalized, ' '.join(self.TEXT.lower().split()))
+        self.assertIn('machine learning', TextAnalysis.of(self.TEXT).skills)
+
+    def test_candidate_text_is_analyzed_once(self):
+        matcher = ats_scorer.get_skill_matcher()
+        with mock.patch.object(TextAnalysis, 'of', wraps=TextAnalysis.of) as of, \
+                mock.patch.object(matcher, 'find_normalized', wraps=matcher.find_normalized) as find:
+            result = ats_scorer.analyze_text(self.TEXT, 'Python cover letter')
+        self.assertEqual((of.call_count, find.call_count), (1, 1))
+        self.assertIn('python', result.skills)
+
+    def test_scorers_take_analyses_without_retokenizing(self):
+        job = 'Python Django developer with Kubernetes and SQL experience'
+        resume = TextAnalysis.of(self.TEXT)
+        profile = build_job_profile(job)
+        with mock.patch.object(TextAnalysis, 'of', side_effect=AssertionError('retokenized')):
+            by_profile = calculate_keyword_match_score(resume, profile)
+            skill_score = calculate_skill_match_score(resume, profile)
+            scored = score_analysis(resume, profile)
+            # Stored lists come back in a different order than the sets iterate
+            stored = score_analysis(StoredTerms(sorted(resume.keywords, reverse=True), sorted(resume.skills)), profile)
+        self.assertEqual(by_profile, calculate_keyword_match_score(self.TEXT, job))
+        self.assertEqual(by_profile, scored['keyword_score'])
+        self.assertEqual(skill_score, scored['skill_score'])
+        self.assertEqual(skill_score, calculate_skill_match_score(sorted(resume.skills), sorted(profile.skills)))
+        self.assertEqual(scored, stored)
+        self.assertEqual(scored['matched_keywords'], sorted(scored['matched_keywords']))
+        self.assertEqual(calculate_keyword_match_score('', job), 0.0)
+
+    def test_peak_memory_stays_proportional_to_text(self):
+        text = 'Built a data pipeline using Python, Django & PostgreSQL for the reporting team.\n' * 2000
+        ats_scorer.get_skill_matcher()
+
+        def peak(func):
+            func()
+            tracemalloc.start()
+            try:
+                func()
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        single = peak(lambda: TextAnalysis.of(text))
+        # The lowered and normalized copies plus one slice, not a list of every word
+        self.assertLess(single, 4 * len(text))
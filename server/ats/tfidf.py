@@ -0,0 +1,303 @@
+"""
+Optional TF-IDF ranking engine (needs numpy and scipy).
+Keeps, per job, a sparse matrix of term counts over the applicants'
+stored resume text. Ranking applies IDF weights and cosine normalisation
+at query time, so all of a job's applicants are scored with two sparse
+matrix-vector products, and a new applicant is an appended row rather
+than a rebuild. Indexes are kept for the ATS_TFIDF_INDEX_CACHE_SIZE most
+recently ranked jobs. A job too large to index inside a request is built
+in a background thread while the request falls back to keyword ranking.
+"""
+
+import math
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count
+
+from .ats_scorer import TextAnalysis
+from .models import Job, ResumeAnalysis
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # the engine is optional; callers check TFIDF_AVAILABLE
+    np = sparse = None
+
+TFIDF_AVAILABLE = sparse is not None
+
+# job_id -> [build lock, TfidfIndex or None], least recently used first
+_indexes = OrderedDict()
+_building = set()
+_lock = threading.Lock()
+
+
+def _max_size():
+    return getattr(settings, 'ATS_TFIDF_INDEX_CACHE_SIZE', 32)
+
+
+class TfidfIndex:
+    """
+    Term counts for one job's applicants.
+
+    Rows are (sublinear) term frequencies, never IDF-weighted: IDF changes
+    with every document added, so it is applied when ranking instead.
+    Replaced or removed applicants leave a dead row behind until the next
+    compaction.
+    """
+
+    def __init__(self):
+        self.vocabulary = {}
+        self.doc_freq = []
+        self.row_ids = []
+        self.row_of = {}
+        self.alive = []
+        self._matrix = None
+        self._pending = []
+        self.synced_at = None
+        # applicant_id -> extracted_at of the text indexed for them
+        self.versions = {}
+
+    @property
+    def size(self):
+        """Number of live documents"""
+        return len(self.row_of)
+
+    def _term_counts(self, text, grow):
+        counts = TextAnalysis.of(text).token_counts
+        columns, values = [], []
+        for term, count in counts.items():
+            column = self.vocabulary.get(term)
+            if column is None:
+                if not grow:
+                    continue
+                column = self.vocabulary[term] = len(self.vocabulary)
+                self.doc_freq.append(0)
+            columns.append(column)
+            values.append(1.0 + math.log(count))
+        return columns, values
+
+    def add(self, applicant_id, text, version=None):
+        """Add an applicant's text, replacing any earlier version"""
+        self.remove(applicant_id)
+        self.versions[applicant_id] = version
+        columns, values = self._term_counts(text, grow=True)
+        for column in columns:
+            self.doc_freq[column] += 1
+        self.row_of[applicant_id] = len(self.row_ids)
+        self.row_ids.append(applicant_id)
+        self.alive.append(True)
+        self._pending.append((columns, values))
+
+    def remove(self, applicant_id):
+        """Drop an applicant's row from future rankings"""
+        self.versions.pop(applicant_id, None)
+        row = self.row_of.pop(applicant_id, None)
+        if row is None:
+            return
+        self.alive[row] = False
+        for column in self._row_columns(row):
+            self.doc_freq[column] -= 1
+
+    def _row_columns(self, row):
+        committed = self._matrix.shape[0] if self._matrix is not None else 0
+        if row >= committed:
+            return self._pending[row - committed][0]
+        start, end = self._matrix.indptr[row], self._matrix.indptr[row + 1]
+        return self._matrix.indices[start:end]
+
+    def matrix(self):
+        """The (documents x vocabulary) CSR matrix, with pending rows folded in"""
+        width = len(self.vocabulary)
+        if self._pending:
+            indptr = np.cumsum([0] + [len(columns) for columns, _ in self._pending])
+            indices = np.fromiter((c for columns, _ in self._pending for c in columns), dtype=np.int32)
+            data = np.fromiter((v for _, values in self._pending for v in values), dtype=np.float64)
+            new_rows = sparse.csr_matrix((data, indices, indptr), shape=(len(self._pending), width))
+            if self._matrix is None:
+                self._matrix = new_rows
+            else:
+                self._matrix.resize((self._matrix.shape[0], width))
+                self._matrix = sparse.vstack([self._matrix, new_rows], format='csr')
+            self._pending = []
+        elif self._matrix is None:
+            self._matrix = sparse.csr_matrix((0, width))
+        elif self._matrix.shape[1] != width:
+            self._matrix.resize((self._matrix.shape[0], width))
+
+        # Compact once dead rows dominate
+        dead = len(self.alive) - self.size
+        if dead > 1000 and dead > self.size:
+            keep = np.flatnonzero(self.alive)
+            self._matrix = self._matrix[keep]
+            self.row_ids = [self.row_ids[row] for row in keep]
+            self.alive = [True] * len(self.row_ids)
+            self.row_of = {applicant_id: row for row, applicant_id in enumerate(self.row_ids)}
+        return self._matrix
+
+    def rank(self, query_text, limit=None):
+        """
+        Cosine similarity of every live document to the query.
+
+        Args:
+            query_text: Job description and requirements
+            limit: Maximum results (all when None)
+
+        Returns:
+            List of (applicant_id, score 0-100), best first
+        """
+        matrix = self.matrix()
+        if not self.size:
+            return []
+        columns, values = self._term_counts(query_text, grow=False)
+        if not columns:
+            return []
+
+        idf = np.log((1.0 + self.size) / (1.0 + np.asarray(self.doc_freq, dtype=np.float64))) + 1.0
+        query = np.zeros(len(self.vocabulary))
+        query[columns] = values
+        query *= idf
+        query_norm = np.linalg.norm(query)
+
+        # (D * idf) . (q * idf) and ||D * idf|| without materialising D * idf
+        dots = matrix @ (query * idf)
+        norms = np.sqrt(matrix.multiply(matrix) @ (idf * idf))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores = np.where(norms > 0, dots / (norms * query_norm), 0.0)
+        scores[~np.asarray(self.alive, dtype=bool)] = -1.0
+
+        count = self.size if limit is None else min(limit, self.size)
+        top = np.argpartition(-scores, count - 1)[:count] if count < len(scores) else np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(self.row_ids[row], round(float(scores[row]) * 100, 2)) for row in top if scores[row] >= 0]
+
+
+def _sync(index, job_id):
+    """
+    Fold in analyses extracted since the last sync.
+
+    Returns:
+        False when the index holds applicants the database no longer has
+        (deleted applicants), so the caller rebuilds it
+    """
+    analyses = ResumeAnalysis.objects.filter(applicant__job_id=job_id).order_by()
+    changed = analyses
+    if index.synced_at is not None:
+        # >= so a row committed late with the last timestamp is still seen
+        changed = changed.filter(extracted_at__gte=index.synced_at)
+    rows = changed.values_list('applicant_id', 'text', 'extracted_at')
+    for applicant_id, text, extracted_at in rows.iterator(chunk_size=2000):
+        # ...but rows already indexed at that version are not re-added, which
+        # would leave a dead row behind on every sync
+        if index.versions.get(applicant_id) == extracted_at:
+            continue
+        index.add(applicant_id, text, version=extracted_at)
+        if index.synced_at is None or extracted_at > index.synced_at:
+            index.synced_at = extracted_at
+    return analyses.aggregate(total=Count('id'))['total'] == index.size
+
+
+def get_job_index(job_id):
+    """
+    The job's TF-IDF index, built on first use and kept in step with the
+    database through ResumeAnalysis.extracted_at.
+    """
+    with _lock:
+        index = _indexes.get(job_id)
+        if index is None:
+            index = _indexes[job_id] = [threading.Lock(), None]
+        _indexes.move_to_end(job_id)
+        # Evict least recently used jobs
+        while len(_indexes) > _max_size():
+            _indexes.popitem(last=False)
+    with index[0]:
+        if index[1] is None or not _sync(index[1], job_id):
+            index[1] = TfidfIndex()
+            _sync(index[1], job_id)
+        return index[1]
+
+
+def _build_in_background(job_id):
+    try:
+        get_job_index(job_id)
+    finally:
+        with _lock:
+            _building.discard(job_id)
+        # The thread's own database connection
+        connection.close()
+
+
+def build_job_index(job_id):
+    """
+    Build a job's index in a background thread (once at a time per job).
+
+    Returns:
+        True if a build was started
+    """
+    with _lock:
+        if job_id in _building:
+            return False
+        _building.add(job_id)
+    threading.Thread(target=_build_in_background, args=(job_id,), daemon=True).start()
+    return True
+
+
+def index_ready(job_id):
+    """True if the job's index is built and can be synced within a request"""
+    with _lock:
+        index = _indexes.get(job_id)
+    return index is not None and index[1] is not None
+
+
+def warm_job_indexes(background=False):
+    """
+    Build indexes for the most recently posted active jobs.
+
+    Args:
+        background: Start background builds instead of building in this thread
+
+    Returns:
+        Number of jobs warmed (or queued)
+    """
+    count = 0
+    jobs = Job.objects.filter(is_active=True).order_by('-created_at')
+    for job_id in jobs.values_list('id', flat=True)[:_max_size()]:
+        if background:
+            build_job_index(job_id)
+        else:
+            get_job_index(job_id)
+        count += 1
+    return count
+
+
+def forget_job(job_id):
+    """Drop a job's index (e.g. when the job is deleted)"""
+    with _lock:
+        _indexes.pop(job_id, None)
+
+
+def rank_applicants(job, limit=50):
+    """
+    Rank all of a job's scored applicants by TF-IDF cosine similarity.
+
+    Args:
+        job: Job instance
+        limit: Maximum applicants to return
+
+    Returns:
+        List of (applicant_id, score 0-100), best first, or None while the
+        job's index is being built in the background
+
+    Raises:
+        RuntimeError: numpy/scipy are not installed
+    """
+    if not TFIDF_AVAILABLE:
+        raise RuntimeError('The TF-IDF engine needs numpy and scipy installed')
+    if not index_ready(job.pk):
+        documents = ResumeAnalysis.objects.filter(applicant__job_id=job.pk).count()
+        if documents > getattr(settings, 'ATS_TFIDF_INLINE_BUILD_ROWS', 2000):
+            build_job_index(job.pk)
+            return None
+    return get_job_index(job.pk).rank(f"{job.description}\n{job.requirements or ''}", limit)
@@ -2,7 +2,7 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     CustomAuthToken, register, current_user, JobViewSet, ApplicantViewSet,
-    search_applicants, public_jobs, public_job_detail, public_application_create
+    search_applicants, metrics_view, public_jobs, public_job_detail, public_job_matches, public_application_create
 )
 
 router = DefaultRouter()
@@ -15,9 +15,11 @@ urlpatterns = [
     path('auth/user/', current_user, name='current_user'),
     path('auth/register/', register, name='register'),
     path('search/', search_applicants, name='search'),
+    path('metrics/', metrics_view, name='metrics'),
 
      # Public routes (no authentication required)
     path('public/jobs/', public_jobs, name='public_jobs'),
     path('public/jobs/<int:pk>/', public_job_detail, name='public_job_detail'),
+    path('public/jobs/match/', public_job_matches, name='public_job_matches'),
     path('public/applications/', public_application_create, name='public_application_create'),
 ]
\ No newline at end of file
@@ -1,26 +1,50 @@
-from rest_framework import viewsets, status, filters
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework import viewsets, status, filters, serializers
+from rest_framework.decorators import action, api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, BasePermission
 from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.throttling import SimpleRateThrottle
+from django.conf import settings
 from django.contrib.auth import authenticate, login
 from django.contrib.auth.models import User
-from django.db.models import Count, Q
 from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.db import IntegrityError, transaction
+from django.db.models import Sum
+from django.db.models.functions import Lower
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-import csv
-from datetime import datetime, timedelta
+from datetime import timedelta
 import re
+import threading
 
-from .models import Job, Applicant
+from .models import Job, Applicant, ApplicantStatusCount
 from .serializers import (
     UserSerializer, LoginSerializer, JobSerializer, 
-    ApplicantSerializer, ApplicantStatusUpdateSerializer,
-    BulkStatusUpdateSerializer, DashboardStatsSerializer
+    ApplicantSerializer, ApplicantListSerializer, ApplicantStatusUpdateSerializer,
+    BulkStatusUpdateSerializer, DashboardStatsSerializer, PublicJobSerializer
 )
-from .email_service import send_application_confirmation_email, send_status_update_email
-from .ats_scorer import calculate_ats_score
+from .email_service import (
+    queue_application_confirmation_email, queue_status_update_email, queue_status_update_emails
+)
+from .task_queue import enqueue_scoring
+from .rollups import record_transitions
+from . import public_cache
+from . import search as search_index
+from .exports import EXPORT_FORMATS, stream_applicant_export
+from .pagination import ApplicantPagination
+from .ats_scorer import ExtractionError
+from .job_matcher import match_analysis, match_resume
+from .scoring_service import get_analysis
+from . import tfidf
+from . import metrics
+
+class ExportContentNegotiation(DefaultContentNegotiation):
+    """Let export actions use ?format= for the file format instead of DRF renderer selection"""
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
 
 class CustomAuthToken(ObtainAuthToken):
     def post(self, request, *args, **kwargs):
@@ -74,7 +98,7 @@ def current_user(request):
     return Response(serializer.data)
 
 class JobViewSet(viewsets.ModelViewSet):
-    queryset = Job.objects.all().order_by('-created_at')
+    queryset = Job.objects.with_application_counts().order_by('-created_at')
     serializer_class = JobSerializer
     permission_classes = [IsAuthenticated]
     
@@ -91,15 +115,48 @@ class JobViewSet(viewsets.ModelViewSet):
         data = []
         for job in jobs:
             job_data = JobSerializer(job).data
-            status_counts = Applicant.objects.filter(job=job).values('status').annotate(count=Count('id'))
-            job_data['status_counts'] = {item['status']: item['count'] for item in status_counts}
+            job_data['status_counts'] = job.status_counts
             data.append(job_data)
         return Response(data)
+    
+    @action(detail=True, methods=['get'])
+    def ranking(self, request, pk=None):
+        """Rank the job's applicants with the configured ranking engine"""
+        job = self.get_object()
+        limit = _match_limit(request.query_params.get('limit'), default=50, maximum=500)
+        engine = request.query_params.get('engine', settings.ATS_RANKING_ENGINE)
+        if engine == 'tfidf' and not tfidf.TFIDF_AVAILABLE:
+            return Response(
+                {'error': 'The tfidf engine needs numpy and scipy installed'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        applicants = Applicant.objects.filter(job=job).select_related('job')
+        ranked = tfidf.rank_applicants(job, limit) if engine == 'tfidf' else None
+        index_building = engine == 'tfidf' and ranked is None
+        if ranked is not None:
+            by_id = applicants.in_bulk([applicant_id for applicant_id, _ in ranked])
+            results = []
+            for applicant_id, relevance in ranked:
+                if applicant_id in by_id:
+                    row = ApplicantListSerializer(by_id[applicant_id], context={'request': request}).data
+                    row['relevance'] = relevance
+                    results.append(row)
+        else:
+            engine = 'keywords'
+            rows = applicants.order_by('-match_score', 'id')[:limit]
+            results = ApplicantListSerializer(rows, many=True, context={'request': request}).data
+        data = {'job_id': job.id, 'engine': engine, 'results': results}
+        if index_building:
+            # Keyword order until the background TF-IDF build finishes
+            data['tfidf_index'] = 'building'
+        return Response(data)
 
 class ApplicantViewSet(viewsets.ModelViewSet):
     queryset = Applicant.objects.all().select_related('job')
     serializer_class = ApplicantSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ApplicantPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['job', 'status']
     search_fields = ['name', 'email', 'cover_letter', 'keywords']
@@ -107,44 +164,33 @@ class ApplicantViewSet(viewsets.ModelViewSet):
     ordering = ['-created_at']
     
     def perform_create(self, serializer):
-        """Override create to calculate ATS score"""
-        applicant = serializer.save()
+        """Override create to queue ATS scoring"""
+        try:
+            with transaction.atomic():
+                applicant = serializer.save()
+        except IntegrityError:
+            raise serializers.ValidationError(
+                {'email': 'This applicant has already applied for this job'}
+            )
         
-        # Calculate ATS score if resume is provided
+        # Score in the background worker if resume is provided
         if applicant.resume:
-            try:
-                ats_result = calculate_ats_score(
-                    resume_file=applicant.resume,
-                    job_description=applicant.job.description,
-                    job_requirements=applicant.job.requirements or "",
-                    cover_letter=applicant.cover_letter or ""
-                )
-                
-                applicant.match_score = int(ats_result['overall_score'])
-                applicant.keywords = ", ".join(ats_result['matched_keywords'][:10])
-                applicant.save()
-            except Exception as e:
-                print(f"ATS scoring error in perform_create: {e}")
+            enqueue_scoring(applicant, reparse=True)
     
     def perform_update(self, serializer):
-        """Override update to recalculate ATS score if resume changes"""
-        applicant = serializer.save()
+        """Override update to recalculate ATS score if resume, cover letter or job changes"""
+        try:
+            with transaction.atomic():
+                applicant = serializer.save()
+        except IntegrityError:
+            raise serializers.ValidationError(
+                {'email': 'This applicant has already applied for this job'}
+            )
         
-        # Recalculate if resume was updated
-        if 'resume' in self.request.FILES:
-            try:
-                ats_result = calculate_ats_score(
-                    resume_file=applicant.resume,
-                    job_description=applicant.job.description,
-                    job_requirements=applicant.job.requirements or "",
-                    cover_letter=applicant.cover_letter or ""
-                )
-                
-                applicant.match_score = int(ats_result['overall_score'])
-                applicant.keywords = ", ".join(ats_result['matched_keywords'][:10])
-                applicant.save()
-            except Exception as e:
-                print(f"ATS scoring error in perform_update: {e}")
+        # Re-parse if resume was updated; cover letter or job edits only need the stored text
+        resume_changed = 'resume' in self.request.FILES
+        if resume_changed or {'cover_letter', 'job'} & set(serializer.validated_data):
+            enqueue_scoring(applicant, reparse=resume_changed)
     
     def get_queryset(self):
         queryset = Applicant.objects.all().select_related('job')
@@ -162,8 +208,20 @@ class ApplicantViewSet(viewsets.ModelViewSet):
         if min_score:
             queryset = queryset.filter(match_score__gte=int(min_score))
         
+        # Only load the columns the (possibly ?fields= narrowed) serializer renders
+        if self.action in ('list', 'retrieve'):
+            only_fields = self.get_serializer().get_only_fields()
+            if not any(name.startswith('job__') for name in only_fields):
+                queryset = queryset.select_related(None)
+            queryset = queryset.only(*only_fields)
+        
         return queryset
     
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return ApplicantListSerializer
+        return ApplicantSerializer
+    
     def get_serializer_context(self):
         context = super().get_serializer_context()
         context['request'] = self.request
@@ -182,19 +240,20 @@ class ApplicantViewSet(viewsets.ModelViewSet):
             applicant.status = new_status
             if notes:
                 applicant.notes = notes
-            applicant.save()
             
-            # Send status update email to applicant
-            email_result = send_status_update_email(
-                applicant_name=applicant.name,
-                applicant_email=applicant.email,
-                job_title=applicant.job.title,
-                new_status=new_status,
-                notes=notes
-            )
+            # Status change and its notification email commit together
+            with transaction.atomic():
+                applicant.save()
+                queue_status_update_email(
+                    applicant_name=applicant.name,
+                    applicant_email=applicant.email,
+                    job_title=applicant.job.title,
+                    new_status=new_status,
+                    notes=notes
+                )
             
             response_data = ApplicantSerializer(applicant, context={'request': request}).data
-            response_data['email_sent'] = email_result.get('success', False)
+            response_data['email_queued'] = True
             
             return Response(response_data)
         
@@ -206,63 +265,80 @@ class ApplicantViewSet(viewsets.ModelViewSet):
         
         if serializer.is_valid():
             applicant_ids = serializer.validated_data['applicant_ids']
-            status = serializer.validated_data['status']
+            new_status = serializer.validated_data['status']
             notes = serializer.validated_data.get('notes', '')
             
-            applicants = Applicant.objects.filter(id__in=applicant_ids)
-            updated_count = applicants.update(status=status)
-            
-            if notes:
-                for applicant in applicants:
-                    applicant.notes = notes
-                    applicant.save()
+            # One locking read for the recipients, one set-based UPDATE and one
+            # bulk INSERT of notifications, however many applicants are selected
+            with transaction.atomic():
+                rows = list(
+                    Applicant.objects.select_for_update(of=('self',))
+                    .filter(id__in=applicant_ids)
+                    .values_list('id', 'name', 'email', 'job__title', 'job_id', 'status')
+                )
+                updated_ids = [row[0] for row in rows]
+                
+                changes = {'status': new_status, 'updated_at': timezone.now()}
+                if notes:
+                    changes['notes'] = notes
+                updated_count = Applicant.objects.filter(id__in=updated_ids).update(**changes)
+                record_transitions([row[4:] for row in rows], new_status)
+                
+                queued_count = queue_status_update_emails(
+                    [row[1:4] for row in rows], new_status=new_status, notes=notes
+                )
             
             return Response({
-                'message': f'Updated {updated_count} applicants to {status} status',
-                'updated_count': updated_count
+                'message': f'Updated {updated_count} applicants to {new_status} status',
+                'updated_count': updated_count,
+                'updated_ids': updated_ids,
+                'emails_queued': queued_count
             })
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-    @action(detail=False, methods=['get'])
+    @action(detail=False, methods=['get'], content_negotiation_class=ExportContentNegotiation)
     def export_csv(self, request):
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="applicants.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow(['Name', 'Email', 'Phone', 'Job', 'Status', 'Cover Letter Excerpt', 'Created At', 'Match Score'])
+        """Stream the filtered applicants as ?format=csv (default) or jsonl"""
+        export_format = request.query_params.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
         queryset = self.filter_queryset(self.get_queryset())
-        
-        for applicant in queryset:
-            cover_excerpt = applicant.cover_letter[:100] + '...' if len(applicant.cover_letter) > 100 else applicant.cover_letter
-            writer.writerow([
-                applicant.name,
-                applicant.email,
-                applicant.phone,
-                applicant.job.title,
-                applicant.get_status_display(),
-                cover_excerpt,
-                applicant.created_at.strftime('%Y-%m-%d %H:%M'),
-                applicant.match_score
-            ])
-        
-        return response
+        use_gzip = 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+        return stream_applicant_export(queryset, export_format, use_gzip=use_gzip)
+    
+    @action(detail=True, methods=['get'])
+    def job_matches(self, request, pk=None):
+        """Rank every active job for this applicant's stored resume analysis"""
+        applicant = self.get_object()
+        analysis = get_analysis(applicant)
+        if analysis is None:
+            return Response(
+                {'error': 'Resume has not been analyzed yet', 'scoring_status': applicant.scoring_status},
+                status=status.HTTP_409_CONFLICT
+            )
+        limit = _match_limit(request.query_params.get('limit'))
+        return Response({'applicant_id': applicant.id, 'matches': match_analysis(analysis, limit)})
     
     @action(detail=False, methods=['get'])
     def dashboard_stats(self, request):
-        total_applicants = Applicant.objects.count()
+        # Counts come from the per-(job, status) rollup: O(jobs) rows, not O(applicants)
+        status_dict = dict(
+            ApplicantStatusCount.objects.order_by().values_list('status').annotate(total=Sum('count'))
+        )
+        total_applicants = sum(status_dict.values())
         total_jobs = Job.objects.count()
         
-        # Status counts
-        status_counts = Applicant.objects.values('status').annotate(count=Count('id'))
-        status_dict = {item['status']: item['count'] for item in status_counts}
-        
         # Recent applicants (last 7 days)
-        seven_days_ago = datetime.now() - timedelta(days=7)
+        seven_days_ago = timezone.now() - timedelta(days=7)
+        only_fields = ApplicantListSerializer(context={'request': request}).get_only_fields()
         recent_applicants = Applicant.objects.filter(
             created_at__gte=seven_days_ago
-        ).order_by('-created_at')[:10]
+        ).select_related('job').only(*only_fields).order_by('-created_at')[:10]
         
         data = {
             'total_applicants': total_applicants,
@@ -272,7 +348,7 @@ class ApplicantViewSet(viewsets.ModelViewSet):
             'shortlisted_applicants': status_dict.get('shortlisted', 0),
             'rejected_applicants': status_dict.get('rejected', 0),
             'hired_applicants': status_dict.get('hired', 0),
-            'recent_applicants': ApplicantSerializer(recent_applicants, many=True, context={'request': request}).data
+            'recent_applicants': ApplicantListSerializer(recent_applicants, many=True, context={'request': request}).data
         }
         
         return Response(data)
@@ -285,14 +361,10 @@ def search_applicants(request):
     if not query:
         return Response([])
     
-    applicants = Applicant.objects.filter(
-        Q(name__icontains=query) |
-        Q(email__icontains=query) |
-        Q(cover_letter__icontains=query) |
-        Q(keywords__icontains=query)
-    ).select_related('job').order_by('-match_score')[:50]
+    # Ranked full-text search over name, email, cover letter and resume text
+    applicants = search_index.search_applicants(query, limit=50)
     
-    serializer = ApplicantSerializer(applicants, many=True, context={'request': request})
+    serializer = ApplicantListSerializer(applicants, many=True, context={'request': request})
     return Response(serializer.data)
 
 
@@ -303,24 +375,90 @@ def search_applicants(request):
 @permission_classes([AllowAny])
 def public_jobs(request):
     """Get all active jobs for public view"""
-    jobs = Job.objects.filter(is_active=True).order_by('-created_at')
-    serializer = JobSerializer(jobs, many=True)
-    return Response(serializer.data)
+    def build():
+        jobs = Job.objects.filter(is_active=True).order_by('-created_at')
+        return PublicJobSerializer(jobs, many=True).data
+    
+    return public_cache.cached_response(
+        request, public_cache.JOBS_KEY, public_cache.jobs_validator(), build
+    )
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def public_job_detail(request, pk):
     """Get single job details for public view"""
-    try:
-        job = Job.objects.get(pk=pk, is_active=True)
-        serializer = JobSerializer(job)
-        return Response(serializer.data)
-    except Job.DoesNotExist:
+    validator = public_cache.job_validator(pk)
+    if validator is None:
         return Response(
             {'error': 'Job not found or inactive'},
             status=status.HTTP_404_NOT_FOUND
         )
+    
+    def build():
+        return PublicJobSerializer(Job.objects.get(pk=pk)).data
+    
+    return public_cache.cached_response(
+        request, public_cache.JOB_KEY.format(pk), validator, build
+    )
+
+def _match_limit(value, default=10, maximum=50):
+    try:
+        return min(max(int(value), 1), maximum)
+    except (TypeError, ValueError):
+        return default
+
+class PublicMatchThrottle(SimpleRateThrottle):
+    """Per-client limit on anonymous resume matching (ATS_PUBLIC_MATCH_RATE, e.g. '10/min')"""
+    scope = 'public_match'
+    
+    def get_rate(self):
+        return getattr(settings, 'ATS_PUBLIC_MATCH_RATE', '10/min')
+    
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+# Anonymous parses running at once in this process; the rest are turned away
+# rather than holding a web worker while they queue for the extraction pool
+_public_match_slots = threading.BoundedSemaphore(getattr(settings, 'ATS_PUBLIC_MATCH_CONCURRENCY', 2))
 
+@api_view(['POST'])
+@permission_classes([AllowAny])
+@throttle_classes([PublicMatchThrottle])
+def public_job_matches(request):
+    """
+    Rank open jobs for an uploaded resume, parsed once.
+    
+    The resume is always parsed in the extraction pool (with its timeout
+    and CPU/memory limits), never in the web worker.
+    """
+    resume = request.FILES.get('resume')
+    if not resume:
+        return Response(
+            {'error': 'resume is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    if not _public_match_slots.acquire(blocking=False):
+        return Response(
+            {'error': 'Resume matching is busy, please try again shortly'},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={'Retry-After': '5'}
+        )
+    try:
+        matches = match_resume(
+            resume, request.data.get('cover_letter', ''), _match_limit(request.data.get('limit')),
+            isolated=True
+        )
+    except ExtractionError as e:
+        return Response(
+            {'error': 'Could not read the resume', 'code': e.code},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    finally:
+        _public_match_slots.release()
+    return Response({'matches': matches})
+
+@metrics.count_responses(metrics.INTAKE_REQUESTS)
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def public_application_create(request):
@@ -352,8 +490,10 @@ def public_application_create(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Check if applicant already applied for this job
-        if Applicant.objects.filter(email=email, job=job).exists():
+        # Check if applicant already applied for this job (served by the lower(email) unique index)
+        if Applicant.objects.annotate(email_lower=Lower('email')).filter(
+            job=job, email_lower=email.lower()
+        ).exists():
             return Response(
                 {'error': 'You have already applied for this position'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -362,44 +502,39 @@ def public_application_create(request):
         # Create the application
         serializer = ApplicantSerializer(data=request.data)
         if serializer.is_valid():
-            applicant_instance = serializer.save()
-            
-            # Calculate ATS score
+            # Application, scoring task and confirmation email commit together
             try:
-                resume_file = request.FILES.get('resume')
-                if resume_file:
-                    ats_result = calculate_ats_score(
-                        resume_file=resume_file,
-                        job_description=job.description,
-                        job_requirements=job.requirements or "",
-                        cover_letter=request.data.get('cover_letter', '')
-                    )
+                with transaction.atomic():
+                    applicant_instance = serializer.save()
                     
-                    # Update applicant with ATS score and keywords
-                    applicant_instance.match_score = int(ats_result['overall_score'])
-                    applicant_instance.keywords = ", ".join(ats_result['matched_keywords'][:10])
-                    applicant_instance.save()
-            except Exception as e:
-                print(f"ATS scoring error: {e}")
-                # Continue even if scoring fails
-            
-            # Send confirmation email to applicant
-            email_result = send_application_confirmation_email(
-                applicant_data={
-                    'name': request.data['name'],
-                    'email': email,
-                },
-                job_title=job.title,
-                applicant_email=email
-            )
+                    # Queue ATS scoring; the score is filled in by the background worker
+                    if applicant_instance.resume:
+                        enqueue_scoring(applicant_instance, reparse=True)
+                    
+                    # Queue confirmation email to applicant
+                    queue_application_confirmation_email(
+                        applicant_data={
+                            'name': request.data['name'],
+                            'email': email,
+                        },
+                        job_title=job.title,
+                        applicant_email=email
+                    )
+            except IntegrityError:
+                # A concurrent submission won the race past the check above
+                return Response(
+                    {'error': 'You have already applied for this position'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             
             return Response(
                 {
                     'success': True,
                     'message': 'Application submitted successfully!',
                     'application_id': serializer.data['id'],
-                    'email_sent': email_result.get('success', False),
-                    'match_score': applicant_instance.match_score
+                    'email_queued': True,
+                    'match_score': applicant_instance.match_score,
+                    'scoring_status': applicant_instance.scoring_status
                 },
                 status=status.HTTP_201_CREATED
             )
@@ -410,4 +545,20 @@ def public_application_create(request):
         return Response(
             {'error': str(e)},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
\ No newline at end of file
+        )
+
+class MetricsPermission(BasePermission):
+    """Staff users, or a scraper sending `Authorization: Bearer <ATS_METRICS_TOKEN>`"""
+    
+    def has_permission(self, request, view):
+        token = getattr(settings, 'ATS_METRICS_TOKEN', '')
+        header = request.META.get('HTTP_AUTHORIZATION', '')
+        if token and header.startswith('Bearer ') and constant_time_compare(header[7:], token):
+            return True
+        return bool(request.user and request.user.is_staff)
+
+@api_view(['GET'])
+@permission_classes([MetricsPermission])
+def metrics_view(request):
+    """Prometheus text format, summed over every worker process"""
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -15,7 +15,7 @@ ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
 USE_SQLITE = os.getenv('USE_SQLITE', 'False') == 'True'
 
 # Email
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
 EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
 EMAIL_PORT = int(os.getenv('EMAIL_PORT', 587))
 EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True') == 'True'
@@ -23,6 +23,59 @@ EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', 'sarujanang@gmail.com')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', 'cofv vwry bmrr bknw')
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 
+# ATS scoring
+ATS_JOB_PROFILE_CACHE_SIZE = int(os.getenv('ATS_JOB_PROFILE_CACHE_SIZE', 256))
+ATS_WARM_JOB_PROFILES = os.getenv('ATS_WARM_JOB_PROFILES', 'False') == 'True'
+ATS_SCORING_ASYNC = os.getenv('ATS_SCORING_ASYNC', 'True') == 'True'
+ATS_SCORING_WORKERS = int(os.getenv('ATS_SCORING_WORKERS', 2))
+ATS_SCORING_MAX_ATTEMPTS = int(os.getenv('ATS_SCORING_MAX_ATTEMPTS', 3))
+ATS_EMAIL_MAX_ATTEMPTS = int(os.getenv('ATS_EMAIL_MAX_ATTEMPTS', 5))
+ATS_PDF_MAX_PAGES = int(os.getenv('ATS_PDF_MAX_PAGES', 30))
+ATS_RESUME_MAX_CHARS = int(os.getenv('ATS_RESUME_MAX_CHARS', 100000))
+ATS_PDF_TIME_BUDGET = float(os.getenv('ATS_PDF_TIME_BUDGET', 5.0))
+ATS_EXTRACTION_ISOLATED = os.getenv('ATS_EXTRACTION_ISOLATED', 'True') == 'True'
+ATS_EXTRACTION_WORKERS = int(os.getenv('ATS_EXTRACTION_WORKERS', 1))
+ATS_EXTRACTION_TIMEOUT = float(os.getenv('ATS_EXTRACTION_TIMEOUT', 20))
+ATS_EXTRACTION_CPU_SECONDS = int(os.getenv('ATS_EXTRACTION_CPU_SECONDS', 15))
+ATS_EXTRACTION_MEMORY_MB = int(os.getenv('ATS_EXTRACTION_MEMORY_MB', 512))
+ATS_EXTRACTION_MAX_JOBS = int(os.getenv('ATS_EXTRACTION_MAX_JOBS', 50))
+# 'keywords' (match_score order) or 'tfidf' (needs numpy + scipy)
+ATS_RANKING_ENGINE = os.getenv('ATS_RANKING_ENGINE', 'keywords')
+ATS_TFIDF_INDEX_CACHE_SIZE = int(os.getenv('ATS_TFIDF_INDEX_CACHE_SIZE', 32))
+# Jobs with more stored analyses than this are indexed in a background thread
+ATS_TFIDF_INLINE_BUILD_ROWS = int(os.getenv('ATS_TFIDF_INLINE_BUILD_ROWS', 2000))
+ATS_SKILL_TAXONOMY_PATH = os.getenv('ATS_SKILL_TAXONOMY_PATH', os.path.join(BASE_DIR, 'ats', 'data', 'skills.json'))
+
+# Cache for the public career endpoints: per-process memory by default,
+# or a shared directory with CACHE_BACKEND=file
+if os.getenv('CACHE_BACKEND', 'locmem') == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_LOCATION', os.path.join(BASE_DIR, 'cache')),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'ats',
+        }
+    }
+ATS_PUBLIC_CACHE_TIMEOUT = int(os.getenv('ATS_PUBLIC_CACHE_TIMEOUT', 300))
+ATS_PUBLIC_MAX_AGE = int(os.getenv('ATS_PUBLIC_MAX_AGE', 60))
+# Anonymous resume matching: requests per client, and parses at once per process
+ATS_PUBLIC_MATCH_RATE = os.getenv('ATS_PUBLIC_MATCH_RATE', '10/min')
+ATS_PUBLIC_MATCH_CONCURRENCY = int(os.getenv('ATS_PUBLIC_MATCH_CONCURRENCY', 2))
+# Per-request SQL/stage timing: Server-Timing header and a JSON line on the 'ats.requests' logger
+ATS_SERVER_TIMING = os.getenv('ATS_SERVER_TIMING', 'True') == 'True'
+ATS_REQUEST_LOG = os.getenv('ATS_REQUEST_LOG', 'True') == 'True'
+ATS_N_PLUS_ONE_THRESHOLD = int(os.getenv('ATS_N_PLUS_ONE_THRESHOLD', 10))
+# Prometheus metrics: one file per process in ATS_METRICS_DIR, summed by /api/metrics/
+ATS_METRICS_DIR = os.getenv('ATS_METRICS_DIR', os.path.join(BASE_DIR, 'metrics'))
+ATS_METRICS_FLUSH_SECONDS = float(os.getenv('ATS_METRICS_FLUSH_SECONDS', 1.0))
+ATS_METRICS_TOKEN = os.getenv('ATS_METRICS_TOKEN', '')
+
 INSTALLED_APPS = [
     'django.contrib.admin',
     'django.contrib.auth',
@@ -41,6 +94,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost, so its timings cover every other middleware
+    'ats.instrumentation.RequestTimingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
 
@@ -78,7 +133,7 @@ if USE_SQLITE:
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
-            'NAME': BASE_DIR / 'db.sqlite3',
+            'NAME': os.getenv('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
         }
     }
 else:
@@ -148,3 +203,21 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20
 }
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'requests': {'class': 'logging.StreamHandler', 'formatter': 'message'},
+    },
+    'loggers': {
+        'ats.requests': {
+            'handlers': ['requests'],
+            'level': os.getenv('ATS_REQUEST_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
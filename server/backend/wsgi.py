@@ -14,3 +14,24 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_wsgi_application()
+
+# Optionally precompile ATS job profiles when a worker boots
+from django.conf import settings
+
+if settings.ATS_WARM_JOB_PROFILES:
+    from ats.job_profiles import warm_job_profiles
+
+    try:
+        warm_job_profiles()
+    except Exception as e:
+        print(f"Job profile warm-up failed: {e}")
+
+# Build TF-IDF indexes in the background so the first ranking requests find them ready
+if settings.ATS_RANKING_ENGINE == 'tfidf':
+    from ats import tfidf
+
+    if tfidf.TFIDF_AVAILABLE:
+        try:
+            tfidf.warm_job_indexes(background=True)
+        except Exception as e:
+            print(f"TF-IDF index warm-up failed: {e}")
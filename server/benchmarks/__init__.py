@@ -0,0 +1,4 @@
+"""
+Performance benchmarks for the ATS backend.
+Run from the server directory, e.g. `python -m benchmarks.bench_skill_matcher`.
+"""
@@ -0,0 +1,170 @@
+"""
+Benchmark: applicant list/dashboard queries with and without the Applicant indexes.
+
+Seeds a throwaway database, drops the indexes and the (job, lower(email))
+unique constraint declared in Applicant.Meta, times the hot queries, then
+recreates them and times the same queries again. By default the run uses a
+temporary SQLite file; set USE_SQLITE=False (plus the DB_* variables) to run
+against a scratch PostgreSQL database instead -- its applicant rows are replaced.
+
+Usage:
+    python -m benchmarks.bench_applicant_queries [--rows 1000000] [--jobs 200] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import timedelta
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+os.environ.setdefault('USE_SQLITE', 'True')
+if os.environ['USE_SQLITE'] == 'True':
+    os.environ.setdefault('SQLITE_PATH', os.path.join(tempfile.mkdtemp(), 'bench.sqlite3'))
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.models import Count  # noqa: E402
+from django.db.models.functions import Lower  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from ats.models import Applicant, Job, STATUS_CHOICES  # noqa: E402
+
+STATUSES = [value for value, _ in STATUS_CHOICES]
+
+
+def seed(rows, jobs, rng, batch_size=20000):
+    Applicant.objects.all().delete()
+    job_ids = [
+        job.id for job in Job.objects.bulk_create(
+            Job(title=f'Job {i}', description='benchmark', requirements='python django')
+            for i in range(jobs)
+        )
+    ]
+    now = timezone.now()
+    batch = []
+    for i in range(rows):
+        batch.append(Applicant(
+            name=f'Applicant {i}',
+            email=f'applicant{i}@example.com',
+            job_id=rng.choice(job_ids),
+            status=rng.choice(STATUSES),
+            match_score=round(rng.uniform(0, 100), 2),
+            scoring_status='done',
+        ))
+        if len(batch) == batch_size:
+            Applicant.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Applicant.objects.bulk_create(batch)
+
+    # auto_now_add ignores explicit values, so spread created_at afterwards
+    with connection.cursor() as cursor:
+        table = Applicant._meta.db_table
+        if connection.vendor == 'postgresql':
+            cursor.execute(f"UPDATE {table} SET created_at = %s - (id %% 365) * interval '1 day'", [now])
+        else:
+            cursor.execute(
+                f"UPDATE {table} SET created_at = datetime('now', '-' || (id % 365) || ' days')"
+            )
+    return job_ids
+
+
+def hot_queries(job_ids, rng):
+    job_id = rng.choice(job_ids)
+    since = timezone.now() - timedelta(days=30)
+    email = f'applicant{rng.randrange(1000)}@example.com'
+    return {
+        'job+status list': lambda: list(
+            Applicant.objects.filter(job_id=job_id, status='shortlisted')
+            .order_by('-created_at').values_list('id', flat=True)[:25]
+        ),
+        'job by score': lambda: list(
+            Applicant.objects.filter(job_id=job_id).order_by('-match_score')
+            .values_list('id', flat=True)[:25]
+        ),
+        'top scores': lambda: list(
+            Applicant.objects.order_by('-match_score', '-id')
+            .values_list('id', flat=True)[:25]
+        ),
+        'status recent': lambda: list(
+            Applicant.objects.filter(status='new').order_by('-created_at')
+            .values_list('id', flat=True)[:25]
+        ),
+        'last 30 days count': lambda: Applicant.objects.filter(created_at__gte=since).count(),
+        'job status counts': lambda: list(
+            Applicant.objects.filter(job_id=job_id).values('status').annotate(n=Count('id'))
+        ),
+        'duplicate check': lambda: Applicant.objects.annotate(email_lower=Lower('email')).filter(
+            job_id=job_id, email_lower=email
+        ).exists(),
+    }
+
+
+def time_queries(queries, repeat):
+    results = {}
+    for name, query in queries.items():
+        query()  # warm the page cache
+        start = time.perf_counter()
+        for _ in range(repeat):
+            query()
+        results[name] = (time.perf_counter() - start) / repeat * 1000
+    return results
+
+
+def drop_indexes():
+    with connection.schema_editor() as editor:
+        for constraint in Applicant._meta.constraints:
+            editor.remove_constraint(Applicant, constraint)
+        for index in Applicant._meta.indexes:
+            editor.remove_index(Applicant, index)
+
+
+def create_indexes():
+    with connection.schema_editor() as editor:
+        for index in Applicant._meta.indexes:
+            editor.add_index(Applicant, index)
+        for constraint in Applicant._meta.constraints:
+            editor.add_constraint(Applicant, constraint)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--jobs', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    call_command('migrate', run_syncdb=True, verbosity=0)
+    drop_indexes()
+
+    start = time.perf_counter()
+    job_ids = seed(args.rows, args.jobs, rng)
+    print(f"Seeded {args.rows} applicants over {args.jobs} jobs "
+          f"on {connection.vendor} in {time.perf_counter() - start:.1f}s")
+
+    queries = hot_queries(job_ids, rng)
+    before = time_queries(queries, args.repeat)
+
+    start = time.perf_counter()
+    create_indexes()
+    print(f"Built indexes in {time.perf_counter() - start:.1f}s\n")
+    after = time_queries(queries, args.repeat)
+
+    print(f"{'query':<20} {'before ms':>10} {'after ms':>10} {'speedup':>8}")
+    for name in queries:
+        print(f"{name:<20} {before[name]:>10.2f} {after[name]:>10.2f} "
+              f"{before[name] / max(after[name], 1e-6):>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""
+Benchmark: ats_scorer extraction, keyword/skill extraction and end-to-end scoring.
+
+Parses a synthetic corpus (see benchmarks.corpus) at each page count and
+reports per-document latency. Results are written as JSON and checked
+against absolute limits (scorer_thresholds.json) and, optionally, a
+previous run; any regression makes the exit status 1.
+
+Usage:
+    python -m benchmarks.bench_scorer [--pages 1 10 100] [--docs 20] [--output results.json]
+        [--baseline previous.json] [--tolerance 0.25]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+os.environ.setdefault('USE_SQLITE', 'True')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.files.uploadedfile import SimpleUploadedFile  # noqa: E402
+
+from ats.ats_scorer import (  # noqa: E402
+    analyze_text, calculate_ats_score, extract_keywords, extract_technical_skills,
+    extract_text_from_docx, extract_text_from_pdf, extraction_budgets,
+)
+from benchmarks.corpus import CorpusGenerator  # noqa: E402
+
+THRESHOLDS_PATH = os.path.join(os.path.dirname(__file__), 'scorer_thresholds.json')
+
+
+def summarize(samples):
+    """Latency statistics (milliseconds) for one benchmark case"""
+    ordered = sorted(samples)
+    total = sum(ordered)
+    return {
+        'count': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered), 3),
+        'p50_ms': round(ordered[len(ordered) // 2], 3),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        'max_ms': round(ordered[-1], 3),
+        'docs_per_s': round(len(ordered) / total * 1000, 1) if total else None,
+    }
+
+
+def timed(func, inputs, repeat):
+    samples = []
+    for _ in range(repeat):
+        for args in inputs:
+            if isinstance(args[0], SimpleUploadedFile):
+                args[0].seek(0)
+            start = time.perf_counter()
+            func(*args)
+            samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def run(pages_list, docs, repeat, seed):
+    generator = CorpusGenerator(seed)
+    jobs = [generator.job_text(i) for i in range(10)]
+    results = {}
+    for pages in pages_list:
+        pdfs = [SimpleUploadedFile(f'{i}.pdf', generator.pdf(i, pages)) for i in range(docs)]
+        docxs = [SimpleUploadedFile(f'{i}.docx', generator.docx(i, pages)) for i in range(docs)]
+        texts = [generator.resume_text(i, pages) for i in range(docs)]
+        cases = {
+            'extract_text_from_pdf': (extract_text_from_pdf, [(f,) for f in pdfs]),
+            'extract_text_from_docx': (extract_text_from_docx, [(f,) for f in docxs]),
+            'extract_keywords': (extract_keywords, [(text,) for text in texts]),
+            'extract_technical_skills': (extract_technical_skills, [(text,) for text in texts]),
+            'analyze_text': (analyze_text, [(text,) for text in texts]),
+            'calculate_ats_score': (
+                calculate_ats_score, [(f, *jobs[i % len(jobs)]) for i, f in enumerate(pdfs)]
+            ),
+        }
+        for name, (func, inputs) in cases.items():
+            key = f'{name}[pages={pages}]'
+            results[key] = timed(func, inputs, repeat)
+            print(f"{key:<44} p50 {results[key]['p50_ms']:>9.2f} ms  p95 {results[key]['p95_ms']:>9.2f} ms",
+                  file=sys.stderr)
+    return results
+
+
+def check(results, thresholds, baseline=None, tolerance=0.25, metric='p50_ms'):
+    """
+    Compare results with absolute limits and an optional previous run.
+
+    Args:
+        results: {case: stats} from this run
+        thresholds: {case: {stat: max value}}
+        baseline: {case: stats} from an earlier run, or None
+        tolerance: Allowed relative slowdown against the baseline
+        metric: Statistic compared against the baseline
+
+    Returns:
+        List of regression dicts (empty when everything passed)
+    """
+    regressions = []
+    for case, limits in thresholds.items():
+        for stat, limit in limits.items():
+            value = results.get(case, {}).get(stat)
+            if value is not None and value > limit:
+                regressions.append({'case': case, 'stat': stat, 'value': value, 'limit': limit,
+                                    'reason': 'threshold'})
+    for case, previous in (baseline or {}).items():
+        value, before = results.get(case, {}).get(metric), previous.get(metric)
+        if value is not None and before and value > before * (1 + tolerance):
+            regressions.append({'case': case, 'stat': metric, 'value': value,
+                                'limit': round(before * (1 + tolerance), 3), 'reason': 'baseline'})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 10, 100], help='Page counts (1 to 100)')
+    parser.add_argument('--docs', type=int, default=20, help='Documents per page count and format')
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write the JSON report here (default: stdout)')
+    parser.add_argument('--thresholds', default=THRESHOLDS_PATH, help='JSON of absolute limits per case')
+    parser.add_argument('--baseline', help='JSON report of an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown against --baseline')
+    parser.add_argument('--isolated', action='store_true',
+                        help='Parse in the extraction pool, as production does (adds IPC cost)')
+    args = parser.parse_args()
+
+    settings.ATS_EXTRACTION_ISOLATED = args.isolated
+    results = run(args.pages, args.docs, args.repeat, args.seed)
+
+    thresholds = {}
+    if args.thresholds:
+        with open(args.thresholds, encoding='utf-8') as f:
+            thresholds = json.load(f)['limits']
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+    regressions = check(results, thresholds, baseline, args.tolerance)
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'docs': args.docs,
+            'pages': args.pages,
+            'repeat': args.repeat,
+            'isolated': args.isolated,
+            'budgets': dict(zip(('max_pages', 'max_chars', 'time_budget'), extraction_budgets())),
+        },
+        'results': results,
+        'regressions': regressions,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    for regression in regressions:
+        print(f"REGRESSION {regression['case']} {regression['stat']}={regression['value']} "
+              f"> {regression['limit']} ({regression['reason']})", file=sys.stderr)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
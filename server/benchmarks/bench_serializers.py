@@ -0,0 +1,80 @@
+"""
+Benchmark: full ApplicantSerializer vs the compact list serializer for one page.
+
+Rows are unsaved in-memory instances, so this measures serialization and
+payload size only; no database is needed.
+
+Usage:
+    python -m benchmarks.bench_serializers [--rows 100] [--repeat 50]
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+os.environ.setdefault('USE_SQLITE', 'True')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.test import RequestFactory  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+
+from ats.models import Applicant, Job  # noqa: E402
+from ats.serializers import ApplicantListSerializer, ApplicantSerializer  # noqa: E402
+
+WORDS = 'python django react docker kubernetes team delivered platform scalable api'.split()
+
+
+def make_rows(count, rng):
+    job = Job(id=1, title='Backend Engineer', description='', requirements='')
+    now = timezone.now()
+    return [
+        Applicant(
+            id=i, job=job, name=f'Applicant {i}', email=f'applicant{i}@example.com',
+            phone='+1 555 0100', resume=f'resumes/applicant_{i}.pdf',
+            cover_letter=' '.join(rng.choice(WORDS) for _ in range(300)),
+            notes=' '.join(rng.choice(WORDS) for _ in range(40)),
+            keywords=', '.join(rng.sample(WORDS, 8)),
+            match_score=rng.randrange(100), created_at=now, updated_at=now,
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def measure(serializer_class, rows, query, repeat):
+    request = Request(RequestFactory(SERVER_NAME='localhost').get('/api/applicants/' + query))
+    start = time.perf_counter()
+    for _ in range(repeat):
+        data = serializer_class(rows, many=True, context={'request': request}).data
+    elapsed = (time.perf_counter() - start) / repeat * 1000
+    return elapsed, len(json.dumps(data, default=str).encode('utf-8'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows, random.Random(args.seed))
+    cases = [
+        ('full', ApplicantSerializer, ''),
+        ('list', ApplicantListSerializer, ''),
+        ('list ?fields=id,name,match_score', ApplicantListSerializer, '?fields=id,name,match_score'),
+    ]
+
+    print(f"{'serializer':<34} {'ms/page':>9} {'bytes/page':>11} {'bytes/row':>10}")
+    for name, serializer_class, query in cases:
+        elapsed, size = measure(serializer_class, rows, query, args.repeat)
+        print(f"{name:<34} {elapsed:>9.2f} {size:>11} {size // args.rows:>10}")
+
+
+if __name__ == '__main__':
+    main()
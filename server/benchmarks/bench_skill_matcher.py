@@ -0,0 +1,85 @@
+"""
+Benchmark: single-pass SkillMatcher vs the original per-skill substring loop.
+
+The taxonomy is padded with synthetic skills to show how each approach
+scales with taxonomy size.
+
+Usage:
+    python -m benchmarks.bench_skill_matcher [--skills 100 1000 20000] [--words 800] [--repeat 20]
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+
+from ats.skill_matcher import SkillMatcher
+
+TAXONOMY_PATH = os.path.join(os.path.dirname(__file__), '..', 'ats', 'data', 'skills.json')
+
+FILLER_WORDS = (
+    'experience developed built team project managed designed delivered customer '
+    'platform service performance reliable scalable worked with using across data '
+    'regular digital programmer interest restore together agile python django docker '
+    'kubernetes react aws linux git sql rest api golang'
+).split()
+
+
+def legacy_extract(text, skills):
+    """The original loop: one substring scan of the text per skill"""
+    text_lower = text.lower()
+    return [skill for skill in skills if skill in text_lower]
+
+
+def build_taxonomy(size, rng):
+    with open(TAXONOMY_PATH, encoding='utf-8') as f:
+        taxonomy = json.load(f)
+    while len(taxonomy) < size:
+        name = 'skill' + ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(6))
+        taxonomy[name] = [name]
+    return taxonomy
+
+
+def make_resume(words, rng):
+    return ' '.join(rng.choice(FILLER_WORDS) for _ in range(words))
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--skills', type=int, nargs='+', default=[100, 1000, 20000])
+    parser.add_argument('--words', type=int, default=800)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    resume = make_resume(args.words, rng)
+
+    print(f"{'skills':>8} {'build ms':>10} {'legacy ms':>10} {'matcher ms':>11} {'speedup':>8} "
+          f"{'legacy hits':>12} {'matcher hits':>13}")
+    for size in args.skills:
+        taxonomy = build_taxonomy(size, rng)
+        patterns = [p for aliases in taxonomy.values() for p in aliases]
+
+        start = time.perf_counter()
+        matcher = SkillMatcher(taxonomy)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        legacy_ms = timed(lambda: legacy_extract(resume, patterns), args.repeat)
+        matcher_ms = timed(lambda: matcher.find(resume), args.repeat)
+
+        print(f"{size:>8} {build_ms:>10.1f} {legacy_ms:>10.3f} {matcher_ms:>11.3f} "
+              f"{legacy_ms / matcher_ms:>7.1f}x {len(legacy_extract(resume, patterns)):>12} "
+              f"{len(matcher.find(resume)):>13}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: TF-IDF index build, incremental adds and ranking for one large job.
+
+Documents are synthetic resumes held in memory, so no database is needed.
+Needs numpy and scipy.
+
+Usage:
+    python -m benchmarks.bench_tfidf [--docs 50000] [--words 400] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+os.environ.setdefault('USE_SQLITE', 'True')
+
+import django  # noqa: E402
+
+django.setup()
+
+from ats.tfidf import TFIDF_AVAILABLE, TfidfIndex  # noqa: E402
+
+SKILLS = ('python django flask fastapi react typescript javascript docker kubernetes terraform '
+          'postgresql mysql redis kafka spark airflow aws azure gcp java spring golang rust').split()
+FILLER = ('team delivered platform scalable service customers migrated designed improved latency '
+          'owned built reliability testing mentoring reviews pipeline dashboards reporting').split()
+
+
+def make_document(rng, words):
+    # A few thousand distinct tokens, like real resumes' long tail
+    vocabulary = SKILLS + FILLER
+    tokens = [rng.choice(vocabulary) if rng.random() < 0.8 else f'term{rng.randrange(5000)}'
+              for _ in range(words)]
+    return ' '.join(tokens)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--docs', type=int, default=50000)
+    parser.add_argument('--words', type=int, default=400)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    if not TFIDF_AVAILABLE:
+        parser.exit(1, 'numpy and scipy are required: pip install numpy scipy\n')
+
+    rng = random.Random(args.seed)
+    documents = [make_document(rng, args.words) for _ in range(args.docs)]
+    query = 'Python Django developer building REST APIs. docker, kubernetes, postgresql, redis'
+
+    index = TfidfIndex()
+    start = time.perf_counter()
+    for applicant_id, text in enumerate(documents):
+        index.add(applicant_id, text)
+    index.matrix()
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        index.rank(query, limit=50)
+    rank = (time.perf_counter() - start) / args.repeat
+
+    extra = [make_document(rng, args.words) for _ in range(100)]
+    start = time.perf_counter()
+    for offset, text in enumerate(extra):
+        index.add(args.docs + offset, text)
+    index.rank(query, limit=50)
+    incremental = time.perf_counter() - start
+
+    matrix = index.matrix()
+    print(f"documents={index.size} vocabulary={matrix.shape[1]} nonzeros={matrix.nnz}")
+    print(f"{'build (tokenize + matrix)':<30} {build * 1000:>10.1f} ms")
+    print(f"{'rank all, top 50':<30} {rank * 1000:>10.1f} ms")
+    print(f"{'add 100 + rank':<30} {incremental * 1000:>10.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+"""
+Reproducible synthetic resume corpus: PDF and DOCX resumes plus job texts.
+
+The same seed always produces the same text, so benchmark runs on
+different commits parse identical documents. Used in-process by
+bench_scorer; run as a module to write a corpus to disk.
+
+Usage:
+    python -m benchmarks.corpus --out /tmp/corpus [--docs 1000] [--pages 1 5] [--seed 42]
+"""
+
+import argparse
+import datetime
+import io
+import json
+import os
+import random
+
+from docx import Document
+
+TAXONOMY_PATH = os.path.join(os.path.dirname(__file__), '..', 'ats', 'data', 'skills.json')
+
+SECTIONS = ('Summary', 'Experience', 'Projects', 'Education', 'Skills', 'Certifications')
+VERBS = ('Built', 'Designed', 'Led', 'Migrated', 'Maintained', 'Automated', 'Optimized', 'Delivered')
+NOUNS = ('platform', 'service', 'pipeline', 'dashboard', 'API', 'integration', 'test suite',
+         'deployment', 'data model', 'search feature', 'billing system', 'mobile app')
+FILLER = ('team customers latency reliability across regions reporting reviews mentoring '
+          'stakeholders requirements production incidents scalable secure documented '
+          'quarterly roadmap ownership onboarding releases monitoring').split()
+ROLES = ('Backend Engineer', 'Frontend Developer', 'Data Engineer', 'DevOps Engineer',
+         'Full Stack Developer', 'Machine Learning Engineer', 'QA Automation Engineer')
+
+# Roughly one printed page of resume text
+LINES_PER_PAGE = 40
+FIXED_TIMESTAMP = datetime.datetime(2024, 1, 1)
+
+
+def load_skill_terms():
+    """Every alias in the skill taxonomy, so generated text exercises the matcher"""
+    with open(TAXONOMY_PATH, encoding='utf-8') as f:
+        taxonomy = json.load(f)
+    return sorted({alias for aliases in taxonomy.values() for alias in aliases})
+
+
+class CorpusGenerator:
+    """Deterministic resume and job text generator for one seed"""
+
+    def __init__(self, seed=42):
+        self.seed = seed
+        self.skills = load_skill_terms()
+
+    def _rng(self, kind, index):
+        # Each document has its own stream, so document N is the same
+        # whatever sizes or counts were generated before it
+        return random.Random(f'{self.seed}:{kind}:{index}')
+
+    def _line(self, rng):
+        words = [rng.choice(VERBS), 'a', rng.choice(NOUNS), 'using']
+        words += rng.sample(self.skills, rng.randint(1, 3))
+        words += rng.sample(FILLER, rng.randint(4, 9))
+        return ' '.join(words) + '.'
+
+    def resume_pages(self, index, pages):
+        """
+        Text of resume `index`, one list of lines per page.
+
+        Args:
+            index: Document number within the corpus
+            pages: Page count
+
+        Returns:
+            List of pages, each a list of lines
+        """
+        rng = self._rng('resume', index)
+        result = []
+        for page in range(pages):
+            lines = [f'Candidate {index}  {rng.choice(ROLES)}'] if page == 0 else []
+            while len(lines) < LINES_PER_PAGE:
+                if len(lines) % 10 == 1:
+                    lines.append(rng.choice(SECTIONS))
+                lines.append(self._line(rng))
+            result.append(lines[:LINES_PER_PAGE])
+        return result
+
+    def resume_text(self, index, pages):
+        """Plain text of resume `index` (what a parser should recover)"""
+        return '\n'.join(line for page in self.resume_pages(index, pages) for line in page)
+
+    def job_text(self, index):
+        """
+        A job posting.
+
+        Returns:
+            (description, requirements)
+        """
+        rng = self._rng('job', index)
+        role = rng.choice(ROLES)
+        description = ' '.join(
+            [f'We are hiring a {role}.'] + [self._line(rng) for _ in range(rng.randint(4, 10))]
+        )
+        requirements = ', '.join(rng.sample(self.skills, rng.randint(5, 12)))
+        return description, requirements
+
+    def pdf(self, index, pages):
+        """Resume `index` as PDF bytes"""
+        return build_pdf(self.resume_pages(index, pages))
+
+    def docx(self, index, pages):
+        """Resume `index` as DOCX bytes, with a page break between pages"""
+        document = Document()
+        properties = document.core_properties
+        properties.created = properties.modified = properties.last_printed = FIXED_TIMESTAMP
+        for page, lines in enumerate(self.resume_pages(index, pages)):
+            if page:
+                document.add_page_break()
+            for line in lines:
+                document.add_paragraph(line)
+        out = io.BytesIO()
+        document.save(out)
+        return out.getvalue()
+
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def build_pdf(pages):
+    """
+    Build an uncompressed PDF with one text line per row.
+
+    Args:
+        pages: List of pages, each a list of lines
+
+    Returns:
+        PDF bytes
+    """
+    objects = ['<< /Type /Catalog /Pages 2 0 R >>', None,
+               '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    kids = []
+    for lines in pages:
+        stream = 'BT /F1 10 Tf 14 TL 50 760 Td ' + ' '.join(f'({_escape(line)}) Tj T*' for line in lines) + ' ET'
+        objects.append(f'<< /Length {len(stream)} >>\nstream\n{stream}\nendstream')
+        objects.append(f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+                       f'/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>')
+        kids.append(f'{len(objects)} 0 R')
+    objects[1] = f'<< /Type /Pages /Kids [{" ".join(kids)}] /Count {len(kids)} >>'
+
+    out = io.BytesIO()
+    out.write(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(f'{number} 0 obj\n{body}\nendobj\n'.encode('latin-1'))
+    xref = out.tell()
+    out.write(f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode('ascii'))
+    for offset in offsets:
+        out.write(f'{offset:010d} 00000 n \n'.encode('ascii'))
+    out.write(f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n'
+              f'startxref\n{xref}\n%%EOF\n'.encode('ascii'))
+    return out.getvalue()
+
+
+def write_corpus(out_dir, docs, pages, seed=42, jobs=10):
+    """
+    Write a corpus to disk: resumes/<pages>p/<n>.pdf|.docx and jobs.json.
+
+    Files are written one at a time, so 100k-document corpora don't need
+    to fit in memory.
+
+    Returns:
+        Number of files written
+    """
+    generator = CorpusGenerator(seed)
+    written = 0
+    for page_count in pages:
+        directory = os.path.join(out_dir, 'resumes', f'{page_count}p')
+        os.makedirs(directory, exist_ok=True)
+        for index in range(docs):
+            # Alternate formats so each size has both
+            kind = 'pdf' if index % 2 == 0 else 'docx'
+            content = getattr(generator, kind)(index, page_count)
+            with open(os.path.join(directory, f'{index}.{kind}'), 'wb') as f:
+                f.write(content)
+            written += 1
+    with open(os.path.join(out_dir, 'jobs.json'), 'w', encoding='utf-8') as f:
+        json.dump([dict(zip(('description', 'requirements'), generator.job_text(i))) for i in range(jobs)],
+                  f, indent=2)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--out', required=True, help='Directory to write the corpus into')
+    parser.add_argument('--docs', type=int, default=1000, help='Resumes per page count (100 to 100000)')
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 5], help='Page counts (1 to 100)')
+    parser.add_argument('--jobs', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    written = write_corpus(args.out, args.docs, args.pages, args.seed, args.jobs)
+    print(f"Wrote {written} resumes and {args.jobs} jobs to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+"""
+Load test: public intake, applicant listing, export and dashboard over HTTP.
+
+`seed` fills the configured database (SQLite via SQLITE_PATH, or
+PostgreSQL with USE_SQLITE=False and the DB_* variables) with jobs and
+applicants and prints an API token. `run` drives a running server
+(runserver or gunicorn, started with the same database settings) from a
+pool of threads, one endpoint at a time, and reports p50/p95/p99 latency,
+throughput and errors. It then replays each endpoint once in-process to
+count its SQL queries.
+
+Usage:
+    export USE_SQLITE=True SQLITE_PATH=/tmp/load.sqlite3
+    python -m benchmarks.load_test seed --applicants 100000 --jobs 50
+    gunicorn backend.wsgi -w 4 -b 127.0.0.1:8000   # in another terminal, same environment
+    python -m benchmarks.load_test run [--token <token>] \\
+        [--base-url http://127.0.0.1:8000] [--concurrency 8] [--duration 20] [--output load.json]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+os.environ.setdefault('USE_SQLITE', 'True')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from rest_framework.authtoken.models import Token  # noqa: E402
+
+from ats.models import Applicant, Job, STATUS_CHOICES  # noqa: E402
+from ats.rollups import reconcile  # noqa: E402
+from ats.search import rebuild_index, search_available  # noqa: E402
+from benchmarks.corpus import CorpusGenerator, build_pdf  # noqa: E402
+
+STATUSES = [value for value, _ in STATUS_CHOICES]
+LOAD_USER = 'loadtest'
+
+# name -> (method, path); {job} is replaced with a seeded active job id
+ENDPOINTS = {
+    'intake': ('POST', '/api/public/applications/'),
+    'list': ('GET', '/api/applicants/?page={page}'),
+    'list_by_job': ('GET', '/api/applicants/?job={job}&ordering=-match_score'),
+    'export': ('GET', '/api/applicants/export_csv/?job={job}'),
+    'dashboard': ('GET', '/api/applicants/dashboard_stats/'),
+}
+
+
+def seed(applicants, jobs, rng, batch_size=10000):
+    """
+    Add jobs and applicants, then rebuild what bulk_create bypassed.
+
+    Returns:
+        API token of the load-test user
+    """
+    call_command('migrate', run_syncdb=True, verbosity=0)
+    user, _ = User.objects.get_or_create(username=LOAD_USER, defaults={'email': 'load@example.com'})
+    token, _ = Token.objects.get_or_create(user=user)
+
+    generator = CorpusGenerator(rng.randrange(1 << 30))
+    job_ids = [
+        job.id for job in Job.objects.bulk_create(
+            Job(title=f'Load job {i}', description=description, requirements=requirements)
+            for i, (description, requirements) in enumerate(generator.job_text(i) for i in range(jobs))
+        )
+    ]
+    run_id = uuid.uuid4().hex[:8]
+    cover_letters = [generator.resume_text(i, 1)[:1000] for i in range(100)]
+    batch = []
+    for i in range(applicants):
+        batch.append(Applicant(
+            name=f'Load Applicant {i}',
+            email=f'load{run_id}-{i}@example.com',
+            job_id=rng.choice(job_ids),
+            status=rng.choice(STATUSES),
+            match_score=round(rng.uniform(0, 100), 2),
+            scoring_status='done',
+            resume=f'resumes/load/{i % 100}.pdf',
+            cover_letter=cover_letters[i % 100],
+        ))
+        if len(batch) == batch_size:
+            Applicant.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Applicant.objects.bulk_create(batch)
+
+    reconcile()
+    if search_available():
+        rebuild_index()
+    return token.key
+
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 2)
+
+
+class LoadClient:
+    """One keep-alive HTTP connection per thread"""
+
+    def __init__(self, base_url, token):
+        parts = urlsplit(base_url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.connection = connection_class(parts.hostname, parts.port, timeout=120)
+        self.token = token
+
+    def request(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        if self.token and not path.startswith('/api/public/'):
+            headers['Authorization'] = f'Token {self.token}'
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            response.read()
+            return response.status
+        except (http.client.HTTPException, OSError):
+            self.connection.close()
+            return 0
+
+
+def intake_body(pdf, job_id):
+    """Multipart body for one public application with a unique email"""
+    boundary = uuid.uuid4().hex
+    email = f'intake-{uuid.uuid4().hex}@example.com'
+    fields = {'name': 'Load Intake', 'email': email, 'job': str(job_id), 'cover_letter': 'Load test'}
+    parts = [
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        for name, value in fields.items()
+    ]
+    parts.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="resume"; filename="cv.pdf"\r\n'
+        f'Content-Type: application/pdf\r\n\r\n'.encode() + pdf + b'\r\n'
+    )
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), {'Content-Type': f'multipart/form-data; boundary={boundary}'}
+
+
+def build_request(name, job_ids, rng, pdf):
+    method, path = ENDPOINTS[name]
+    path = path.format(job=rng.choice(job_ids), page=rng.randint(1, 5))
+    if name == 'intake':
+        body, headers = intake_body(pdf, rng.choice(job_ids))
+        return method, path, body, headers
+    return method, path, None, {}
+
+
+def drive(name, base_url, token, job_ids, concurrency, duration, pdf):
+    """
+    Hit one endpoint from `concurrency` threads for `duration` seconds.
+
+    Returns:
+        Stats dict for the endpoint
+    """
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(seed):
+        rng = random.Random(seed)
+        client = LoadClient(base_url, token)
+        mine, failed = [], 0
+        while time.perf_counter() < deadline:
+            method, path, body, headers = build_request(name, job_ids, rng, pdf)
+            start = time.perf_counter()
+            status = client.request(method, path, body, headers)
+            elapsed = (time.perf_counter() - start) * 1000
+            if 200 <= status < 300:
+                mine.append(elapsed)
+            else:
+                failed += 1
+                if status == 0:
+                    time.sleep(0.1)  # server down or restarting; don't spin
+        with lock:
+            latencies.extend(mine)
+            errors.append(failed)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'errors': sum(errors),
+        'throughput_rps': round(len(ordered) / wall, 1),
+        'p50_ms': percentile(ordered, 0.50),
+        'p95_ms': percentile(ordered, 0.95),
+        'p99_ms': percentile(ordered, 0.99),
+        'max_ms': round(ordered[-1], 2) if ordered else None,
+    }
+
+
+def count_queries(name, job_ids, rng, pdf):
+    """SQL queries one request to the endpoint runs, replayed in-process"""
+    client = Client(SERVER_NAME='localhost')
+    client.force_login(User.objects.get(username=LOAD_USER))
+    method, path, body, headers = build_request(name, job_ids, rng, pdf)
+    with CaptureQueriesContext(connection) as queries:
+        if method == 'POST':
+            response = client.generic(method, path, body, content_type=headers['Content-Type'])
+        else:
+            response = client.get(path)
+        if getattr(response, 'streaming', False):
+            for _ in response.streaming_content:
+                pass
+    return len(queries) if response.status_code < 300 else None
+
+
+def run(args):
+    job_ids = list(Job.objects.filter(is_active=True).values_list('id', flat=True))
+    if not job_ids:
+        raise SystemExit('No active jobs: run `python -m benchmarks.load_test seed` first')
+    pdf = build_pdf(CorpusGenerator(args.seed).resume_pages(0, 1))
+    table_size = Applicant.objects.count()
+
+    results = {}
+    for name in args.endpoints:
+        results[name] = drive(name, args.base_url, args.token, job_ids, args.concurrency, args.duration, pdf)
+        if not args.skip_queries:
+            results[name]['queries_per_request'] = count_queries(name, job_ids, random.Random(args.seed), pdf)
+
+    print(f"{Applicant.objects.count()} applicants ({table_size} at start), "
+          f"concurrency {args.concurrency}, {args.duration}s per endpoint\n")
+    print(f"{'endpoint':<12} {'req':>7} {'err':>5} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'queries':>8}")
+    for name, stats in results.items():
+        print(f"{name:<12} {stats['requests']:>7} {stats['errors']:>5} {stats['throughput_rps']:>8} "
+              f"{stats['p50_ms'] or '-':>9} {stats['p95_ms'] or '-':>9} {stats['p99_ms'] or '-':>9} "
+              f"{stats.get('queries_per_request') or '-':>8}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'meta': {'base_url': args.base_url, 'vendor': connection.vendor, 'applicants': table_size,
+                         'concurrency': args.concurrency, 'duration_s': args.duration},
+                'results': results,
+            }, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    seed_parser = commands.add_parser('seed', help='Add jobs and applicants to the configured database')
+    seed_parser.add_argument('--applicants', type=int, default=100_000)
+    seed_parser.add_argument('--jobs', type=int, default=50)
+    seed_parser.add_argument('--seed', type=int, default=42)
+
+    run_parser = commands.add_parser('run', help='Drive a running server')
+    run_parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    run_parser.add_argument('--token', help='API token printed by `seed`')
+    run_parser.add_argument('--concurrency', type=int, default=8)
+    run_parser.add_argument('--duration', type=float, default=20, help='Seconds per endpoint')
+    run_parser.add_argument('--endpoints', nargs='+', choices=list(ENDPOINTS), default=list(ENDPOINTS))
+    run_parser.add_argument('--skip-queries', action='store_true',
+                            help="Don't replay requests in-process to count SQL queries")
+    run_parser.add_argument('--output', help='Write the JSON report here')
+    run_parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    if args.command == 'seed':
+        start = time.perf_counter()
+        token = seed(args.applicants, args.jobs, random.Random(args.seed))
+        print(f"Seeded {args.applicants} applicants over {args.jobs} jobs on {connection.vendor} "
+              f"in {time.perf_counter() - start:.1f}s")
+        print(f"Token: {token}")
+    else:
+        if not args.token:
+            args.token = Token.objects.filter(user__username=LOAD_USER).values_list('key', flat=True).first()
+        run(args)
+
+
+if __name__ == '__main__':
+    main()